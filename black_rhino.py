@@ -35,7 +35,7 @@ if __name__ == '__main__':
     import logging
 
     from src.environment import Environment
-    from src.runner import Runner
+    from src.runner import Runner, get_run_seed
 
     args = ['./black_rhino.py',  "tests/environments/", "test_all_methods",  "tests/log/"]
     # args = sys.argv
@@ -63,13 +63,30 @@ if __name__ == '__main__':
 #
 # UPDATE STEP
 #
-    for i in range(int(environment.num_simulations)):
-        logging.info('  STARTED with run %s',  str(i))
-        environment.initialize(environment_directory,  identifier)
-        runner.initialize(environment)
-        # do the run
-        runner.do_run(environment)
-        logging.info('  DONE')
+    # if asked for, the variable parameters are swept, or the simulations are run in a pool of processes
+    if "sweep_design" in environment.static_parameters:
+        from src.sweep import Sweep
+        Sweep(environment).do_sweep(runner, environment, environment_directory, identifier,
+                                    int(environment.static_parameters.get("ensemble_processes", 1)))
+    elif int(environment.static_parameters.get("ensemble_processes", 0)) > 0:
+        runner.do_ensemble(environment, environment_directory, identifier, int(environment.static_parameters["ensemble_processes"]))
+    else:
+        for i in range(int(environment.num_simulations)):
+            logging.info('  STARTED with run %s',  str(i))
+            # the config files were read when the environment was created
+            # so each simulation starts from what was read, without reading them again
+            environment.reset()
+            # with a seed, each simulation has the same random numbers as in an ensemble
+            runner.seed = None
+            if "seed" in environment.static_parameters:
+                runner.seed = get_run_seed(int(environment.static_parameters["seed"]), i)
+                environment.seed_random(runner.seed)
+            runner.initialize(environment)
+            # the measurement file of the simulation is named after the run, the simulation and its seed
+            runner.simulation = i
+            # do the run
+            runner.do_run(environment)
+            logging.info('  DONE')
 
 #
 # MEASUREMENT AND LOGGING
@@ -36,34 +36,50 @@ if __name__ == '__main__':
     # sys.path.append('src/')
     import logging
 
+    from tests.tests_accounts import TestsAccounts
     from tests.tests_bank import TestsBank
     from tests.tests_central_bank import TestsCentralBank
     from tests.tests_environment import TestsEnvironment
     from tests.tests_firm import TestsFirm
     from tests.tests_helper import TestsHelper
     from tests.tests_household import TestsHousehold
+    from tests.tests_ledger import TestsLedger
     from tests.tests_market import TestsMarket
     from tests.tests_measurement import TestsMeasurement
+    from tests.tests_netting import TestsNetting
     from tests.tests_network import TestsNetwork
     from tests.tests_runner import TestsRunner
     from tests.tests_shock import TestsShock
+    from tests.tests_sweep import TestsSweep
     from tests.tests_transaction import TestsTransaction
     from tests.tests_updater import TestsUpdater
 
+    test_accounts = TestsAccounts()
     test_bank = TestsBank()
     test_central_bank = TestsCentralBank()
     test_environment = TestsEnvironment()
     test_firm = TestsFirm()
     test_helper = TestsHelper()
     test_household = TestsHousehold()
+    test_ledger = TestsLedger()
     test_market = TestsMarket()
     test_measurement = TestsMeasurement()
+    test_netting = TestsNetting()
     test_network = TestsNetwork()
     test_runner = TestsRunner()
     test_shock = TestsShock()
+    test_sweep = TestsSweep()
     test_transaction = TestsTransaction()
     test_updater = TestsUpdater()
 
+    # Tests for Accounts
+    test_accounts.accounts__transactions_by_type(["tests/environments/", "test_all_methods", "tests/log/"])
+    test_accounts.accounts__transactions_by_counterparty(["tests/environments/", "test_all_methods", "tests/log/"])
+    test_accounts.accounts__reindex(["tests/environments/", "test_all_methods", "tests/log/"])
+    test_accounts.accounts__transactions_by_types(["tests/environments/", "test_all_methods", "tests/log/"])
+    test_accounts.accounts__purge(["tests/environments/", "test_all_methods", "tests/log/"])
+    test_accounts.accounts__remove_transactions(["tests/environments/", "test_all_methods", "tests/log/"])
+
     # Tests for Bank
     test_bank.bank__get_identifier(["tests/environments/", "test_all_methods", "tests/log/"])
     test_bank.bank__set_identifier(["tests/environments/", "test_all_methods", "tests/log/"])
@@ -161,13 +177,24 @@ if __name__ == '__main__':
     test_environment.environment__initialize_households_from_files(["tests/environments/", "test_all_methods", "tests/log/"])
     test_environment.environment__initialize_central_bank_from_files(["tests/environments/", "test_all_methods", "tests/log/"])
     test_environment.environment__get_agent_by_id(["tests/environments/", "test_all_methods", "tests/log/"])
+    test_environment.environment__index_agents(["tests/environments/", "test_all_methods", "tests/log/"])
     test_environment.environment__read_transactions_for_banks(["tests/environments/", "test_all_methods", "tests/log/"])
     test_environment.environment__read_transactions_for_firms(["tests/environments/", "test_all_methods", "tests/log/"])
     test_environment.environment__read_transactions_for_households(["tests/environments/", "test_all_methods", "tests/log/"])
     test_environment.environment__read_transactions_for_central_bank(["tests/environments/", "test_all_methods", "tests/log/"])
     test_environment.environment__check_global_transaction_balance(["tests/environments/", "test_all_methods", "tests/log/"])
+    test_environment.environment__track_balances(["tests/environments/", "test_all_methods", "tests/log/"])
+    test_environment.environment__add_aggregate(["tests/environments/", "test_all_methods", "tests/log/"])
     test_environment.environment__check_agent_homogeneity(["tests/environments/", "test_all_methods", "tests/log/"])
     test_environment.environment__update_asset_returns(["tests/environments/", "test_all_methods", "tests/log/"])
+    test_environment.environment__new_transactions(["tests/environments/", "test_all_methods", "tests/log/"])
+    test_environment.environment__accrue_interests(["tests/environments/", "test_all_methods", "tests/log/"])
+    test_environment.environment__reset(["tests/environments/", "test_all_methods", "tests/log/"])
+    test_environment.environment__config_cache(["tests/environments/", "test_all_methods", "tests/log/"])
+    test_environment.environment__parse_config_files(["tests/environments/", "test_all_methods", "tests/log/"])
+    test_environment.environment__population(["tests/environments/", "test_all_methods", "tests/log/"])
+    test_environment.environment__read_transactions_file(["tests/environments/", "test_all_methods", "tests/log/"])
+    test_environment.environment__seed_random(["tests/environments/", "test_all_methods", "tests/log/"])
 
     # Tests for Transaction
     test_transaction.transaction__init(["tests/environments/", "test_all_methods", "tests/log/"])
@@ -190,6 +217,8 @@ if __name__ == '__main__':
     test_transaction.transaction__set_maturity(["tests/environments/", "test_all_methods", "tests/log/"])
     test_transaction.transaction__get_time_of_default(["tests/environments/", "test_all_methods", "tests/log/"])
     test_transaction.transaction__set_time_of_default(["tests/environments/", "test_all_methods", "tests/log/"])
+    test_transaction.transaction__identifiers(["tests/environments/", "test_all_methods", "tests/log/"])
+    test_transaction.transaction__trusted(["tests/environments/", "test_all_methods", "tests/log/"])
     test_transaction.transaction__add_transaction(["tests/environments/", "test_all_methods", "tests/log/"])
     test_transaction.transaction__remove_transaction(["tests/environments/", "test_all_methods", "tests/log/"])
     test_transaction.transaction__print_transaction(["tests/environments/", "test_all_methods", "tests/log/"])
@@ -197,6 +226,7 @@ if __name__ == '__main__':
     test_transaction.transaction__write_transaction(["tests/environments/", "test_all_methods", "tests/log/"])
     test_transaction.transaction__clear_accounts(["tests/environments/", "test_all_methods", "tests/log/"])
     test_transaction.transaction__purge_accounts(["tests/environments/", "test_all_methods", "tests/log/"])
+    test_transaction.transaction__purge_dropped(["tests/environments/", "test_all_methods", "tests/log/"])
 
     # Tests for Helper
     test_helper.helper__initialize_standard_bank(["tests/environments/", "test_all_methods", "tests/log/"])
@@ -207,6 +237,13 @@ if __name__ == '__main__':
     test_helper.helper__ces(["tests/environments/", "test_all_methods", "tests/log/"])
     test_helper.helper__translog(["tests/environments/", "test_all_methods", "tests/log/"])
 
+    # Tests for Ledger
+    test_ledger.ledger__book(["tests/environments/", "test_all_methods", "tests/log/"])
+    test_ledger.ledger__release(["tests/environments/", "test_all_methods", "tests/log/"])
+    test_ledger.ledger__accrue_interests(["tests/environments/", "test_all_methods", "tests/log/"])
+    test_ledger.ledger__purge_accounts(["tests/environments/", "test_all_methods", "tests/log/"])
+    test_ledger.ledger__compact(["tests/environments/", "test_all_methods", "tests/log/"])
+
     # Tests for Market
     test_market.market__get_identifier(["tests/environments/", "test_all_methods", "tests/log/"])
     test_market.market__set_identifier(["tests/environments/", "test_all_methods", "tests/log/"])
@@ -241,6 +278,16 @@ if __name__ == '__main__':
     test_measurement.measurement__write_to_file(["tests/environments/", "test_all_methods", "tests/log/"])
     test_measurement.measurement__close_file(["tests/environments/", "test_all_methods", "tests/log/"])
     test_measurement.measurement__read_xml_config_file(["tests/environments/", "test_all_methods", "tests/log/"])
+    test_measurement.measurement__format(["tests/environments/", "test_all_methods", "tests/log/"])
+    test_measurement.measurement__register_getter(["tests/environments/", "test_all_methods", "tests/log/"])
+    test_measurement.measurement__background_writer(["tests/environments/", "test_all_methods", "tests/log/"])
+    test_measurement.measurement__get_sampled_steps(["tests/environments/", "test_all_methods", "tests/log/"])
+
+    # Tests for Netting
+    test_netting.netting__net(["tests/environments/", "test_all_methods", "tests/log/"])
+    test_netting.netting__net_ledger(["tests/environments/", "test_all_methods", "tests/log/"])
+    test_netting.netting__sum_ledger(["tests/environments/", "test_all_methods", "tests/log/"])
+    test_netting.netting__collapse(["tests/environments/", "test_all_methods", "tests/log/"])
 
     # Tests for Network
     test_network.network__init(["tests/environments/", "test_all_methods", "tests/log/"])
@@ -267,10 +314,18 @@ if __name__ == '__main__':
     test_runner.runner__get_num_sweeps(["tests/environments/", "test_all_methods", "tests/log/"])
     test_runner.runner__set_num_sweeps(["tests/environments/", "test_all_methods", "tests/log/"])
     test_runner.runner__do_run(["tests/environments/", "test_all_methods", "tests/log/"])
+    test_runner.runner__do_run_seeded(["tests/environments/", "test_all_methods", "tests/log/"])
+    test_runner.runner__do_ensemble(["tests/environments/", "test_all_methods", "tests/log/"])
+    test_runner.runner__do_ensemble_npz(["tests/environments/", "test_all_methods", "tests/log/"])
+    test_runner.runner__do_ensemble_shards(["tests/environments/", "test_all_methods", "tests/log/"])
 
     # Tests for Shock
     test_shock.shock__do_shock(["tests/environments/", "test_all_methods", "tests/log/"])
 
+    # Tests for Sweep
+    test_sweep.sweep__get_design(["tests/environments/", "test_all_methods", "tests/log/"])
+    test_sweep.sweep__do_sweep(["tests/environments/", "test_all_methods", "tests/log/"])
+
     # Tests for Updater
     test_updater.updater__get_identifier(["tests/environments/", "test_all_methods", "tests/log/"])
     test_updater.updater__set_identifier(["tests/environments/", "test_all_methods", "tests/log/"])
@@ -18,8 +18,36 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program. If not, see <http://www.gnu.org/licenses/>.
 """
+import csv
+import functools
+
+try:
+    import numpy as np
+except ImportError:  # the panel can still be written in the long format
+    np = None
+
 from abm_template.src.basemeasurement import BaseMeasurement
 from src.updater import Updater
+
+getters = {}  # identifier of an output in the measurement config -> function(measurement) returning its value
+
+# the variables written for every agent if the measurement config gives none
+default_agent_variables = ["direct_losses", "direct_losses", "total_asset_sales", "leverage", "total_assets",
+                           "equity", "debt", "systemicness", "shock_for_agent"]
+
+
+# -------------------------------------------------------------------------
+# register_getter(ident)
+# decorator registering a function of the measurement as the getter of the
+# output with the identifier ident
+# -------------------------------------------------------------------------
+def register_getter(ident):
+    def register(function):
+        getters[ident] = function
+        return function
+    return register
+# -------------------------------------------------------------------------
+
 # -------------------------------------------------------------------------
 #  class Measurement
 # -------------------------------------------------------------------------
@@ -47,6 +75,22 @@ class Measurement(BaseMeasurement):
 
     csv_writer = None
 
+    # the getters of the columns, in the order of the columns
+    column_getters = []
+
+    # the variables written for every agent, and their getters
+    agent_variables = []
+    agent_getters = []
+
+    # the panel of the variables of the agents: None (one wide row per step),
+    # long (a csv with step, agent, variable, value) or memmap (a .npy array
+    # of steps x agents x variables), the file it is written to, and the csv
+    # writer or the array
+    panel = None
+    panel_filename = ""
+    panel_writer = None
+    panel_array = None
+
     #
     #
     # METHODS
@@ -104,10 +148,55 @@ class Measurement(BaseMeasurement):
 
     # -------------------------------------------------------------------------
     # open_file(self)
-    # Opens the file and writes the headers
+    # Opens the file and writes the headers, or opens the panel if the
+    # measurement config asks for one
     # -------------------------------------------------------------------------
     def open_file(self):
-        super(Measurement, self).open_file()
+        if self.panel is None:
+            super(Measurement, self).open_file()
+        else:
+            self.open_panel()
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # open_panel(self)
+    # Opens the panel of the variables of the agents
+    # - long: a csv file with the columns step, agent, variable and value,
+    #   with one row per variable of every agent at every step
+    # - memmap: a .npy file mapped into memory holding an array of
+    #   num_sweeps x agents x variables, preallocated and filled with nan,
+    #   the identifiers of the agents and the variables, in the order of
+    #   the array, are written to a csv file next to it (see get_index_filename)
+    # -------------------------------------------------------------------------
+    def open_panel(self):
+        if self.panel == "long":
+            self.file = open(self.panel_filename, 'w')
+            self.panel_writer = csv.writer(self.file, lineterminator='\n')
+            self.panel_writer.writerow(["step", "agent", "variable", "value"])
+        elif self.panel == "memmap":
+            if np is None:
+                raise ValueError("The memmap panel needs numpy, which could not be imported")
+            shape = (self.runner.num_sweeps, len(self.environment.agents), len(self.agent_variables))
+            self.panel_array = np.lib.format.open_memmap(self.panel_filename, mode='w+', dtype=np.float64, shape=shape)
+            self.panel_array.fill(np.nan)
+            with open(self.get_index_filename(), 'w') as index_file:
+                index_writer = csv.writer(index_file, lineterminator='\n')
+                index_writer.writerow(["axis", "position", "name"])
+                for position, agent in enumerate(self.environment.agents):
+                    index_writer.writerow(["agent", position, agent.identifier])
+                for position, ident in enumerate(self.agent_variables):
+                    index_writer.writerow(["variable", position, ident])
+        else:
+            raise ValueError("Unknown panel: " + self.panel)
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # get_index_filename(self)
+    # Returns the name of the csv file with the agents and variables of a
+    # memmap panel, the panel file with .index.csv instead of .npy
+    # -------------------------------------------------------------------------
+    def get_index_filename(self):
+        return self.panel_filename.split(".npy")[0] + ".index.csv"
     # -------------------------------------------------------------------------
 
     # -------------------------------------------------------------------------
@@ -116,33 +205,36 @@ class Measurement(BaseMeasurement):
     # at the time of calling this method
     # -------------------------------------------------------------------------
     def write_to_file(self):
-        super(Measurement, self).write_to_file()
+        self.csv_writer.writerow([get() for get in self.column_getters])
     # -------------------------------------------------------------------------
 
     # -------------------------------------------------------------------------
-    # 
+    # write_all_to_file(self)
+    # Writes the variables of all agents at the current step, to the panel
+    # if there is one, or else as one wide row starting with the system
+    # vulnerability, followed by the step, the identifier and the
+    # variables of every agent
     # -------------------------------------------------------------------------
     def write_all_to_file(self):
-        # We create an empty row
-        out_row = []
-        # loop over agents and add their properties to the out_row
-
-        out_row.append(self.runner.updater.system_vulnerability)
-
-        for agent in self.environment.agents:
-            out_row.append(self.runner.current_step + 1)
-            out_row.append(agent.identifier)
-            out_row.append(agent.state_variables['direct_losses'])
-            out_row.append(agent.state_variables['direct_losses'])
-            out_row.append(agent.state_variables['total_asset_sales'])
-            out_row.append(agent.state_variables['leverage'])
-            out_row.append(agent.state_variables['total_assets'])
-            out_row.append(agent.parameters['equity'])
-            out_row.append(agent.parameters['debt'])
-            out_row.append(agent.systemicness)
-            out_row.append(agent.state_variables['shock_for_agent'])
-        # Finally we write the line to the output file
-        self.csv_writer.writerow(out_row)
+        step = self.runner.current_step + 1
+        if self.panel == "long":
+            for agent in self.environment.agents:
+                for ident, get in zip(self.agent_variables, self.agent_getters):
+                    self.panel_writer.writerow([step, agent.identifier, ident, get(agent)])
+        elif self.panel == "memmap":
+            for i, agent in enumerate(self.environment.agents):
+                self.panel_array[step - 1, i] = [get(agent) for get in self.agent_getters]
+        else:
+            # We create an empty row
+            out_row = []
+            # loop over agents and add their properties to the out_row
+            out_row.append(self.runner.updater.system_vulnerability)
+            for agent in self.environment.agents:
+                out_row.append(step)
+                out_row.append(agent.identifier)
+                out_row.extend([get(agent) for get in self.agent_getters])
+            # Finally we write the line to the output file
+            self.csv_writer.writerow(out_row)
     # -------------------------------------------------------------------------
 
     # -------------------------------------------------------------------------
@@ -150,7 +242,11 @@ class Measurement(BaseMeasurement):
     # Closes the file so we don't have issues with the disk and the file
     # -------------------------------------------------------------------------
     def close_file(self):
-        super(Measurement, self).close_file()
+        if self.panel == "memmap":
+            self.panel_array.flush()
+            self.panel_array = None
+        else:
+            super(Measurement, self).close_file()
     # -------------------------------------------------------------------------
 
     # -------------------------------------------------------------------------
@@ -177,35 +273,98 @@ class Measurement(BaseMeasurement):
     #     <parameter type='output' column='2' header='Deposits' value='column2_head' ></parameter>
     # </measurement>
     #
+    # The variables written for every agent by write_all_to_file are given,
+    # in their order, with
+    #     <parameter type='agent_variable' value='total_asset_sales'></parameter>
+    # (default_agent_variables if there are none), and they are written to a
+    # panel instead of one wide row per step with
+    #     <parameter type='panel' value='long' filename='Panel.csv'></parameter>
+    # where value is long or memmap, see open_panel, and filename is the
+    # measurement file with _panel.csv (long) or _panel.npy (memmap) if not given
     # -------------------------------------------------------------------------
     def read_xml_config_file(self, config_file_name):
         super(Measurement, self).read_xml_config_file(config_file_name)
+        from xml.etree import ElementTree
+        self.agent_variables = []
+        self.panel = None
+        self.panel_filename = ""
+        for subelement in ElementTree.parse(config_file_name).getroot():
+            if subelement.attrib['type'] == 'agent_variable':
+                self.agent_variables.append(str(subelement.attrib['value']))
+            if subelement.attrib['type'] == 'panel':
+                self.panel = str(subelement.attrib['value'])
+                extension = ".npy" if self.panel == "memmap" else ".csv"
+                self.panel_filename = str(subelement.attrib.get('filename', self.filename.split(".csv")[0] + "_panel" + extension))
+        if len(self.agent_variables) == 0:
+            self.agent_variables = list(default_agent_variables)
+        self.agent_getters = [self.get_agent_getter(ident) for ident in self.agent_variables]
+        self.column_getters = []
+        for i in range(0, len(self.config)):
+            self.column_getters.append(self.get_getter(self.config[i+1][1]))
     # -------------------------------------------------------------------------
 
+    # -------------------------------------------------------------------------
+    # get_getter(self, ident)
+    # Returns a function without arguments returning the value of the output
+    # ident, the registered getter if there is one, or else the wrapper
+    # -------------------------------------------------------------------------
+    def get_getter(self, ident):
+        if ident in getters:
+            return functools.partial(getters[ident], self)
+        return functools.partial(self.wrapper, ident)
+    # -------------------------------------------------------------------------
 
-    def wrapper(self, ident, agent):
-        if ident == "equity":
-            return agent.parameters['equity']
-        if ident == "total_asset_sales":
-            return agent.state_variables['total_asset_sales']
-        if ident == "shock_on_assets":
-            return agent.state_variables['shock_on_assets']
-        if ident == "systemicness":
-            return agent.systemicness
+    # -------------------------------------------------------------------------
+    # get_agent_getter(self, ident)
+    # Returns a function of an agent returning its variable ident, which is
+    # looked up in its parameters, then its state variables, and then its
+    # attributes (e.g. systemicness), and raises if there is no such variable
+    # -------------------------------------------------------------------------
+    def get_agent_getter(self, ident):
+        return functools.partial(get_agent_variable, ident)
+    # -------------------------------------------------------------------------
 
     # -------------------------------------------------------------------------
     # wrapper(self, id)
     # Wrapper for functions returning the desired values to be written
+    # The functions are registered with register_getter below
     # -------------------------------------------------------------------------
     def wrapper(self, ident):
-        if ident == "current_step":
-            return self.runner.current_step + 1
+        if ident in getters:
+            return getters[ident](self)
+    # -------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------
+# get_agent_variable(ident, agent)
+# the variable ident of the agent, see Measurement.get_agent_getter
+# -------------------------------------------------------------------------
+def get_agent_variable(ident, agent):
+    if ident in agent.parameters:
+        return agent.parameters[ident]
+    if ident in agent.state_variables:
+        return agent.state_variables[ident]
+    if hasattr(agent, ident):
+        return getattr(agent, ident)
+    raise ValueError("Agent " + agent.identifier + " has no variable " + ident)
+# -------------------------------------------------------------------------
+
+
+@register_getter("current_step")
+def get_current_step(measurement):
+    return measurement.runner.current_step + 1
+
+
+@register_getter("global TAS")
+def get_global_tas(measurement):
+    return measurement.runner.updater.system_TAS
+
 
-        if ident == "global TAS":
-            return self.runner.updater.system_TAS
+@register_getter("indirect equity losses")
+def get_indirect_equity_losses(measurement):
+    return measurement.runner.updater.system_loss_equity_from_indirect_effects
 
-        if ident == "indirect equity losses":
-            return self.runner.updater.system_loss_equity_from_indirect_effects
 
-        if ident == "AV":
-            return self.runner.updater.system_vulnerability
\ No newline at end of file
+@register_getter("AV")
+def get_av(measurement):
+    return measurement.runner.updater.system_vulnerability
@@ -0,0 +1,200 @@
+
+# -------------------------------------------------------------------------
+#
+#  class TestMeasurement
+#
+# -------------------------------------------------------------------------
+
+
+class TestMeasurement():
+
+
+    def print_info(self, text):
+
+        print(text)
+
+        print('XxxxxxXXxxxxXXXXxx')
+
+
+    def csv_row(self, row):
+
+        import csv
+        import io
+
+        # the row as the csv writer of the measurement writes it
+        out_file = io.BytesIO() if str is bytes else io.StringIO()
+        csv.writer(out_file, lineterminator='\n').writerow(row)
+        return out_file.getvalue()
+
+
+    def initialize(self, args, measurement_config):
+
+        from src.environment import Environment
+        from src.runner import Runner
+
+        #
+        # Initialize Environment and give arguments
+        #
+
+        # we need to give environment config
+        environment_directory = str(args[0])
+        identifier = args[1]
+
+        # calling the Environment Class with the measurement config of the test
+        environment = Environment(environment_directory, identifier)
+        environment.static_parameters['measurement_config'] = measurement_config
+        runner = Runner(environment)
+
+        return environment, runner
+
+
+    def write_all_to_file(self, args):
+
+        import os
+        from src.measurement import Measurement
+
+        environment, runner = self.initialize(args, "configs/measurements/firesales_output.xml")
+
+        #
+        # TESTING
+        #
+
+        text = "Writing one wide row with the default agent variables..\n"
+        self.print_info(text)
+
+        measurement = Measurement(environment, runner)
+        print(measurement.agent_variables)
+        measurement.filename = "measurements/Measurement_firesales_test.csv"
+        measurement.open_file()
+        runner.current_step = 0
+        runner.updater.do_update(environment, 0)
+        measurement.write_all_to_file()
+        measurement.close_file()
+
+        # the row as it was written before the agent variables could be configured
+        out_row = [runner.updater.system_vulnerability]
+        for agent in environment.agents:
+            out_row.append(runner.current_step + 1)
+            out_row.append(agent.identifier)
+            out_row.append(agent.state_variables['direct_losses'])
+            out_row.append(agent.state_variables['direct_losses'])
+            out_row.append(agent.state_variables['total_asset_sales'])
+            out_row.append(agent.state_variables['leverage'])
+            out_row.append(agent.state_variables['total_assets'])
+            out_row.append(agent.parameters['equity'])
+            out_row.append(agent.parameters['debt'])
+            out_row.append(agent.systemicness)
+            out_row.append(agent.state_variables['shock_for_agent'])
+        with open(measurement.filename) as measurement_file:
+            lines = measurement_file.readlines()
+        os.remove(measurement.filename)
+        print("The wide row is the same as before:")
+        print(lines[-1] == self.csv_row(out_row))
+
+
+    def write_all_to_file_long(self, args):
+
+        import csv
+        import os
+        from src.measurement import Measurement
+
+        environment, runner = self.initialize(args, "configs/measurements/firesales_panel_long.xml")
+
+        #
+        # TESTING
+        #
+
+        text = "Writing the agent variables of 2 steps to a long panel..\n"
+        self.print_info(text)
+
+        measurement = Measurement(environment, runner)
+        measurement.open_file()
+        for i in range(2):
+            runner.current_step = i
+            runner.updater.do_update(environment, i)
+            measurement.write_all_to_file()
+        measurement.close_file()
+
+        with open(measurement.panel_filename) as panel_file:
+            rows = list(csv.reader(panel_file))
+        os.remove(measurement.panel_filename)
+        print(rows[0])
+        print(rows[1:4])
+        print("Number of rows, 2 steps x " + str(len(environment.agents)) + " agents x 3 variables:")
+        print(len(rows) - 1)
+        agent = environment.agents[0]
+        print("The last row of the first agent at step 2 is its systemicness:")
+        expected = self.csv_row([2, agent.identifier, "systemicness", agent.systemicness])
+        print(rows[len(environment.agents) * 3 + 3] == next(csv.reader([expected])))
+
+
+    def write_all_to_file_memmap(self, args):
+
+        import csv
+        import os
+        from src.measurement import Measurement, np
+
+        if np is None:
+            text = "Skipping the memmap panel, numpy could not be imported..\n"
+            self.print_info(text)
+            return
+
+        environment, runner = self.initialize(args, "configs/measurements/firesales_panel_memmap.xml")
+
+        #
+        # TESTING
+        #
+
+        text = "Writing the agent variables of every step to a memmap panel..\n"
+        self.print_info(text)
+
+        measurement = Measurement(environment, runner)
+        measurement.open_file()
+        for i in range(runner.num_sweeps):
+            runner.current_step = i
+            runner.updater.do_update(environment, i)
+            measurement.write_all_to_file()
+        measurement.close_file()
+
+        panel = np.load(measurement.panel_filename)
+        with open(measurement.get_index_filename()) as index_file:
+            index = list(csv.reader(index_file))
+        os.remove(measurement.panel_filename)
+        os.remove(measurement.get_index_filename())
+        print("Shape of the panel, num_sweeps x agents x variables:")
+        print(panel.shape)
+        print(panel.shape == (runner.num_sweeps, len(environment.agents), 3))
+        print("Index of the panel:")
+        print(index[0])
+        print([row for row in index if row[0] == "variable"])
+        print("The agents of the index are in the order of the panel:")
+        print([row[2] for row in index if row[0] == "agent"] == [agent.identifier for agent in environment.agents])
+        agent = environment.agents[-1]
+        print("The last step of the last agent holds its variables:")
+        print(list(panel[-1, -1]) == [agent.state_variables['total_assets'], agent.parameters['equity'], agent.systemicness])
+
+
+    def get_agent_variable(self, args):
+
+        from src.measurement import get_agent_variable
+
+        environment, runner = self.initialize(args, "configs/measurements/firesales_output.xml")
+
+        #
+        # TESTING
+        #
+
+        text = "Looking up the variables of an agent..\n"
+        self.print_info(text)
+
+        agent = environment.agents[0]
+        agent.state_variables['equity'] = -1.0
+        print("A parameter is found before a state variable of the same name:")
+        print(get_agent_variable('equity', agent) == agent.parameters['equity'])
+        print("An unknown variable raises ValueError:")
+        try:
+            get_agent_variable('no_such_variable', agent)
+            print(False)
+        except ValueError as error:
+            print(error)
+            print(True)
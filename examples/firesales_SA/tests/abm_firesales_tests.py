@@ -16,6 +16,7 @@ if __name__ == '__main__':
     
     from src.environment import Environment
     from TestAgent import TestAgent
+    from TestMeasurement import TestMeasurement
 
 
     test_agent_object = TestAgent()  
@@ -23,3 +24,12 @@ if __name__ == '__main__':
     test_agent_object.print_info("This tests methods for agent class")
 
     test_agent_object.get_parameters_from_file(["configs/environment/", "test_firesales"])
+
+    test_measurement_object = TestMeasurement()
+
+    test_measurement_object.print_info("This tests methods for measurement class")
+
+    test_measurement_object.write_all_to_file(["configs/environment/", "test_firesales"])
+    test_measurement_object.write_all_to_file_long(["configs/environment/", "test_firesales"])
+    test_measurement_object.write_all_to_file_memmap(["configs/environment/", "test_firesales"])
+    test_measurement_object.get_agent_variable(["configs/environment/", "test_firesales"])
@@ -0,0 +1,387 @@
+#!/usr/bin/env python
+# [SublimeLinter pep8-max-line-length:150]
+# -*- coding: utf-8 -*-
+
+"""
+black_rhino is a multi-agent simulator for financial network analysis
+Copyright (C) 2016 Co-Pierre Georg (co-pierre.georg@keble.ox.ac.uk)
+Pawel Fiedor (pawel@fiedor.eu)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3 of the License.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from collections import OrderedDict
+
+# ============================================================================
+#
+# class Accounts
+#
+# ============================================================================
+
+
+class Accounts(object):
+    #
+    #
+    # VARIABLES
+    #
+    #
+
+    owner = None  # agent whose books these are
+    transactions = OrderedDict()  # all transactions of the agent -> their position, in the order they were added
+    count = 0  # transactions added so far, the position of the next one
+    listed = None  # the transactions as a list for access by position, None once the books change
+    type_index = {}  # type_ -> transactions of that type
+    asset_index = {}  # asset -> transactions of that asset
+    counterparty_index = {}  # counterparty -> transactions with that counterparty
+    type_counterparty_index = {}  # (type_, counterparty) -> transactions of that type with that counterparty
+    keys = {}  # transaction -> (type_, asset, counterparty, side, sequence) it is currently indexed under
+    balances = None  # type_ -> [holdings, checksum, strays] shared by the accounts of all agents if balances are tracked
+    aggregates = None  # (type_, side) -> terms [(total, sign)] of the aggregates of the environment the owner is in
+
+    #
+    #
+    # CODE
+    #
+    #
+
+    # -------------------------------------------------------------------------
+    # __init__(owner)
+    # the accounts behave like the list of transactions agents used to keep,
+    # iteration order is the order in which transactions were added, but
+    # they additionally keep secondary indexes by type_, asset and
+    # counterparty so that lookups do not need to scan the whole books
+    # the index buckets hold the transactions themselves, so amounts are
+    # always read live and do not need reindexing when they change
+    # the books and the buckets are ordered hashes of transactions, so
+    # membership checks and removals take constant time, the books map
+    # every transaction to its position, and the buckets are kept in the
+    # order of the books, so that sums over them add up in the same order
+    # as sums over the whole books
+    # if the environment tracks balances, balances is a dictionary shared by
+    # the accounts of all agents, see add_to_balances
+    # if the environment keeps aggregates about the owner, aggregates holds
+    # their terms, see add_to_aggregates
+    # -------------------------------------------------------------------------
+    def __init__(self, owner):
+        self.owner = owner
+        self.transactions = OrderedDict()
+        self.count = 0
+        self.listed = None
+        self.type_index = {}
+        self.asset_index = {}
+        self.counterparty_index = {}
+        self.type_counterparty_index = {}
+        self.keys = {}
+        self.balances = None
+        self.aggregates = None
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # functions making the accounts behave like a list of transactions
+    # -------------------------------------------------------------------------
+    def __iter__(self):
+        return iter(self.transactions)
+
+    def __len__(self):
+        return len(self.transactions)
+
+    # access by position goes through a list of the transactions, which is
+    # made again only after the books change, so looping over positions
+    # is not quadratic
+    def __getitem__(self, index):
+        if self.listed is None:
+            self.listed = list(self.transactions)
+        return self.listed[index]
+
+    def __contains__(self, transaction):
+        return transaction in self.keys
+
+    def __str__(self):
+        return str(list(self.transactions))
+
+    def __repr__(self):
+        return repr(list(self.transactions))
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # get_counterparty(transaction)
+    # returns the other side of the transaction from the owner's perspective
+    # transactions of the owner with itself have the owner as counterparty
+    # -------------------------------------------------------------------------
+    def get_counterparty(self, transaction):
+        if transaction.from_ is self.owner:
+            return transaction.to
+        else:
+            return transaction.from_
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # append(transaction)
+    # adds the transaction to the books and to all the indexes
+    # -------------------------------------------------------------------------
+    def append(self, transaction):
+        if transaction not in self.transactions:
+            self.transactions[transaction] = self.count
+            self.count = self.count + 1
+            self.listed = None
+            self.add_to_indexes(transaction)
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # extend(transactions)
+    # adds a number of transactions to the books and to all the indexes
+    # -------------------------------------------------------------------------
+    def extend(self, transactions):
+        for transaction in transactions:
+            self.append(transaction)
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # remove(transaction)
+    # removes the transaction from the books and from all the indexes
+    # raises ValueError if the transaction is not on the books, like list
+    # -------------------------------------------------------------------------
+    def remove(self, transaction):
+        if transaction not in self.transactions:
+            raise ValueError("Transaction is not on the books of the agent.")
+        self.discard(transaction)
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # discard(transaction)
+    # removes the transaction from the books and from all the indexes
+    # if it is on the books, returns whether anything was removed
+    # -------------------------------------------------------------------------
+    def discard(self, transaction):
+        if transaction in self.transactions:
+            del self.transactions[transaction]
+            self.listed = None
+            self.remove_from_indexes(transaction)
+            return True
+        return False
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # discard_all(transactions)
+    # removes a number of transactions from the books in one pass
+    # transactions which are not on the books are skipped
+    # -------------------------------------------------------------------------
+    def discard_all(self, transactions):
+        for transaction in transactions:
+            self.discard(transaction)
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # pop(index)
+    # removes and returns the transaction at the given position
+    # -------------------------------------------------------------------------
+    def pop(self, index=-1):
+        transaction = self[index]
+        self.discard(transaction)
+        return transaction
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # add_to_indexes(transaction)
+    # files the transaction under its current type_, asset and counterparty
+    # -------------------------------------------------------------------------
+    def add_to_indexes(self, transaction):
+        counterparty = self.get_counterparty(transaction)
+        # +1 on the books of from_, -1 on the books of to, 0 if they are the same
+        # and None if the owner is neither of them
+        if transaction.from_ is not self.owner and transaction.to is not self.owner:
+            side = None
+        else:
+            side = (transaction.from_ is self.owner) - (transaction.to is self.owner)
+        key = (transaction.type_, transaction.asset, counterparty, side, transaction.sequence)
+        self.keys[transaction] = key
+        self.add_to_balances(key, 1)
+        if self.aggregates is not None:
+            self.add_to_aggregates(transaction, key[0], side, 1.0)
+        self.add_to_bucket(self.type_index, key[0], transaction)
+        self.add_to_bucket(self.asset_index, key[1], transaction)
+        self.add_to_bucket(self.counterparty_index, key[2], transaction)
+        self.add_to_bucket(self.type_counterparty_index, (key[0], key[2]), transaction)
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # add_to_bucket(index, bucket_key, transaction)
+    # files the transaction in a bucket of an index, new transactions go
+    # at the end, a transaction refiled after a change (see reindex) which
+    # is further up the books than the end of the bucket has the bucket
+    # put back in the order of the books
+    # -------------------------------------------------------------------------
+    def add_to_bucket(self, index, bucket_key, transaction):
+        bucket = index.setdefault(bucket_key, OrderedDict())
+        if len(bucket) > 0 and self.transactions[next(reversed(bucket))] > self.transactions[transaction]:
+            bucket[transaction] = None
+            index[bucket_key] = OrderedDict((other, None) for other in sorted(bucket, key=self.transactions.get))
+        else:
+            bucket[transaction] = None
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # remove_from_indexes(transaction)
+    # takes the transaction out of the buckets it was filed under
+    # empty buckets are dropped so the indexes don't grow with old keys
+    # -------------------------------------------------------------------------
+    def remove_from_indexes(self, transaction):
+        key = self.keys.pop(transaction)
+        self.add_to_balances(key, -1)
+        if self.aggregates is not None:
+            self.add_to_aggregates(transaction, key[0], key[3], -1.0)
+        for index, bucket_key in ((self.type_index, key[0]),
+                                  (self.asset_index, key[1]),
+                                  (self.counterparty_index, key[2]),
+                                  (self.type_counterparty_index, (key[0], key[2]))):
+            bucket = index[bucket_key]
+            del bucket[transaction]
+            if len(bucket) == 0:
+                del index[bucket_key]
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # add_to_balances(key, sign)
+    # keeps a running checksum of the transactions of each type on the books
+    # every transaction put on the books (sign 1, -1 when taken off) adds
+    # its side (+1 for from_, -1 for to) to the number of holdings, and its
+    # side times its sequence to the checksum, so both are zero for each
+    # type as long as every transaction is on the books of both parties,
+    # the amounts need no checksum as both parties hold the same transaction
+    # transactions on the books of an agent which is neither of their
+    # parties are counted as strays, which should be zero as well
+    # the sequence is used rather than the identifier, which can be set
+    # to anything, e.g. a string, while the sequence is always an integer
+    # -------------------------------------------------------------------------
+    def add_to_balances(self, key, sign):
+        if self.balances is not None:
+            side = key[3]
+            if side is None:
+                balance = self.balances.setdefault(key[0], [0, 0, 0])
+                balance[2] = balance[2] + sign
+            elif side != 0:
+                balance = self.balances.setdefault(key[0], [0, 0, 0])
+                balance[0] = balance[0] + sign * side
+                balance[1] = balance[1] + sign * side * key[4]
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # add_to_aggregates(transaction, type_, side, sign)
+    # adds (sign 1.0) or takes off (sign -1.0) the amount of a transaction
+    # put on or taken off the books to the aggregates of the environment
+    # which have a term for its type_ and the side of the owner (see
+    # Environment.add_aggregate), and attaches these terms to the
+    # transaction or detaches them, so that the transaction can add the
+    # changes of its amount to the aggregates itself
+    # -------------------------------------------------------------------------
+    def add_to_aggregates(self, transaction, type_, side, sign):
+        terms = self.aggregates.get((type_, side))
+        if terms is not None:
+            amount = sign * transaction.amount
+            for total, term_sign in terms:
+                total[0] = total[0] + term_sign * amount
+            if sign > 0:
+                self.attach_terms(transaction, terms)
+            else:
+                transaction.aggregates = [other for other in transaction.aggregates if other is not terms] or None
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # attach_terms(transaction, terms)
+    # attaches terms of aggregates to the transaction, once
+    # -------------------------------------------------------------------------
+    def attach_terms(self, transaction, terms):
+        if transaction.aggregates is None:
+            transaction.aggregates = [terms]
+        elif not any(other is terms for other in transaction.aggregates):
+            transaction.aggregates.append(terms)
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # reindex(transaction)
+    # refiles a transaction whose type_, asset, from_ or to changed while
+    # it was on the books, does nothing for transactions not on the books
+    # -------------------------------------------------------------------------
+    def reindex(self, transaction):
+        if transaction in self.keys:
+            self.remove_from_indexes(transaction)
+            self.add_to_indexes(transaction)
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # purge()
+    # removes all transactions with amount of zero (or less) from the books
+    # -------------------------------------------------------------------------
+    def purge(self):
+        to_delete = []
+        for transaction in self.transactions:
+            if transaction.amount <= 0.0:
+                to_delete.append(transaction)
+        self.discard_all(to_delete)
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # lookups
+    # these return a new list, so the books can be changed while the
+    # result is looped over, the order is the order on the books
+    # -------------------------------------------------------------------------
+    def transactions_by_type(self, type_):
+        return list(self.type_index.get(type_, ()))
+
+    def transactions_by_asset(self, asset):
+        return list(self.asset_index.get(asset, ()))
+
+    def transactions_by_counterparty(self, counterparty):
+        return list(self.counterparty_index.get(counterparty, ()))
+
+    def transactions_by_type_and_counterparty(self, type_, counterparty):
+        return list(self.type_counterparty_index.get((type_, counterparty), ()))
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # transactions_by_types(types, counterparty=None)
+    # returns the transactions of any of the types, with the counterparty
+    # if one is given, merged in the order of the books, so that a loop
+    # over them visits the transactions as a loop over the whole books
+    # checking their type would
+    # -------------------------------------------------------------------------
+    def transactions_by_types(self, types, counterparty=None):
+        found = []
+        for type_ in types:
+            if counterparty is None:
+                found.extend(self.type_index.get(type_, ()))
+            else:
+                found.extend(self.type_counterparty_index.get((type_, counterparty), ()))
+        if len(types) > 1:
+            found.sort(key=self.transactions.get)
+        return found
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # volume_by_type(type_)
+    # returns the value of all transactions of a given type
+    # -------------------------------------------------------------------------
+    def volume_by_type(self, type_):
+        volume = 0.0
+        for transaction in self.type_index.get(type_, ()):
+            volume = volume + float(transaction.amount)
+        return volume
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # num_transactions_by_type(type_)
+    # returns the number of transactions of a given type
+    # -------------------------------------------------------------------------
+    def num_transactions_by_type(self, type_):
+        return float(len(self.type_index.get(type_, ())))
+    # -------------------------------------------------------------------------
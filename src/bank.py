@@ -22,6 +22,7 @@ along with this program. If not, see <http://www.gnu.org/licenses/>.
 
 import logging
 from abm_template.src.baseagent import BaseAgent
+from src.accounts import Accounts
 
 # ============================================================================
 #
@@ -99,7 +100,7 @@ class Bank(BaseAgent):
         self.identifier = ""  # identifier of the specific bank
         self.parameters = {}  # parameters of the specific bank
         self.state_variables = {}  # state variables of the specific bank
-        self.accounts = []  # all accounts of a bank (filled with transactions)
+        self.accounts = Accounts(self)  # all accounts of a bank (filled with transactions)
         # DO NOT EVER ASSIGN PARAMETERS BY HAND AS DONE BELOW IN PRODUCTION CODE
         # ALWAYS READ THE PARAMETERS FROM CONFIG FILES
         # OR USE THE FUNCTIONS FOR SETTING / CHANGING VARIABLES
@@ -162,7 +163,7 @@ class Bank(BaseAgent):
     # returns the value of all transactions of a given type
     # -------------------------------------------------------------------------
     def get_account(self,  type_):
-        return super(Bank, self).get_account(type_)
+        return self.accounts.volume_by_type(type_)
     # -------------------------------------------------------------------------
 
     # -------------------------------------------------------------------------
@@ -170,7 +171,7 @@ class Bank(BaseAgent):
     # returns the number of transactions of a given type
     # -------------------------------------------------------------------------
     def get_account_num_transactions(self,  type_):
-        return super(Bank, self).get_account_num_transactions(type_)
+        return self.accounts.num_transactions_by_type(type_)
     # -------------------------------------------------------------------------
 
     # -------------------------------------------------------------------------
@@ -22,6 +22,7 @@ along with this program. If not, see <http://www.gnu.org/licenses/>.
 
 import logging
 from abm_template.src.baseagent import BaseAgent
+from src.accounts import Accounts
 
 # ============================================================================
 #
@@ -99,7 +100,7 @@ class CentralBank(BaseAgent):
         self.identifier = ""  # identifier of the central bank
         self.parameters = {}  # parameters of the central bank
         self.state_variables = {}  # state variables of the central bank
-        self.accounts = []  # all accounts of the bank (filled with transactions)
+        self.accounts = Accounts(self)  # all accounts of the bank (filled with transactions)
         # DO NOT EVER ASSIGN PARAMETERS BY HAND AS DONE BELOW IN PRODUCTION CODE
         # ALWAYS READ THE PARAMETERS FROM CONFIG FILES
         # OR USE THE FUNCTIONS FOR SETTING / CHANGING VARIABLES
@@ -156,7 +157,7 @@ class CentralBank(BaseAgent):
     # returns the value of all transactions of a given type
     # -------------------------------------------------------------------------
     def get_account(self,  type_):
-        return super(CentralBank, self).get_account(type_)
+        return self.accounts.volume_by_type(type_)
     # -------------------------------------------------------------------------
 
     # -------------------------------------------------------------------------
@@ -164,7 +165,7 @@ class CentralBank(BaseAgent):
     # returns the number of transactions of a given type
     # -------------------------------------------------------------------------
     def get_account_num_transactions(self,  type_):
-        return super(CentralBank, self).get_account_num_transactions(type_)
+        return self.accounts.num_transactions_by_type(type_)
     # -------------------------------------------------------------------------
 
     # -------------------------------------------------------------------------
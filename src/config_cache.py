@@ -0,0 +1,256 @@
+#!/usr/bin/env python
+# [SublimeLinter pep8-max-line-length:150]
+# -*- coding: utf-8 -*-
+
+"""
+black_rhino is a multi-agent simulator for financial network analysis
+Copyright (C) 2016 Co-Pierre Georg (co-pierre.georg@keble.ox.ac.uk)
+Pawel Fiedor (pawel@fiedor.eu)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3 of the License.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+from xml.etree import ElementTree
+
+# ============================================================================
+#
+# class ConfigCache
+#
+# ============================================================================
+
+
+class ConfigCache(object):
+    #
+    #
+    # VARIABLES
+    #
+    #
+
+    directory = ""  # directory the cache files are kept in
+    entries = {}  # config directory -> {config file: ((mtime, size), {name: value})}
+    changed = set()  # config directories with entries not saved yet
+
+    #
+    #
+    # CODE
+    #
+    #
+
+    # -------------------------------------------------------------------------
+    # __init__(directory)
+    # keeps what was read from config files in one pickle per directory of
+    # config files, stored in the given directory, the values read from a
+    # file are kept under its path together with its mtime and size, and
+    # are only used while the file has the same mtime and size
+    # the cache is kept outside the config directories, as these are
+    # expected to hold config files only
+    # -------------------------------------------------------------------------
+    def __init__(self, directory):
+        self.directory = directory
+        self.entries = {}
+        self.changed = set()
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # get_cache_filename(config_directory)
+    # returns the name of the cache file for a directory of config files,
+    # named by a hash of the bytes of its path, paths which are not bytes
+    # already (unicode under python 2, str under python 3) are encoded first
+    # -------------------------------------------------------------------------
+    def get_cache_filename(self, config_directory):
+        if not isinstance(config_directory, bytes):
+            config_directory = config_directory.encode("utf-8")
+        return os.path.join(self.directory, hashlib.md5(config_directory).hexdigest() + ".pickle")
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # load(config_directory)
+    # returns the entries for a directory of config files, reading them from
+    # the cache file the first time, a missing or unreadable cache file
+    # gives no entries
+    # -------------------------------------------------------------------------
+    def load(self, config_directory):
+        if config_directory not in self.entries:
+            entries = {}
+            try:
+                with open(self.get_cache_filename(config_directory), "rb") as cache_file:
+                    entries = pickle.load(cache_file)
+            except Exception:
+                logging.info("    no config cache found for %s", config_directory)
+            self.entries[config_directory] = entries
+        return self.entries[config_directory]
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # save()
+    # writes the entries which changed to their cache files, each is written
+    # to a temporary file first so a cache file is never half written
+    # -------------------------------------------------------------------------
+    def save(self):
+        if len(self.changed) > 0 and not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+        for config_directory in sorted(self.changed):
+            cache_filename = self.get_cache_filename(config_directory)
+            with open(cache_filename + ".tmp", "wb") as cache_file:
+                pickle.dump(self.entries[config_directory], cache_file, 2)
+            if os.path.exists(cache_filename):
+                os.remove(cache_filename)
+            os.rename(cache_filename + ".tmp", cache_filename)
+        self.changed = set()
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # get(filename, name)
+    # returns the value kept for the config file under name, or None if there
+    # is none or the file changed since it was kept
+    # -------------------------------------------------------------------------
+    def get(self, filename, name):
+        filename = os.path.abspath(filename)
+        entry = self.load(os.path.dirname(filename)).get(filename)
+        if entry is None or entry[0] != self.get_key(filename):
+            return None
+        return entry[1].get(name)
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # put(filename, name, value)
+    # keeps the value read from the config file under name, forgetting
+    # all values kept for an earlier version of the file
+    # -------------------------------------------------------------------------
+    def put(self, filename, name, value):
+        filename = os.path.abspath(filename)
+        config_directory = os.path.dirname(filename)
+        entries = self.load(config_directory)
+        key = self.get_key(filename)
+        if filename not in entries or entries[filename][0] != key:
+            entries[filename] = (key, {})
+        entries[filename][1][name] = value
+        self.changed.add(config_directory)
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # get_key(filename)
+    # returns the mtime and size of the file, which tell if it changed
+    # -------------------------------------------------------------------------
+    def get_key(self, filename):
+        stat = os.stat(filename)
+        return (stat.st_mtime, stat.st_size)
+    # -------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------
+# iterate_config_file(filename)
+# yields the root element of an agent's config file as soon as it is
+# read, and then each element under the root once it is read completely,
+# elements are cleared when the next one is asked for, so that large
+# config files are read with bounded memory
+# -------------------------------------------------------------------------
+def iterate_config_file(filename):
+    with open(filename, "rb") as config_file:
+        root = None
+        depth = 0
+        for event, element in ElementTree.iterparse(config_file, events=("start", "end")):
+            if event == "start":
+                depth = depth + 1
+                if root is None:
+                    root = element
+                    yield element
+            else:
+                depth = depth - 1
+                if depth == 1:
+                    yield element
+                    root.clear()
+# -------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------
+# read_config_agent(filename)
+# returns the identifier and parameters (in file order) in an agent's
+# config file, as kept in the config cache (there are no state variables
+# in the config files)
+# -------------------------------------------------------------------------
+def read_config_agent(filename):
+    return read_config_file(filename, False)["agent"]
+# -------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------
+# read_config_transactions(filename)
+# yields the transactions in an agent's config file by the ids of their
+# parties, read the same way the agents read them, as they are parsed
+# -------------------------------------------------------------------------
+def read_config_transactions(filename):
+    for element in iterate_config_file(filename):
+        if element.tag == 'transaction':
+            yield get_config_transaction(element)
+# -------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------
+# get_config_transaction(element)
+# returns a <transaction> element of a config file by the ids of its
+# parties, with the fields converted the same way the agents do
+# -------------------------------------------------------------------------
+def get_config_transaction(element):
+    return (str(element.attrib['type']), str(element.attrib['asset']),
+            str(element.attrib['from']), str(element.attrib['to']),
+            float(element.attrib['amount']), float(element.attrib['interest']),
+            float(element.attrib['maturity']), float(element.attrib['time_of_default']))
+# -------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------
+# read_config_file(filename, transactions=True, batch=None)
+# reads an agent's config file in one pass into what the config cache
+# keeps for it: the identifier and parameters of the agent, read the same
+# way the agents read them, and if asked for its transactions, and raises
+# if the file cannot be parsed
+# with a batch, the transactions are None if there are batch or more of
+# them, as such files are read in batches rather than kept in memory
+# -------------------------------------------------------------------------
+def read_config_file(filename, transactions=True, batch=None):
+    identifier = None
+    parameters = []
+    rows = [] if transactions else None
+    for element in iterate_config_file(filename):
+        if identifier is None:
+            identifier = element.attrib['identifier']
+        elif element.tag == 'parameter':
+            parameters.append((element.attrib['name'], float(element.attrib['value'])))
+        elif element.tag == 'transaction' and rows is not None:
+            rows.append(get_config_transaction(element))
+            if batch is not None and len(rows) >= batch:
+                rows = None
+    return {"agent": (identifier, parameters, None), "transactions": rows}
+# -------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------
+# parse_config_file(job)
+# reads an agent's config file, job is (filename, batch), with the
+# transactions only if there are fewer than batch of them, see
+# read_config_file, or returns None if it cannot be parsed,
+# this is a function rather than a method so it can be sent to the
+# processes of a multiprocessing pool
+# -------------------------------------------------------------------------
+def parse_config_file(job):
+    filename, batch = job
+    try:
+        return read_config_file(filename, True, batch)
+    except Exception:
+        return None
+# -------------------------------------------------------------------------
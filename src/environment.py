@@ -20,10 +20,16 @@ You should have received a copy of the GNU General Public License
 along with this program. If not, see <http://www.gnu.org/licenses/>.
 """
 
+import copy
 import logging
 import os
+import random
+from collections import OrderedDict
 from abm_template.src.baseconfig import BaseConfig
 from src.network import Network
+from src.template import Template
+from src.config_cache import ConfigCache, parse_config_file, read_config_agent, read_config_transactions, iterate_config_file
+from src.population import Population
 import networkx as nx
 
 
@@ -45,11 +51,25 @@ class Environment(BaseConfig):
     firms = []  # a list containing all firms (instances of class Firm)
     central_bank = []  # to be consistent there's a list of central banks, but will consist of just one instance of class CentralBank
     agents = []
+    agent_index = {}  # identifier -> (agent, list of agents, position in it), rebuilt whenever the lists of agents change
+    agent_index_signature = None  # the lists of agents and their lengths when agent_index was built
+    duplicate_identifiers = set()  # identifiers shared by more than one agent
 
     assets = {}  # dictionary of assets: "name": ["expected return", "return volatility", "current returns"]
     shocks = []  # list of shocks: [sweep_from, sweep_to, kind_of_shock]
 
     network = Network("")  # network of transaction
+    template = None  # copy of the environment as read from the config files, used by reset
+    random = random  # random numbers of the simulation, the random module unless the environment is seeded
+    config_cache = None  # cache of what was read from the agents' config files, if config_cache is set in the config
+    transaction_batch = 10000  # number of transactions read from a config file that are added at once
+    parsed_configs = {}  # config file -> what was parsed from it by a pool of processes
+    ledger = None  # columnar ledger of all transactions, if columnar_ledger is set in the config
+    dropped = OrderedDict()  # transactions whose amount was set to zero (or less) without a ledger, to be purged
+    balances = None  # running checksums of transactions by type, if track_balances is set in the config
+    aggregates = {}  # name -> [total] of the aggregates kept up to date as transactions change (see add_aggregate)
+    aggregate_definitions = []  # (name, type_, role, agent_type, sign) of each term of the aggregates
+    trusted = False  # if True, setters of transactions skip checking the values (used by the updater)
 
     static_parameters = {}  # a dictionary containing all static parameters (with a fixed value)
     variable_parameters = {}  # a dictionary containing all variable parameters (with a range of possible values)
@@ -72,6 +92,18 @@ class Environment(BaseConfig):
     static_parameters["central_bank_directory"] = ""  # directory containing central bank config file
 
     static_parameters["max_leverage_ratio"] = ""  # max allowed leverage ratio of the banks (policy bound)
+    # optionally, static_parameters["columnar_ledger"] = 1 keeps the amounts, interests, maturities
+    # and times of default of all transactions in numpy columns of a Ledger (see src/ledger.py)
+    # and static_parameters["ledger_compaction"] sets the share of its slots which may be free before
+    # the ledger is compacted (0.5 by default)
+    # optionally, static_parameters["track_balances"] = 1 keeps running checksums of the transactions
+    # on the agents' books, so that check_global_transaction_balance takes constant time
+    # optionally, static_parameters["track_aggregates"] = 1 lets the measurement keep the totals of
+    # its outputs as aggregates of the environment (see add_aggregate) instead of summing the books
+    # optionally, static_parameters["config_cache"] = "directory/" keeps what was read from the agents'
+    # config files in that directory, so that only files which changed are read again
+    # optionally, static_parameters["config_processes"] = n parses the agents' config files in a pool
+    # of n processes before the agents are made from them
 
     #
     #
@@ -210,10 +242,78 @@ class Environment(BaseConfig):
     # -------------------------------------------------------------------------
     # get_agent_by_id
     # returns an agent based on the id
+    # the agents are looked up in agent_index, which is rebuilt if agents
+    # were added to or removed from the lists of agents since it was built,
+    # or if the agent found is no longer in its place in the lists (it was
+    # replaced by another agent) or does not have the id anymore, or none
+    # is found, as ids may be set after agents are added, as in the tests
+    # like the scan over all agents this raises LookupError if no agent
+    # or more than one agent has the id
     # -------------------------------------------------------------------------
     def get_agent_by_id(self, ident):
         # self.agents = [self.banks, self.firms, self.households]
-        return super(Environment, self).get_agent_by_id(ident)
+        if self.agent_index_signature != self.get_agent_index_signature():
+            self.index_agents()
+        agent = self.get_indexed_agent(ident)
+        if agent is None:
+            self.index_agents()
+            agent = self.get_indexed_agent(ident)
+        if ident in self.duplicate_identifiers:
+            raise LookupError('At least two agents have the same ID.')
+        if agent is None:
+            raise LookupError('No agents have the provided ID.')
+        return agent
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # get_indexed_agent
+    # returns the agent with the id in agent_index, if it is still in its
+    # place in the lists of agents and still has the id, None otherwise
+    # -------------------------------------------------------------------------
+    def get_indexed_agent(self, ident):
+        if ident not in self.agent_index:
+            return None
+        agent, agents, position = self.agent_index[ident]
+        if position < len(agents) and agents[position] is agent and agent.identifier == ident:
+            return agent
+        return None
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # index_agents
+    # builds agent_index from all agents, in the order of agents_generator,
+    # with the list of each agent and its position in it, so an agent
+    # replaced in its list is noticed, and notes ids used more than once
+    # changing the id of an agent to that of another agent is not noticed
+    # by get_agent_by_id, so the agents should be reindexed after that
+    # -------------------------------------------------------------------------
+    def index_agents(self):
+        if self.agents is None:
+            raise LookupError('There are no agents to iterate over.')
+        self.agent_index = {}
+        self.duplicate_identifiers = set()
+        for number, agents in enumerate(self.agents):
+            # an agent not in a list of agents is in its place in self.agents
+            if isinstance(agents, list):
+                places = [(agent, agents, position) for position, agent in enumerate(agents)]
+            else:
+                places = [(agents, self.agents, number)]
+            for place in places:
+                if place[0].identifier in self.agent_index:
+                    self.duplicate_identifiers.add(place[0].identifier)
+                else:
+                    self.agent_index[place[0].identifier] = place
+        self.agent_index_signature = self.get_agent_index_signature()
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # get_agent_index_signature
+    # returns the lists of agents and their lengths, which change
+    # whenever agents are added or removed
+    # -------------------------------------------------------------------------
+    def get_agent_index_signature(self):
+        return (id(self.agents),) + tuple((id(agents), len(agents) if isinstance(agents, list) else -1)
+                                          for agents in self.agents)
     # -------------------------------------------------------------------------
 
     # -------------------------------------------------------------------------
@@ -302,6 +402,24 @@ class Environment(BaseConfig):
         self.read_xml_config_file(environment_filename)
         logging.info("  environment file read: %s",  environment_filename)
 
+        # if a seed is given, the simulation draws from its own stream of random numbers
+        self.random = random
+        if "seed" in self.static_parameters:
+            self.seed_random(int(self.static_parameters["seed"]))
+
+        # the aggregates are added by the users of the environment, e.g. the measurement
+        self.aggregate_definitions = []
+
+        # if asked for, use what was kept from reading the agents' config files before
+        self.config_cache = None
+        if self.static_parameters.get("config_cache", ""):
+            self.config_cache = ConfigCache(str(self.static_parameters["config_cache"]))
+
+        # if asked for, parse the agents' config files in a pool of processes first
+        self.parsed_configs = {}
+        if int(self.static_parameters.get("config_processes", 1)) > 1:
+            self.parse_config_files(int(self.static_parameters["config_processes"]))
+
         # then read in all the banks
         if (self.bank_directory != ""):
             if (self.bank_directory != "none"):  # none is used for tests only
@@ -334,12 +452,8 @@ class Environment(BaseConfig):
         else:
             logging.error("ERROR: no central_bank_directory given in %s\n",  environment_filename)
 
-        # add agents to the list of all agents
-        self.agents = [self.banks, self.firms, self.households, self.central_bank]
-
-        # initialize the network
-        self.network.identifier = self.identifier
-        self.network.initialize_networks(self)
+        # set up the books of the agents
+        self.initialize_books()
 
         # then, initialize transactions from the config files for banks
         if (self.bank_directory != ""):
@@ -373,8 +487,73 @@ class Environment(BaseConfig):
         else:
             logging.error("ERROR: no central_bank_directory given in %s\n",  environment_filename)
 
+        # finally, keep what was read so later simulations can start from it
+        self.template = Template(self)
+        self.parsed_configs = {}
+        if self.config_cache is not None:
+            self.config_cache.save()
+    # -------------------------------------------------------------------------
 
     # -------------------------------------------------------------------------
+    # seed_random(self, seed)
+    # gives the environment its own stream of random numbers seeded with
+    # seed, which all random draws of the simulation (by the updater and
+    # the markets) are taken from, so that simulations can be repeated and
+    # run side by side in one process without sharing the random module
+    # -------------------------------------------------------------------------
+    def seed_random(self, seed):
+        self.random = random.Random(seed)
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # initialize_books(self)
+    # collects the agents read from the config files, and sets up the
+    # ledger, the checks and the network before any transactions are added
+    # -------------------------------------------------------------------------
+    def initialize_books(self):
+        # add agents to the list of all agents
+        self.agents = [self.banks, self.firms, self.households, self.central_bank]
+        # and index them by their ids
+        self.index_agents()
+
+        # if asked for, keep the transactions in a columnar ledger
+        # this has to be done before any transactions are read
+        self.ledger = None
+        if self.static_parameters.get("columnar_ledger", 0):
+            from src.ledger import Ledger
+            self.ledger = Ledger(compaction=self.static_parameters.get("ledger_compaction", 0.5))
+            logging.info("  transactions are kept in a columnar ledger")
+        # without a ledger the transactions whose amount drops are noted here
+        self.dropped = OrderedDict()
+
+        # if asked for, keep running checksums of the books
+        self.balances = None
+        if self.static_parameters.get("track_balances", 0):
+            self.track_balances()
+
+        # keep the aggregates which were added before, on the books of the agents as they are now
+        self.aggregates = {}
+        for definition in self.aggregate_definitions:
+            self.track_aggregate(definition)
+
+        # initialize the network
+        self.network.identifier = self.identifier
+        self.network.initialize_networks(self)
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # reset(self)
+    # resets the environment to the state right after initialize, i.e. its
+    # parameters, agents and their transactions as read from the config
+    # files, from the template kept in memory rather than reading the files
+    # again, which is used to start every simulation after the first
+    # -------------------------------------------------------------------------
+    def reset(self):
+        transactions = self.template.reset(self)
+        self.initialize_books()
+        self.new_transactions(transactions)
+        logging.info("  environment reset to the config files read for: %s",  self.identifier)
+    # -------------------------------------------------------------------------
 
     # -------------------------------------------------------------------------
     # initialize_banks_from_files(self,  bank_directory)
@@ -385,6 +564,10 @@ class Environment(BaseConfig):
     # -------------------------------------------------------------------------
     def initialize_banks_from_files(self,  bank_directory):
         from src.bank import Bank
+        # the agents can also be given in a single population file
+        if Population.is_population(bank_directory):
+            self.initialize_agents_from_population(Bank, self.banks, bank_directory)
+            return
         # this routine is called more than once, so we have to reset the list of banks each time
         while len(self.banks) > 0:
             self.banks.pop()
@@ -397,7 +580,7 @@ class Environment(BaseConfig):
         # we read the files sequentially
         for infile in listing:
             bank = Bank()
-            bank.get_parameters_from_file(bank_directory + infile,  self)
+            self.read_agent_file(bank, bank_directory + infile)
             # and read parameters to the banks, only to add them to the environment
             self.banks.append(bank)
     # -------------------------------------------------------------------------
@@ -411,6 +594,10 @@ class Environment(BaseConfig):
     # -------------------------------------------------------------------------
     def initialize_firms_from_files(self,  firm_directory):
         from src.firm import Firm
+        # the agents can also be given in a single population file
+        if Population.is_population(firm_directory):
+            self.initialize_agents_from_population(Firm, self.firms, firm_directory)
+            return
         # this routine is called more than once, so we have to reset the list of firms each time
         while len(self.firms) > 0:
             self.firms.pop()
@@ -423,7 +610,7 @@ class Environment(BaseConfig):
         # we read the files sequentially
         for infile in listing:
             firm = Firm()
-            firm.get_parameters_from_file(firm_directory + infile,  self)
+            self.read_agent_file(firm, firm_directory + infile)
             # and read parameters to the firms, only to add them to the environment
             self.firms.append(firm)
     # -------------------------------------------------------------------------
@@ -437,6 +624,10 @@ class Environment(BaseConfig):
     # -------------------------------------------------------------------------
     def initialize_households_from_files(self,  household_directory):
         from src.household import Household
+        # the agents can also be given in a single population file
+        if Population.is_population(household_directory):
+            self.initialize_agents_from_population(Household, self.households, household_directory)
+            return
         # this routine is called more than once, so we have to reset the list of households each time
         while len(self.households) > 0:
             self.households.pop()
@@ -449,7 +640,7 @@ class Environment(BaseConfig):
         # we read the files sequentially
         for infile in listing:
             household = Household()
-            household.get_parameters_from_file(household_directory + infile,  self)
+            self.read_agent_file(household, household_directory + infile)
             # and read parameters to the firms, only to add them to the environment
             self.households.append(household)
     # -------------------------------------------------------------------------
@@ -462,6 +653,10 @@ class Environment(BaseConfig):
     # -------------------------------------------------------------------------
     def initialize_central_bank_from_files(self,  central_bank_directory):
         from src.central_bank import CentralBank
+        # the agents can also be given in a single population file
+        if Population.is_population(central_bank_directory):
+            self.initialize_agents_from_population(CentralBank, self.central_bank, central_bank_directory)
+            return
         # this routine is called more than once, so we have to reset the list of households each time
         while len(self.central_bank) > 0:
             self.central_bank.pop()
@@ -474,17 +669,161 @@ class Environment(BaseConfig):
         # we read the files sequentially
         for infile in listing:
             cb = CentralBank()
-            cb.get_parameters_from_file(central_bank_directory + infile,  self)
+            self.read_agent_file(cb, central_bank_directory + infile)
             # and read parameters to the firms, only to add them to the environment
             self.central_bank.append(cb)
     # -------------------------------------------------------------------------
 
+    # -------------------------------------------------------------------------
+    # initialize_agents_from_population(self, class_, agents, filename)
+    # fills the list of agents with agents of the given class made from the
+    # rows of a population file, which holds all agents of one type
+    # -------------------------------------------------------------------------
+    def initialize_agents_from_population(self, class_, agents, filename):
+        # this routine is called more than once, so we have to reset the list of agents each time
+        while len(agents) > 0:
+            agents.pop()
+        for identifier, parameters in Population(filename).read_agents():
+            agent = class_()
+            agent.identifier = identifier
+            for name, value in parameters:
+                agent.parameters[name] = value
+            agents.append(agent)
+        logging.info("  %s agents read from population file: %s", str(len(agents)), filename)
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # parse_config_files(self, processes)
+    # parses the config files in the agents' directories in a pool of the
+    # given number of processes, which return what is in the files as plain
+    # values, the agents and transactions are then made from these in the
+    # usual order as the files are read, files with an entry in the config
+    # cache are not parsed again, and what is parsed is put in the cache
+    # only the transactions of files which fit in one transaction_batch are
+    # returned and cached, larger files are read in batches as usual (see
+    # read_transactions_file), so they are never held in memory at once
+    # what was parsed is dropped by initialize once the template is made
+    # -------------------------------------------------------------------------
+    def parse_config_files(self, processes):
+        import multiprocessing
+        filenames = []
+        for directory in (self.bank_directory, self.firm_directory, self.household_directory, self.central_bank_directory):
+            if directory != "" and directory != "none" and not Population.is_population(directory):  # none is used for tests only
+                for infile in sorted(os.listdir(directory)):
+                    filename = directory + infile
+                    if self.get_parsed_config(filename, "transactions") is None:
+                        filenames.append(filename)
+        pool = multiprocessing.Pool(processes)
+        try:
+            jobs = [(filename, self.transaction_batch) for filename in filenames]
+            parsed = pool.map(parse_config_file, jobs, max(1, len(filenames) // (4 * processes)))
+        finally:
+            pool.close()
+            pool.join()
+        for filename, entry in zip(filenames, parsed):
+            # files which cannot be parsed are left to be read, and reported, as usual
+            if entry is not None:
+                self.parsed_configs[filename] = entry
+                if self.config_cache is not None:
+                    for name in entry:
+                        if entry[name] is not None:
+                            self.config_cache.put(filename, name, entry[name])
+        logging.info("  %s config files parsed in %s processes", str(len(self.parsed_configs)), str(processes))
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # get_parsed_config(self, filename, name)
+    # returns what was parsed from the config file in a pool of processes,
+    # or kept for it in the config cache, under name, or None
+    # -------------------------------------------------------------------------
+    def get_parsed_config(self, filename, name):
+        if filename in self.parsed_configs:
+            return self.parsed_configs[filename].get(name)
+        if self.config_cache is not None:
+            return self.config_cache.get(filename, name)
+        return None
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # read_agent_file(self, agent, filename)
+    # reads the identifier and parameters of the agent from its config file,
+    # streaming it so that the transactions in it are not kept in memory,
+    # or takes them from the config cache if the file did not change
+    # the parameters are kept in the order they are in the file and set on
+    # the agent in that order, just like when they are read from the file
+    # -------------------------------------------------------------------------
+    def read_agent_file(self, agent, filename):
+        cached = self.get_parsed_config(filename, "agent")
+        if cached is None:
+            try:
+                cached = read_config_agent(filename)
+            except Exception:
+                logging.error("    ERROR: %s could not be parsed",  filename)
+                return
+            if self.config_cache is not None:
+                self.config_cache.put(filename, "agent", cached)
+        agent.identifier = cached[0]
+        for name, value in cached[1]:
+            agent.parameters[name] = value
+        if cached[2] is not None:
+            agent.state_variables = copy.deepcopy(cached[2])
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # read_config_identifier(self, filename)
+    # returns the identifier in the agent's config file
+    # -------------------------------------------------------------------------
+    def read_config_identifier(self, filename):
+        cached = self.get_parsed_config(filename, "agent")
+        if cached is not None:
+            return cached[0]
+        # we open the file and find the identifier of the config, without reading the rest of it
+        for element in iterate_config_file(filename):
+            return element.attrib['identifier']
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # read_transactions_file(self, agent, filename)
+    # reads the transactions in the agent's config file, or adds the ones
+    # kept in the config cache if the file did not change, the file is
+    # streamed and the transactions are added in batches, so that files
+    # with millions of transactions are read with bounded memory, and put
+    # in the ledger in bulk if there is one, the transactions of files which
+    # fit in one batch are kept in the cache by the ids of their parties,
+    # larger files are not cached, as the cache is kept in memory and would
+    # hold all their transactions at once
+    # -------------------------------------------------------------------------
+    def read_transactions_file(self, agent, filename):
+        cached = self.get_parsed_config(filename, "transactions")
+        if cached is not None:
+            self.new_transactions(cached)
+            return
+        batches = 0
+        batch = []
+        try:
+            for row in read_config_transactions(filename):
+                batch.append(row)
+                if len(batch) == self.transaction_batch:
+                    self.new_transactions(batch)
+                    batches = batches + 1
+                    batch = []
+            self.new_transactions(batch)
+        except Exception:
+            logging.error("    ERROR: %s could not be parsed",  filename)
+            return
+        if self.config_cache is not None and batches == 0:
+            self.config_cache.put(filename, "transactions", batch)
+    # -------------------------------------------------------------------------
+
     # -------------------------------------------------------------------------
     # read_transactions_from_files(self,  bank_directory)
     # reads transactions for banks from the config files
     # -------------------------------------------------------------------------
     def read_transactions_for_banks(self,  bank_directory):
-        from xml.etree import ElementTree
+        # the transactions can also be given in the edge list of a population file
+        if Population.is_population(bank_directory):
+            self.new_transactions(Population(bank_directory).read_transactions())
+            return
         # we list all the files in the specified directory
         listing = os.listdir(bank_directory)
         # and check if the number of files is in line with the parameters
@@ -494,13 +833,11 @@ class Environment(BaseConfig):
         # we read the files sequentially)
         for infile in listing:
             # we open the file and find the identifier of the config
-            xmlText = open(bank_directory + infile).read()
-            element = ElementTree.XML(xmlText)
-            identifier = element.attrib['identifier']
+            identifier = self.read_config_identifier(bank_directory + infile)
             # and we find the bank with this identifier
             bank = self.get_agent_by_id(identifier)
             # then we read the transactions from the config to the appropriate bank
-            bank.get_transactions_from_file(bank_directory + infile, self)
+            self.read_transactions_file(bank, bank_directory + infile)
     # -------------------------------------------------------------------------
 
     # -------------------------------------------------------------------------
@@ -508,7 +845,10 @@ class Environment(BaseConfig):
     # reads transactions for firms from the config files
     # -------------------------------------------------------------------------
     def read_transactions_for_firms(self,  firm_directory):
-        from xml.etree import ElementTree
+        # the transactions can also be given in the edge list of a population file
+        if Population.is_population(firm_directory):
+            self.new_transactions(Population(firm_directory).read_transactions())
+            return
         # we list all the files in the specified directory
         listing = os.listdir(firm_directory)
         # and check if the number of files is in line with the parameters
@@ -518,13 +858,11 @@ class Environment(BaseConfig):
         # we read the files sequentially
         for infile in listing:
             # we open the file and find the identifier of the config
-            xmlText = open(firm_directory + infile).read()
-            element = ElementTree.XML(xmlText)
-            identifier = element.attrib['identifier']
+            identifier = self.read_config_identifier(firm_directory + infile)
             # and we find the firm with this identifier
             firm = self.get_agent_by_id(identifier)
             # then we read the transactions from the config to the appropriate firm
-            firm.get_transactions_from_file(firm_directory + infile, self)
+            self.read_transactions_file(firm, firm_directory + infile)
     # -------------------------------------------------------------------------
 
     # -------------------------------------------------------------------------
@@ -532,7 +870,10 @@ class Environment(BaseConfig):
     # reads transactions for households from the config files
     # -------------------------------------------------------------------------
     def read_transactions_for_households(self,  household_directory):
-        from xml.etree import ElementTree
+        # the transactions can also be given in the edge list of a population file
+        if Population.is_population(household_directory):
+            self.new_transactions(Population(household_directory).read_transactions())
+            return
         # we list all the files in the specified directory
         listing = os.listdir(household_directory)
         # and check if the number of files is in line with the parameters
@@ -542,13 +883,11 @@ class Environment(BaseConfig):
         # we read the files sequentially
         for infile in listing:
             # we open the file and find the identifier of the config
-            xmlText = open(household_directory + infile).read()
-            element = ElementTree.XML(xmlText)
-            identifier = element.attrib['identifier']
+            identifier = self.read_config_identifier(household_directory + infile)
             # and we find the firm with this identifier
             household = self.get_agent_by_id(identifier)
             # then we read the transactions from the config to the appropriate firm
-            household.get_transactions_from_file(household_directory + infile, self)
+            self.read_transactions_file(household, household_directory + infile)
     # -------------------------------------------------------------------------
 
     # -------------------------------------------------------------------------
@@ -556,7 +895,10 @@ class Environment(BaseConfig):
     # reads transactions for central bank from the config file
     # -------------------------------------------------------------------------
     def read_transactions_for_central_bank(self,  central_bank_directory):
-        from xml.etree import ElementTree
+        # the transactions can also be given in the edge list of a population file
+        if Population.is_population(central_bank_directory):
+            self.new_transactions(Population(central_bank_directory).read_transactions())
+            return
         # we list all the files in the specified directory
         listing = os.listdir(central_bank_directory)
         # and check if the number of files is in line with the parameters
@@ -566,13 +908,11 @@ class Environment(BaseConfig):
         # we read the files sequentially
         for infile in listing:
             # we open the file and find the identifier of the config
-            xmlText = open(central_bank_directory + infile).read()
-            element = ElementTree.XML(xmlText)
-            identifier = element.attrib['identifier']
+            identifier = self.read_config_identifier(central_bank_directory + infile)
             # and we find the bank with this identifier
             cb = self.get_agent_by_id(identifier)
             # then we read the transactions from the config to the appropriate bank
-            cb.get_transactions_from_file(central_bank_directory + infile, self)
+            self.read_transactions_file(cb, central_bank_directory + infile)
     # -------------------------------------------------------------------------
 
     # -------------------------------------------------------------------------
@@ -582,20 +922,124 @@ class Environment(BaseConfig):
     # step to ensure consistency, along with appropriately using the
     # check_consistency function, and appropriately synchronising the update
     # itself
+    # both parties hold the same transaction, so it balances out if every
+    # transaction is on the books of its from_ and its to, and of no one else
+    # this is checked in one pass over the transactions of the type, or in
+    # constant time from the running checksums if balances are tracked
     # -------------------------------------------------------------------------
     def check_global_transaction_balance(self, type_):
-        super(Environment, self).check_global_transaction_balance(type_)
+        if self.balances is not None:
+            return self.balances.get(type_, [0, 0, 0]) == [0, 0, 0]
+        for agent in self.agents_generator():
+            for tranx in agent.accounts.transactions_by_type(type_):
+                # each party's books hold the transaction at most once
+                # so it is enough to find it on the books of both parties
+                if tranx.from_ is not agent and tranx.to is not agent:
+                    return False
+                if tranx.from_ is agent and tranx not in getattr(tranx.to, "accounts", ()):
+                    return False
+                if tranx.to is agent and tranx not in getattr(tranx.from_, "accounts", ()):
+                    return False
+        return True
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # track_balances()
+    # starts keeping running checksums of the transactions by type, shared
+    # by the books of all agents and updated whenever a transaction is put
+    # on or taken off the books, the transactions already on the books are
+    # counted once here
+    # -------------------------------------------------------------------------
+    def track_balances(self):
+        self.balances = {}
+        for agent in self.agents_generator():
+            agent.accounts.balances = self.balances
+            for tranx in agent.accounts:
+                agent.accounts.add_to_balances(agent.accounts.keys[tranx], 1)
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # add_aggregate(name, type_, role, agent_type, sign=1.0)
+    # adds a term to the aggregate name, which is the sum of the amounts of
+    # the transactions of type_ whose party role ("from_" or "to") is one
+    # of the agents of agent_type ("banks", "firms", "households" or
+    # "central_bank") times sign, e.g. the deposits of the households less
+    # their loans are
+    #   add_aggregate("household_deposits", "deposits", "from_", "households")
+    #   add_aggregate("household_deposits", "loans", "to", "households", -1.0)
+    # the aggregate is kept up to date by the agents' books and the
+    # transactions whenever a transaction is put on or taken off the books
+    # or its amount changes, so reading it takes constant time, transactions
+    # of an agent with itself are not counted, the terms are added again to
+    # the books of the agents when the environment is reset
+    # -------------------------------------------------------------------------
+    def add_aggregate(self, name, type_, role, agent_type, sign=1.0):
+        if role not in ("from_", "to"):
+            raise ValueError("The role of the agents of an aggregate is from_ or to, not " + str(role))
+        definition = (name, type_, role, agent_type, sign)
+        if definition not in self.aggregate_definitions:
+            self.aggregate_definitions.append(definition)
+            self.track_aggregate(definition)
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # track_aggregate(definition)
+    # adds a term of an aggregate to the books of the agents it is about,
+    # the transactions already on the books are counted once here
+    # -------------------------------------------------------------------------
+    def track_aggregate(self, definition):
+        name, type_, role, agent_type, sign = definition
+        total = self.aggregates.setdefault(name, [0.0])
+        side = 1 if role == "from_" else -1
+        for agent in getattr(self, agent_type):
+            accounts = agent.accounts
+            if accounts.aggregates is None:
+                accounts.aggregates = {}
+            terms = accounts.aggregates.setdefault((type_, side), [])
+            terms.append((total, sign))
+            for tranx in accounts.transactions_by_type(type_):
+                if accounts.keys[tranx][3] == side:
+                    total[0] = total[0] + sign * tranx.amount
+                    accounts.attach_terms(tranx, terms)
     # -------------------------------------------------------------------------
 
     # -------------------------------------------------------------------------
-    # accrue_interests()
+    # get_aggregate(name)
+    # returns the current value of an aggregate added with add_aggregate
+    # -------------------------------------------------------------------------
+    def get_aggregate(self, name):
+        return self.aggregates[name][0]
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # accrue_interests(types)
     # This method accrues interest on all transaction
     # making sure we don't double count the transactions that are
     # on the books of multiple agents, interest is specified within the
     # transaction itself
-    # -------------------------------------------------------------------------
-    def accrue_interests(self):
-        super(Environment, self).accrue_interests()
+    # if types are given only transactions of these types accrue interest
+    # -------------------------------------------------------------------------
+    def accrue_interests(self, types=None):
+        # with a columnar ledger every transaction is one slot
+        # so we can accrue interests on all of them in one sweep
+        # unless aggregates are kept, which have to see every change of amount
+        if self.ledger is not None and len(self.aggregates) == 0:
+            self.ledger.accrue_interests(types)
+            return
+        # otherwise every transaction is on the books of both parties
+        # so we keep a set of the ones already done, the lookup in the
+        # type index means we only go through the transactions asked for
+        done = set()
+        for agent in self.agents_generator():
+            if types is None:
+                transactions = agent.accounts
+            else:
+                transactions = [tranx for type_ in types for tranx in agent.accounts.transactions_by_type(type_)]
+            for tranx in transactions:
+                if tranx not in done:
+                    # The below adds the interest on the principal amount
+                    tranx.amount = tranx.amount + tranx.amount * tranx.interest
+                    done.add(tranx)
     # -------------------------------------------------------------------------
 
     # -------------------------------------------------------------------------
@@ -607,6 +1051,46 @@ class Environment(BaseConfig):
         transaction.add_transaction(type_, asset, from_, to, amount,  interest,  maturity, time_of_default, self)
     # -------------------------------------------------------------------------
 
+    # -------------------------------------------------------------------------
+    # new_transactions(batch)
+    # adds a number of transactions, the batch is a list (or array) of rows
+    # (type_, asset, from_, to, amount, interest, maturity, time_of_default)
+    # from_ and to can be agents or their identifiers
+    # this is a convenience loop, not a bulk booking: every row still makes
+    # its own Transaction, booked through add_transaction like new_transaction,
+    # only the identifiers are looked up once per batch, and the columns of
+    # the ledger (if any) are grown once, otherwise each trade costs as much
+    # as with new_transaction
+    # -------------------------------------------------------------------------
+    def new_transactions(self, batch):
+        from src.transaction import Transaction
+        batch = list(batch)
+        if self.ledger is not None:
+            self.ledger.reserve(len(batch))
+        agents = {}  # identifier -> agent, for the identifiers found in the batch
+        for type_, asset, from_, to, amount, interest, maturity, time_of_default in batch:
+            if isinstance(from_, str):
+                if from_ not in agents:
+                    agents[from_] = self.get_agent_by_id(from_)
+                from_ = agents[from_]
+            if isinstance(to, str):
+                if to not in agents:
+                    agents[to] = self.get_agent_by_id(to)
+                to = agents[to]
+            transaction = Transaction()
+            transaction.add_transaction(type_, asset, from_, to, amount,  interest,  maturity, time_of_default, self)
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # remove_transactions(transactions)
+    # removes a number of transactions from the books of their parties
+    # in one pass, without scanning the agents' accounts
+    # -------------------------------------------------------------------------
+    def remove_transactions(self, transactions):
+        for transaction in transactions:
+            transaction.remove_transaction(self)
+    # -------------------------------------------------------------------------
+
     # -------------------------------------------------------------------------
     # check_agent_homogeneity(type_)
     # -------------------------------------------------------------------------
@@ -625,7 +1109,15 @@ class Environment(BaseConfig):
 
     # -------------------------------------------------------------------------
     # update_asset_returns()
+    # draws the current returns of the assets from the random numbers of the
+    # environment, normally distributed with their expected return and
+    # volatility (variance)
+    # this mirrors update_asset_returns of BaseConfig in abm_template, the
+    # same gauss draw with the square root of the variance, which has to be
+    # copied here as the base method draws from the random module, shared
+    # by the whole process, rather than from the seeded environment.random
     # -------------------------------------------------------------------------
     def update_asset_returns(self):
-        super(Environment, self).update_asset_returns()
+        for key in self.assets:
+            self.assets[key][2] = self.random.gauss(self.assets[key][0], self.assets[key][1] ** 0.5)
     # -------------------------------------------------------------------------
@@ -22,6 +22,7 @@ along with this program. If not, see <http://www.gnu.org/licenses/>.
 
 import logging
 from abm_template.src.baseagent import BaseAgent
+from src.accounts import Accounts
 
 # ============================================================================
 #
@@ -98,7 +99,7 @@ class Household(BaseAgent):
         self.identifier = ""  # identifier of the specific household
         self.parameters = {}  # parameters of the specific household
         self.state_variables = {}  # state variables of the specific household
-        self.accounts = []  # all accounts of a household (filled with transactions)
+        self.accounts = Accounts(self)  # all accounts of a household (filled with transactions)
         # DO NOT EVER ASSIGN PARAMETERS BY HAND AS DONE BELOW IN PRODUCTION CODE
         # ALWAYS READ THE PARAMETERS FROM CONFIG FILES
         # OR USE THE FUNCTIONS FOR SETTING / CHANGING VARIABLES
@@ -172,7 +173,7 @@ class Household(BaseAgent):
     # returns the value of all transactions of a given type
     # -------------------------------------------------------------------------
     def get_account(self,  type_):
-        return super(Household, self).get_account(type_)
+        return self.accounts.volume_by_type(type_)
     # -------------------------------------------------------------------------
 
     # -------------------------------------------------------------------------
@@ -180,7 +181,7 @@ class Household(BaseAgent):
     # returns the number of transactions of a given type
     # -------------------------------------------------------------------------
     def get_account_num_transactions(self,  type_):
-        return super(Household, self).get_account_num_transactions(type_)
+        return self.accounts.num_transactions_by_type(type_)
     # -------------------------------------------------------------------------
 
     # -------------------------------------------------------------------------
@@ -275,8 +276,8 @@ class Household(BaseAgent):
         # have saving in excess
         # Thus we calculate their accumulated wealth here
         wealth = 0.0
-        # By looking through the household's accounts
-        for tranx in self.accounts:
+        # By looking up the household's deposits and loans, in the order of the books
+        for tranx in self.accounts.transactions_by_types(("deposits", "loans")):
             # Adding deposits the household has in the banks
             if tranx.type_ == "deposits" and tranx.from_ == self:
                 wealth = wealth + tranx.amount
@@ -0,0 +1,406 @@
+#!/usr/bin/env python
+# [SublimeLinter pep8-max-line-length:150]
+# -*- coding: utf-8 -*-
+
+"""
+black_rhino is a multi-agent simulator for financial network analysis
+Copyright (C) 2016 Co-Pierre Georg (co-pierre.georg@keble.ox.ac.uk)
+Pawel Fiedor (pawel@fiedor.eu)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3 of the License.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from array import array
+from collections import OrderedDict
+try:
+    import numpy as np
+except ImportError:  # the ledger falls back to the array module without numpy
+    np = None
+
+# ============================================================================
+#
+# class Codes
+#
+# ============================================================================
+
+
+class Codes(object):
+    #
+    #
+    # VARIABLES
+    #
+    #
+
+    codes = {}  # value -> integer code
+    values = []  # integer code -> value
+
+    #
+    #
+    # CODE
+    #
+    #
+
+    # -------------------------------------------------------------------------
+    # __init__()
+    # translates values (types, assets, agents) to integer codes and back
+    # codes are handed out in the order in which values are first seen
+    # -------------------------------------------------------------------------
+    def __init__(self):
+        self.codes = {}
+        self.values = []
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # code(value)
+    # returns the code of the value, giving it a new code if it has none
+    # -------------------------------------------------------------------------
+    def code(self, value):
+        try:
+            return self.codes[value]
+        except KeyError:
+            self.codes[value] = len(self.values)
+            self.values.append(value)
+            return self.codes[value]
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # find(value)
+    # returns the code of the value, or -1 if the value has no code
+    # -------------------------------------------------------------------------
+    def find(self, value):
+        return self.codes.get(value, -1)
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # value(code)
+    # returns the value with the given code
+    # -------------------------------------------------------------------------
+    def value(self, code):
+        return self.values[code]
+    # -------------------------------------------------------------------------
+
+# ============================================================================
+#
+# class Ledger
+#
+# ============================================================================
+
+
+class Ledger(object):
+    #
+    #
+    # VARIABLES
+    #
+    #
+
+    size = 0  # number of slots in use or on the free list
+    capacity = 0  # number of slots the columns have room for
+    free = []  # slots of removed transactions, reused before new slots are taken
+    transactions = []  # slot -> transaction booked in it, None for free slots
+    dropped = OrderedDict()  # transactions whose amount was set to zero (or less), to be purged
+    compaction = 0.5  # share of free slots above which the columns are compacted
+
+    # the columns, numpy arrays if numpy is available, arrays otherwise
+    amount = None  # amount of the transaction
+    interest = None  # interest rate paid to the originator each time step
+    maturity = None  # time (in steps) to maturity
+    time_of_default = None  # control variable checking for defaulted transactions
+    type_code = None  # code of type_ in type_codes
+    asset_code = None  # code of asset in asset_codes
+    from_code = None  # code of from_ in agent_codes
+    to_code = None  # code of to in agent_codes
+    live = None  # 1 for slots holding a transaction, 0 for free slots
+
+    type_codes = None  # codes of transaction types
+    asset_codes = None  # codes of assets
+    agent_codes = None  # codes of agents
+
+    #
+    #
+    # CODE
+    #
+    #
+
+    # -------------------------------------------------------------------------
+    # __init__(capacity)
+    # the ledger keeps the numbers of all transactions in the environment in
+    # columns, one slot per transaction, so that they can be swept over all
+    # at once, the transactions booked into it read and write their numbers
+    # in their slot, but are still full objects held by the agents' accounts
+    # (and by dropped until they are purged), so the columns come on top of
+    # the transactions and do not save memory
+    # free slots are kept zeroed, so sweeps over all slots can ignore them
+    # once more than the compaction share of the slots in use is free, the
+    # booked transactions are moved together and the columns shrunk
+    # -------------------------------------------------------------------------
+    def __init__(self, capacity=1024, compaction=0.5):
+        self.size = 0
+        self.capacity = 0
+        self.free = []
+        self.transactions = []
+        self.dropped = OrderedDict()
+        self.compaction = compaction
+        self.type_codes = Codes()
+        self.asset_codes = Codes()
+        self.agent_codes = Codes()
+        if np is not None:
+            self.amount = np.zeros(0, dtype=np.float64)
+            self.interest = np.zeros(0, dtype=np.float64)
+            self.maturity = np.zeros(0, dtype=np.int64)
+            self.time_of_default = np.zeros(0, dtype=np.int64)
+            self.type_code = np.zeros(0, dtype=np.int32)
+            self.asset_code = np.zeros(0, dtype=np.int32)
+            self.from_code = np.zeros(0, dtype=np.int32)
+            self.to_code = np.zeros(0, dtype=np.int32)
+            self.live = np.zeros(0, dtype=np.int8)
+        else:
+            self.amount = array('d')
+            self.interest = array('d')
+            self.maturity = array('l')
+            self.time_of_default = array('l')
+            self.type_code = array('i')
+            self.asset_code = array('i')
+            self.from_code = array('i')
+            self.to_code = array('i')
+            self.live = array('b')
+        self.grow(capacity)
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # __len__()
+    # returns the number of transactions booked into the ledger
+    # -------------------------------------------------------------------------
+    def __len__(self):
+        return self.size - len(self.free)
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # grow(capacity)
+    # makes room in the columns for at least the given number of slots
+    # -------------------------------------------------------------------------
+    def grow(self, capacity):
+        extra = capacity - self.capacity
+        if extra <= 0:
+            return
+        for name in ("amount", "interest", "maturity", "time_of_default",
+                     "type_code", "asset_code", "from_code", "to_code", "live"):
+            column = getattr(self, name)
+            if np is not None:
+                setattr(self, name, np.concatenate((column, np.zeros(extra, dtype=column.dtype))))
+            else:
+                column.extend(array(column.typecode, [0]) * extra)
+        self.transactions.extend([None] * extra)
+        self.capacity = capacity
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # reserve(number)
+    # makes room for booking the given number of transactions
+    # so that the columns are grown at most once for a batch
+    # -------------------------------------------------------------------------
+    def reserve(self, number):
+        needed = self.size + max(0, number - len(self.free))
+        if needed > self.capacity:
+            self.grow(max(needed, 2 * self.capacity))
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # book(transaction)
+    # moves the numbers of the transaction into a slot of the ledger
+    # removed slots are reused first, the columns double when full
+    # -------------------------------------------------------------------------
+    def book(self, transaction):
+        if transaction.ledger is self:
+            return
+        if len(self.free) > 0:
+            slot = self.free.pop()
+        else:
+            if self.size == self.capacity:
+                self.grow(max(2 * self.capacity, 1))
+            slot = self.size
+            self.size = self.size + 1
+        self.amount[slot] = transaction._amount
+        self.interest[slot] = transaction._interest
+        self.maturity[slot] = transaction._maturity
+        self.time_of_default[slot] = transaction._time_of_default
+        self.live[slot] = 1
+        self.transactions[slot] = transaction
+        transaction.slot = slot
+        transaction.ledger = self
+        self.recode(transaction)
+        if transaction._amount <= 0.0:
+            self.dropped[transaction] = None
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # release(transaction)
+    # hands the numbers back to the transaction and frees its slot
+    # compacts the columns if too many slots are free
+    # -------------------------------------------------------------------------
+    def release(self, transaction):
+        if transaction.ledger is not self:
+            return
+        slot = transaction.slot
+        transaction._amount = float(self.amount[slot])
+        transaction._interest = float(self.interest[slot])
+        transaction._maturity = int(self.maturity[slot])
+        transaction._time_of_default = int(self.time_of_default[slot])
+        transaction.ledger = None
+        transaction.slot = -1
+        for column in (self.amount, self.interest, self.maturity, self.time_of_default,
+                       self.type_code, self.asset_code, self.from_code, self.to_code, self.live):
+            column[slot] = 0
+        self.transactions[slot] = None
+        self.free.append(slot)
+        self.dropped.pop(transaction, None)
+        if len(self.free) > self.compaction * self.size:
+            self.compact()
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # compact()
+    # moves the booked transactions to the first slots, keeping their order,
+    # and shrinks the columns to twice their number, this costs a pass over
+    # the slots but is only done after the compaction share of them is freed
+    # -------------------------------------------------------------------------
+    def compact(self):
+        slots = [slot for slot in range(self.size) if self.transactions[slot] is not None]
+        size = len(slots)
+        capacity = max(2 * size, 1)
+        for name in ("amount", "interest", "maturity", "time_of_default",
+                     "type_code", "asset_code", "from_code", "to_code", "live"):
+            column = getattr(self, name)
+            if np is not None:
+                compacted = np.zeros(capacity, dtype=column.dtype)
+                compacted[:size] = column[slots]
+            else:
+                compacted = array(column.typecode, [column[slot] for slot in slots])
+                compacted.extend(array(column.typecode, [0]) * (capacity - size))
+            setattr(self, name, compacted)
+        self.transactions = [self.transactions[slot] for slot in slots] + [None] * (capacity - size)
+        for slot in range(size):
+            self.transactions[slot].slot = slot
+        self.size = size
+        self.capacity = capacity
+        self.free = []
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # set_amount(transaction, amount)
+    # sets the amount of a booked transaction, noting it for purging
+    # if the amount drops to zero (or less)
+    # -------------------------------------------------------------------------
+    def set_amount(self, transaction, amount):
+        self.amount[transaction.slot] = amount
+        if amount <= 0.0:
+            self.dropped[transaction] = None
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # recode(transaction)
+    # updates the codes of a booked transaction whose type_, asset,
+    # from_ or to changed
+    # -------------------------------------------------------------------------
+    def recode(self, transaction):
+        if transaction.ledger is not self:
+            return
+        slot = transaction.slot
+        self.type_code[slot] = self.type_codes.code(transaction.type_)
+        self.asset_code[slot] = self.asset_codes.code(transaction.asset)
+        self.from_code[slot] = self.agent_codes.code(transaction.from_)
+        self.to_code[slot] = self.agent_codes.code(transaction.to)
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # slots_where(condition)
+    # returns the transactions in the slots for which condition holds,
+    # condition is a boolean array over the slots in use
+    # -------------------------------------------------------------------------
+    def slots_where(self, condition):
+        if np is not None:
+            return [self.transactions[slot] for slot in np.flatnonzero(condition)]
+        return [self.transactions[slot] for slot in range(self.size) if condition[slot]]
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # accrue_interests(types)
+    # adds the interest on the principal amount of all booked transactions,
+    # or only of those of the given types if types are given
+    # each transaction is one slot, so nothing is counted twice
+    # -------------------------------------------------------------------------
+    def accrue_interests(self, types=None):
+        size = self.size
+        if np is not None:
+            if types is None:
+                self.amount[:size] += self.amount[:size] * self.interest[:size]
+            else:
+                selected = np.flatnonzero(self.of_types(types))
+                self.amount[selected] += self.amount[selected] * self.interest[selected]
+            # only an interest of -100% or less takes a positive amount to zero
+            for slot in np.flatnonzero((self.interest[:size] <= -1.0) & (self.amount[:size] <= 0.0) & (self.live[:size] == 1)):
+                self.dropped[self.transactions[slot]] = None
+        else:
+            selected = None if types is None else self.of_types(types)
+            for slot in range(size):
+                if selected is None or selected[slot]:
+                    self.amount[slot] = self.amount[slot] + self.amount[slot] * self.interest[slot]
+                    if self.amount[slot] <= 0.0 and self.live[slot] == 1:
+                        self.dropped[self.transactions[slot]] = None
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # of_types(types)
+    # returns a boolean array over the slots in use which holds for the
+    # booked transactions of any of the given types
+    # -------------------------------------------------------------------------
+    def of_types(self, types):
+        size = self.size
+        codes = [self.type_codes.find(type_) for type_ in types]
+        if np is not None:
+            return (self.live[:size] == 1) & np.in1d(self.type_code[:size], codes)
+        return [self.live[slot] == 1 and self.type_code[slot] in codes for slot in range(size)]
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # worthless()
+    # returns all booked transactions with amount of zero (or less)
+    # only the transactions noted when their amount dropped are looked at,
+    # those whose amount went back up since are forgotten
+    # -------------------------------------------------------------------------
+    def worthless(self):
+        worthless = []
+        for transaction in list(self.dropped):
+            if self.amount[transaction.slot] <= 0.0:
+                worthless.append(transaction)
+            else:
+                del self.dropped[transaction]
+        return worthless
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # volume_by_type(type_)
+    # returns the value of all booked transactions of a given type
+    # -------------------------------------------------------------------------
+    def volume_by_type(self, type_):
+        code = self.type_codes.find(type_)
+        if code == -1:
+            return 0.0
+        size = self.size
+        if np is not None:
+            return float(self.amount[:size][(self.type_code[:size] == code) & (self.live[:size] == 1)].sum())
+        volume = 0.0
+        for slot in range(size):
+            if self.live[slot] == 1 and self.type_code[slot] == code:
+                volume = volume + self.amount[slot]
+        return volume
+    # -------------------------------------------------------------------------
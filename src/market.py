@@ -20,6 +20,8 @@ You should have received a copy of the GNU General Public License
 along with this program. If not, see <http://www.gnu.org/licenses/>.
 """
 
+import random
+
 from abm_template.src.basemarket import BaseMarket
 
 # -------------------------------------------------------------------------
@@ -38,6 +40,7 @@ class Market(BaseMarket):
     tolerance = 0.01  # Tolerance when matching demand and supply
     resolution = 0.01  # Resolution by which we crawl in price finding
     amplification = 1.1  # Factor for exponential search (Wolffgang 2015 "A multi-agent non-stochastic economic simulator.")
+    random = random  # random numbers the market draws from, usually those of the environment
 
     #
     #
@@ -317,13 +320,17 @@ class Market(BaseMarket):
         super(Market, self).set_amplification(_value)
 
     # -------------------------------------------------------------------------
-    # __init__(environment)
+    # __init__(identifier, random_=None)
+    # the market draws its random numbers from random_, which should be the
+    # random numbers of the environment, or from the random module if None
     # -------------------------------------------------------------------------
-    def __init__(self, identifier):
+    def __init__(self, identifier, random_=None):
         self.identifier = identifier
         self.tolerance = 0.01
         self.resolution = 0.01
         self.amplification = 1.1
+        if random_ is not None:
+            self.random = random_
     # -------------------------------------------------------------------------
 
     # -------------------------------------------------------------------------
@@ -357,6 +364,9 @@ class Market(BaseMarket):
         self.tolerance = tolerance
         self.resolution = resolution
         self.amplification = amplification
+        # a random starting price is drawn here, from the random numbers of the market
+        if starting_price == 0.0:
+            starting_price = self.random.uniform(0, 10) + 0.01
         return super(Market, self).tatonnement_parallel(sellers, buyers, starting_price)
     # -------------------------------------------------------------------------
 
@@ -374,7 +384,7 @@ class Market(BaseMarket):
     # is extinguished
     # -------------------------------------------------------------------------
     def rationing(self, agents):
-        return super(Market, self).rationing(agents)
+        return self.match_randomly(agents)
     # -------------------------------------------------------------------------
 
     # -------------------------------------------------------------------------
@@ -391,7 +401,59 @@ class Market(BaseMarket):
     # still random however
     # -------------------------------------------------------------------------
     def rationing_proportional(self, agents):
-        return super(Market, self).rationing_proportional(agents)
+        # We find total supply and demand, and what will be exchanged
+        supply = 0.0
+        demand = 0.0
+        for agent in agents:
+            if agent[1] > 0:
+                supply = supply + agent[1]
+            else:
+                demand = demand - agent[1]
+        exchange = min(supply, demand)
+        # Then we adjust the supply or demand of all agents
+        # proportionately to the mismatch between supply and demand
+        for agent in agents:
+            if agent[1] > 0:  # supply
+                agent[1] = agent[1] * (exchange / supply)
+            if agent[1] < 0:  # demand
+                agent[1] = agent[1] * (exchange / demand)
+        return self.match_randomly(agents)
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # match_randomly(agents)
+    # Matches the agents with excess supply and demand in random pairs, in
+    # a random order of the agents and of their counterparties, trading the
+    # maximum possible amount for each pair, but drawing from the random
+    # numbers of the market
+    # this mirrors the loop of rationing of BaseMarket in abm_template, which
+    # has to be copied here as the base method shuffles with the random
+    # module, shared by the whole process, rather than the seeded self.random
+    # -------------------------------------------------------------------------
+    def match_randomly(self, agents):
+        to_return = []
+        itrange = list(range(0, len(agents)))
+        self.random.shuffle(itrange)
+        for i in itrange:
+            # agents cannot trade with themselves
+            itrange_inner = list(range(0, len(agents)))
+            itrange_inner.remove(i)
+            self.random.shuffle(itrange_inner)
+            for j in itrange_inner:
+                # We only trade if one agent has excess supply (positive value)
+                # while the other has excess demand (negative value)
+                if agents[i][1] * agents[j][1] < 0:
+                    value = min(abs(agents[i][1]), abs(agents[j][1]))
+                    # [the_seller, the_buyer, amount_sold]
+                    if agents[i][1] < 0:
+                        to_return.append([agents[j][0], agents[i][0], value])
+                        agents[i][1] = agents[i][1] + value
+                        agents[j][1] = agents[j][1] - value
+                    else:
+                        to_return.append([agents[i][0], agents[j][0], value])
+                        agents[i][1] = agents[i][1] - value
+                        agents[j][1] = agents[j][1] + value
+        return to_return
     # -------------------------------------------------------------------------
 
     # -------------------------------------------------------------------------
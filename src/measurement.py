@@ -20,9 +20,62 @@ You should have received a copy of the GNU General Public License
 along with this program. If not, see <http://www.gnu.org/licenses/>.
 """
 
+import csv
+import functools
+import gzip
 import logging
+import os
+import struct
+import sys
+import threading
+import zipfile
+from array import array
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+try:
+    from Queue import Queue
+except ImportError:
+    from queue import Queue
+try:
+    import numpy as np
+except ImportError:  # the rows of npz files are kept in arrays without numpy
+    np = None
 from abm_template.src.basemeasurement import BaseMeasurement
 
+npy_header_size = 128  # bytes of the header of the .npy files written, so it can be rewritten in place
+getters = {}  # identifier of an output in the measurement config -> function(measurement) returning its value
+aggregates = {}  # identifier of an output -> terms (type_, role, agent_type, sign) of the aggregate its getter reads
+
+
+# -------------------------------------------------------------------------
+# register_getter(ident)
+# decorator registering a function of the measurement as the getter of the
+# output with the identifier ident, which is used for the columns of the
+# measurement config with value=ident
+# -------------------------------------------------------------------------
+def register_getter(ident):
+    def register(function):
+        getters[ident] = function
+        return function
+    return register
+# -------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------
+# get_npy_header(descr, shape)
+# returns the header of a .npy file (format version 1.0) holding an array
+# of the given numpy type descriptor and shape, padded to npy_header_size
+# bytes, so that the header of a file written in blocks can be rewritten
+# with the final shape once all blocks are written
+# -------------------------------------------------------------------------
+def get_npy_header(descr, shape):
+    header = "{'descr': '%s', 'fortran_order': False, 'shape': (%s), }" % (descr, "".join("%d," % i for i in shape))
+    header = header + " " * (npy_header_size - 11 - len(header)) + "\n"
+    return b"\x93NUMPY\x01\x00" + struct.pack("<H", len(header)) + header.encode("latin-1")
+# -------------------------------------------------------------------------
+
 # ============================================================================
 #
 # class Measurement
@@ -50,6 +103,30 @@ class Measurement(BaseMeasurement):
     file = None
     # plus the csv writer
     csv_writer = None
+    # the format of the output: csv (default), csv.gz or npz
+    format = "csv"
+    # rows kept in memory before they are written to a csv.gz or npz file
+    block_rows = 1000
+    # the rows kept, a list for csv.gz, a preallocated array for npz
+    block = None
+    # rows in the block, and rows written to the file so far
+    block_count = 0
+    written_rows = 0
+    # the getters of the columns, in the order of the columns
+    column_getters = []
+    # if True, the rows are written by a thread in the background
+    background = False
+    # rows waiting for the background writer before write_to_file waits
+    queue_size = 1000
+    # the rows waiting, the background writer and the error it ran into
+    rows_queue = None
+    writer = None
+    writer_error = None
+    # if True, the rows are written as csv to a buffer in memory (see open_buffer)
+    buffered = False
+    # the sampling schedule of the steps measured, [kind, attributes] as
+    # given in the config, every step is measured if there is none
+    sampling = []
 
     #
     # METHODS
@@ -101,35 +178,317 @@ class Measurement(BaseMeasurement):
     # __init__(self, environment, runner)
     # Initialises the Measurements object and reads the config
     # -------------------------------------------------------------------------
+    # If track_aggregates is set in the environment, the outputs which have
+    # terms in aggregates are kept up to date by the environment as the
+    # transactions change (see Environment.add_aggregate) instead of being
+    # summed over the books of the agents every step
+    # -------------------------------------------------------------------------
     def __init__(self, environment, runner):
         super(Measurement, self).__init__(environment, runner)
+        if environment.static_parameters.get("track_aggregates", 0):
+            for i in range(0, len(self.config)):
+                ident = self.config[i+1][1]
+                for type_, role, agent_type, sign in aggregates.get(ident, ()):
+                    environment.add_aggregate(ident, type_, role, agent_type, sign)
     # -------------------------------------------------------------------------
 
     # -------------------------------------------------------------------------
     # open_file(self)
     # Opens the file and writes the headers
+    # if there are multiple simulations, the run, simulation and seed are
+    # added to the name (see get_simulation_filename)
+    # csv.gz is written to the file name with .gz added, npz to the file
+    # name with .npz instead of .csv, its values are first written to a .npy
+    # file next to it, which is put into the npz file by close_file
+    # and the background writer is started if there is one
     # -------------------------------------------------------------------------
     def open_file(self):
-        super(Measurement, self).open_file()
+        if self.environment.num_simulations > 1:
+            self.filename = self.get_simulation_filename(self.runner.run_id, self.runner.simulation, self.runner.seed)
+        self.open_output()
+        if self.background:
+            self.start_writer()
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # open_output(self)
+    # Opens the file of the measurement in its format and writes the headers
+    # -------------------------------------------------------------------------
+    def open_output(self):
+        headers = []
+        for i in range(0, len(self.config)):
+            headers.append(self.config[i+1][0])
+        if self.format == "csv":
+            self.file = open(self.filename, 'w')
+            self.csv_writer = csv.writer(self.file, lineterminator='\n')
+            self.csv_writer.writerow(headers)
+        else:
+            self.block_count = 0
+            self.written_rows = 0
+            if self.format == "csv.gz":
+                # gzip files are opened in text mode for the csv writer in python 3
+                self.file = gzip.open(self.get_output_filename(), "wb" if sys.version_info[0] < 3 else "wt")
+                self.csv_writer = csv.writer(self.file, lineterminator='\n')
+                self.csv_writer.writerow(headers)
+                self.block = []
+            elif self.format == "npz":
+                self.file = open(self.get_output_filename() + ".values.npy", "wb")
+                self.file.write(get_npy_header(self.get_npy_descr(), (0, len(headers))))
+                if np is not None:
+                    self.block = np.zeros(self.block_rows * len(headers))
+                else:
+                    self.block = array("d", [0.0]) * (self.block_rows * len(headers))
+            else:
+                raise ValueError("Unknown format of the measurement: " + self.format)
     # -------------------------------------------------------------------------
 
     # -------------------------------------------------------------------------
     # write_to_file(self)
     # Writes a row of values for to store the state of the system
     # at the time of calling this method
+    # the values are given by the getters of the columns, the rows of csv.gz
+    # and npz files are kept in a block and written block_rows at a time,
+    # npz files take numbers only, with a background writer the values are
+    # only read here and the rows are written by the writer
     # -------------------------------------------------------------------------
     def write_to_file(self):
-        super(Measurement, self).write_to_file()
+        out_row = [get() for get in self.column_getters]
+        if self.writer is not None:
+            # an error of the writer is raised here, and the queue only
+            # takes queue_size rows, so the simulation waits for the disk
+            # rather than keeping ever more rows in memory
+            self.check_writer()
+            self.rows_queue.put(out_row)
+        else:
+            self.write_row(out_row)
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # write_row(self, out_row)
+    # Writes a row of values in the format of the measurement
+    # -------------------------------------------------------------------------
+    def write_row(self, out_row):
+        if self.format == "csv" or self.buffered:
+            self.csv_writer.writerow(out_row)
+            return
+        if self.format == "csv.gz":
+            self.block.append(out_row)
+        else:
+            start = self.block_count * len(out_row)
+            self.block[start:start + len(out_row)] = array("d", [float(value) for value in out_row])
+        self.block_count = self.block_count + 1
+        if self.block_count == self.block_rows:
+            self.flush_block()
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # flush_block(self)
+    # Writes the rows kept in the block to the file and empties the block
+    # -------------------------------------------------------------------------
+    def flush_block(self):
+        if self.format == "csv.gz":
+            self.csv_writer.writerows(self.block)
+            self.block = []
+        else:
+            self.block[:self.block_count * len(self.config)].tofile(self.file)
+        self.written_rows = self.written_rows + self.block_count
+        self.block_count = 0
     # -------------------------------------------------------------------------
 
     # -------------------------------------------------------------------------
     # close_file(self, filename)
     # Closes the file so we don't have issues with the disk and the file
+    # the npz file gets the array values (rows by columns, float64) from
+    # the .npy file written so far, and the array columns with the headers
+    # the rows still waiting for the background writer are written first,
+    # and an error of the writer is raised once the file is closed
     # -------------------------------------------------------------------------
     def close_file(self):
-        super(Measurement, self).close_file()
+        if self.writer is not None:
+            self.stop_writer()
+        if self.format == "csv":
+            super(Measurement, self).close_file()
+        else:
+            self.flush_block()
+            self.block = None
+            if self.format == "npz":
+                # the header is rewritten with the number of rows written
+                self.file.seek(0)
+                self.file.write(get_npy_header(self.get_npy_descr(), (self.written_rows, len(self.config))))
+                self.file.close()
+                headers = []
+                for i in range(0, len(self.config)):
+                    header = self.config[i+1][0]
+                    headers.append(header.decode("utf-8") if isinstance(header, bytes) else header)
+                length = max([1] + [len(header) for header in headers])
+                columns = get_npy_header(self.get_npy_descr("U%d" % length), (len(headers),))
+                columns = columns + b"".join(header.ljust(length, u"\0").encode(self.get_npy_encoding()) for header in headers)
+                values_filename = self.get_output_filename() + ".values.npy"
+                with zipfile.ZipFile(self.get_output_filename(), "w", zipfile.ZIP_STORED, allowZip64=True) as npz_file:
+                    npz_file.writestr("columns.npy", columns)
+                    npz_file.write(values_filename, "values.npy")
+                os.remove(values_filename)
+            else:
+                self.file.close()
+        self.check_writer()
     # -------------------------------------------------------------------------
 
+    # -------------------------------------------------------------------------
+    # get_simulation_filename(self, run_id, simulation, seed)
+    # Returns the name of the file of a simulation, the file name with the
+    # run id, and the number and seed of the simulation (if given) added,
+    # so that the files of the simulations of one run, and of runs side
+    # by side, do not collide
+    # -------------------------------------------------------------------------
+    def get_simulation_filename(self, run_id, simulation=None, seed=None):
+        name = self.filename.split(".csv")[0] + "_" + str(run_id)
+        if simulation is not None:
+            name = name + "_" + str(simulation)
+        if seed is not None:
+            name = name + "_" + str(seed)
+        return name + ".csv"
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # get_output_filename(self)
+    # Returns the name of the file the measurements are written to in the
+    # format of the measurement
+    # -------------------------------------------------------------------------
+    def get_output_filename(self):
+        if self.format == "csv.gz":
+            return self.filename + ".gz"
+        if self.format == "npz":
+            return self.filename.split(".csv")[0] + ".npz"
+        return self.filename
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # get_npy_descr(self, kind="f8")
+    # Returns the numpy type descriptor of the numbers (or with kind U of the
+    # strings) written to npz files, in the byte order of the machine
+    # -------------------------------------------------------------------------
+    def get_npy_descr(self, kind="f8"):
+        return ("<" if sys.byteorder == "little" else ">") + kind
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # get_npy_encoding(self)
+    # Returns the encoding of the strings written to npz files, which numpy
+    # keeps as 4 bytes per character in the byte order of the machine
+    # -------------------------------------------------------------------------
+    def get_npy_encoding(self):
+        return "utf-32-le" if sys.byteorder == "little" else "utf-32-be"
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # start_writer(self)
+    # Starts the thread writing the rows in the background
+    # -------------------------------------------------------------------------
+    def start_writer(self):
+        self.rows_queue = Queue(self.queue_size)
+        self.writer_error = None
+        self.writer = threading.Thread(target=self.run_writer)
+        self.writer.daemon = True
+        self.writer.start()
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # run_writer(self)
+    # Writes the rows from the queue until it gets None, after an error the
+    # rows are still taken from the queue, but not written
+    # -------------------------------------------------------------------------
+    def run_writer(self):
+        while True:
+            out_row = self.rows_queue.get()
+            if out_row is None:
+                break
+            if self.writer_error is None:
+                try:
+                    self.write_row(out_row)
+                except Exception as error:
+                    logging.exception("  ERROR: the measurement could not write to %s", self.get_output_filename())
+                    self.writer_error = error
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # stop_writer(self)
+    # Waits for the background writer to write the rows in the queue
+    # -------------------------------------------------------------------------
+    def stop_writer(self):
+        self.rows_queue.put(None)
+        self.writer.join()
+        self.writer = None
+        self.rows_queue = None
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # check_writer(self)
+    # Raises the error the background writer ran into, if any
+    # -------------------------------------------------------------------------
+    def check_writer(self):
+        if self.writer_error is not None:
+            error = self.writer_error
+            self.writer_error = None
+            raise error
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # open_buffer(self)
+    # Like open_file, but the rows are written to a buffer in memory, which
+    # is used when the simulation runs in a worker process and the rows
+    # are sent back to the parent process to be written to the file
+    # the buffer is csv whatever the format of the measurement, the parent
+    # writes the file in the format (see write_output), and the background
+    # writer is started if there is one
+    # -------------------------------------------------------------------------
+    def open_buffer(self):
+        self.buffered = True
+        self.file = StringIO()
+        self.csv_writer = csv.writer(self.file, lineterminator='\n')
+        # We write the headers first, by the column number
+        headers = []
+        for i in range(0, len(self.config)):
+            headers.append(self.config[i+1][0])
+        self.csv_writer.writerow(headers)
+        if self.background:
+            self.start_writer()
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # close_buffer(self)
+    # Returns what was written to the buffer, as it would be in a csv file,
+    # and closes the buffer, the rows still waiting for the background
+    # writer are written first, and an error of the writer is raised
+    # -------------------------------------------------------------------------
+    def close_buffer(self):
+        if self.writer is not None:
+            self.stop_writer()
+        output = self.file.getvalue()
+        self.file.close()
+        self.buffered = False
+        self.check_writer()
+        return output
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # write_output(self, filename, output)
+    # Writes the output of a buffer (see close_buffer) to the file filename
+    # in the format of the measurement (e.g. filename with .npz instead of
+    # .csv for npz), csv is written as it is, and the rows are written again
+    # to csv.gz and npz files, the filename of the measurement is kept
+    # -------------------------------------------------------------------------
+    def write_output(self, filename, output):
+        if self.format == "csv":
+            with open(filename, "w") as output_file:
+                output_file.write(output)
+            return
+        measurement_filename = self.filename
+        self.filename = filename
+        self.open_output()
+        for out_row in list(csv.reader(output.splitlines()))[1:]:
+            self.write_row(out_row)
+        self.close_file()
+        self.filename = measurement_filename
     # -------------------------------------------------------------------------
     # read_xml_config_file(self, config_file_name)
     # Read the xml config file specifying the config file
@@ -154,27 +513,123 @@ class Measurement(BaseMeasurement):
     #     <parameter type='output' column='2' header='Deposits' value='household_deposits' ></parameter>
     # </measurement>
     #
+    # The format of the output can be given with
+    #     <parameter type='format' value='npz' rows='1000'></parameter>
+    # which is csv (the default), csv.gz or npz, where rows is the number of
+    # rows kept in memory before they are written (1000 by default)
+    # The rows can be written by a thread in the background with
+    #     <parameter type='writer' value='background' queue='1000'></parameter>
+    # where queue is the number of rows which may wait to be written
+    # Only some of the steps are measured if a sampling schedule is given,
+    # with any number of
+    #     <parameter type='sampling' value='stride' stride='10'></parameter>
+    #     <parameter type='sampling' value='steps' steps='1,50,100'></parameter>
+    #     <parameter type='sampling' value='shocks' before='2' after='5'></parameter>
+    # see get_sampled_steps
     # -------------------------------------------------------------------------
     def read_xml_config_file(self, config_file_name):
         super(Measurement, self).read_xml_config_file(config_file_name)
+        from xml.etree import ElementTree
+        self.format = "csv"
+        self.block_rows = 1000
+        self.background = False
+        self.queue_size = 1000
+        self.sampling = []
+        for subelement in ElementTree.parse(config_file_name).getroot():
+            if subelement.attrib['type'] == 'format':
+                self.format = str(subelement.attrib['value'])
+                self.block_rows = int(subelement.attrib.get('rows', 1000))
+            if subelement.attrib['type'] == 'writer':
+                self.background = (str(subelement.attrib['value']) == 'background')
+                self.queue_size = int(subelement.attrib.get('queue', 1000))
+            if subelement.attrib['type'] == 'sampling':
+                self.sampling.append([str(subelement.attrib['value']), dict(subelement.attrib)])
+        self.column_getters = []
+        for i in range(0, len(self.config)):
+            self.column_getters.append(self.get_getter(self.config[i+1][1]))
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # get_sampled_steps(self, num_sweeps)
+    # Returns the set of steps (counted from 1, as the shocks are) which are
+    # measured in a run of num_sweeps steps, or None if all of them are
+    # A step is measured if any part of the sampling schedule has it:
+    # - stride: every stride-th step, i.e. stride, 2*stride, ...
+    # - steps: the steps listed, separated by commas
+    # - shocks: the steps of every shock of the environment together with
+    #   before steps before it starts and after steps after it ends
+    # -------------------------------------------------------------------------
+    def get_sampled_steps(self, num_sweeps):
+        if len(self.sampling) == 0:
+            return None
+        steps = set()
+        for kind, attributes in self.sampling:
+            if kind == "stride":
+                stride = int(attributes['stride'])
+                if stride < 1:
+                    raise ValueError("The stride of the sampling must be at least 1, not " + str(stride))
+                steps.update(range(stride, num_sweeps + 1, stride))
+            elif kind == "steps":
+                steps.update(int(step) for step in attributes['steps'].split(",") if step.strip() != "")
+            elif kind == "shocks":
+                before = int(attributes.get('before', 0))
+                after = int(attributes.get('after', 0))
+                for shock in self.environment.shocks:
+                    steps.update(range(int(shock[0]) - before, int(shock[1]) + after + 1))
+            else:
+                raise ValueError("Unknown kind of sampling: " + kind)
+        return set(step for step in steps if 1 <= step <= num_sweeps)
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # get_getter(self, ident)
+    # Returns a function without arguments returning the value of the output
+    # ident for this measurement, the registered getter if there is one, or
+    # else the wrapper, so that subclasses can still add outputs there
+    # -------------------------------------------------------------------------
+    def get_getter(self, ident):
+        if ident in getters:
+            return functools.partial(getters[ident], self)
+        return functools.partial(self.wrapper, ident)
     # -------------------------------------------------------------------------
 
     # -------------------------------------------------------------------------
     # wrapper(self, id)
     # Wrapper for functions returning the desired values to be written
+    # The functions are registered with register_getter below
     # -------------------------------------------------------------------------
     def wrapper(self, ident):
-        if ident == "current_step":
-            return self.runner.current_step+1
-
-        if ident == "household_deposits":
-            #return self.environment.households[0].get_account("deposits")
-            wealth = 0.0
-            for household in self.environment.households:
-                for tranx in household.accounts:
-                    if tranx.type_ == "deposits" and tranx.from_ == household:
-                        wealth = wealth + tranx.amount
-                    if tranx.type_ == "loans" and tranx.to == household:
-                        wealth = wealth - tranx.amount
-            return wealth
+        if ident in getters:
+            return getters[ident](self)
     # -------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------
+# get_current_step(measurement)
+# the step of the runner, counted from 1
+# -------------------------------------------------------------------------
+@register_getter("current_step")
+def get_current_step(measurement):
+    return measurement.runner.current_step+1
+# -------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------
+# get_household_deposits(measurement)
+# the deposits of the households less their loans, read from the aggregate
+# of the environment if it is kept
+# -------------------------------------------------------------------------
+@register_getter("household_deposits")
+def get_household_deposits(measurement):
+    if "household_deposits" in measurement.environment.aggregates:
+        return measurement.environment.get_aggregate("household_deposits")
+    wealth = 0.0
+    for household in measurement.environment.households:
+        for tranx in household.accounts.transactions_by_types(("deposits", "loans")):
+            if tranx.type_ == "deposits" and tranx.from_ == household:
+                wealth = wealth + tranx.amount
+            if tranx.type_ == "loans" and tranx.to == household:
+                wealth = wealth - tranx.amount
+    return wealth
+aggregates["household_deposits"] = [("deposits", "from_", "households", 1.0), ("loans", "to", "households", -1.0)]
+# -------------------------------------------------------------------------
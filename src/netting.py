@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+# [SublimeLinter pep8-max-line-length:150]
+# -*- coding: utf-8 -*-
+
+"""
+black_rhino is a multi-agent simulator for financial network analysis
+Copyright (C) 2016 Co-Pierre Georg (co-pierre.georg@keble.ox.ac.uk)
+Pawel Fiedor (pawel@fiedor.eu)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3 of the License.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from collections import OrderedDict
+try:
+    import numpy as np
+except ImportError:  # without numpy the balances are summed over the accounts
+    np = None
+
+# ============================================================================
+#
+# class Netting
+#
+# ============================================================================
+
+
+class Netting(object):
+    #
+    #
+    # VARIABLES
+    #
+    #
+
+    positive_type = ""  # type of transactions from one agent to the other adding to their balance, e.g. "deposits"
+    negative_type = None  # type of transactions in the opposite direction subtracting from it, e.g. "loans"
+
+    #
+    #
+    # CODE
+    #
+    #
+
+    # -------------------------------------------------------------------------
+    # __init__(positive_type, negative_type)
+    # nets transactions between pairs of agents into one position per pair
+    # for a pair (one, two), transactions of positive_type from one to two
+    # add to the balance, and transactions of negative_type from two to one
+    # subtract from it, e.g. deposits of a firm with a bank and loans of
+    # the bank to the firm, without negative_type the transactions of the
+    # pair are just collapsed, e.g. cash of an agent with itself
+    # -------------------------------------------------------------------------
+    def __init__(self, positive_type, negative_type=None):
+        self.positive_type = positive_type
+        self.negative_type = negative_type
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # net(environment, ones, twos, positive_interest, negative_interest)
+    # replaces the transactions netted between agents in ones and agents in
+    # twos with a single transaction per pair: of positive_type from one
+    # to two if the balance is positive, of negative_type from two to one
+    # if it is negative, and nothing if the transactions cancel out
+    # the interest of the new transactions is given by functions of the
+    # pair (one, two), and is zero if these are not given
+    # the new transactions are added for each agent in twos in turn
+    # -------------------------------------------------------------------------
+    def net(self, environment, ones, twos, positive_interest=None, negative_interest=None):
+        balances, to_delete = self.balances(environment, ones, twos)
+        environment.remove_transactions(to_delete)
+        new_transactions = []
+        for pair in balances:
+            one, two = pair
+            balance = balances[pair]
+            if balance > 0.0:
+                interest = 0.0 if positive_interest is None else positive_interest(one, two)
+                new_transactions.append((self.positive_type, "", one, two, balance, interest, 0, -1))
+            elif balance < 0.0:
+                if self.negative_type is None:
+                    raise ValueError("Negative balance of %s without a negative type to net it into." % self.positive_type)
+                interest = 0.0 if negative_interest is None else negative_interest(one, two)
+                new_transactions.append((self.negative_type, "", two, one, abs(balance), interest, 0, -1))
+        environment.new_transactions(new_transactions)
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # balances(environment, ones, twos)
+    # returns the balances of all pairs of agents in ones and twos which
+    # have transactions to be netted, ordered by agents in twos and then
+    # agents in ones, and the list of these transactions
+    # with a columnar ledger (and numpy) the balances are summed over the
+    # ledger's columns in one go, otherwise in one pass over the books
+    # of the agents in twos
+    # -------------------------------------------------------------------------
+    def balances(self, environment, ones, twos):
+        if getattr(environment, "ledger", None) is not None and np is not None:
+            sums, to_delete = self.sum_ledger(environment.ledger, ones, twos)
+        else:
+            sums, to_delete = self.sum_accounts(ones, twos)
+        balances = OrderedDict()
+        for two in twos:
+            for one in ones:
+                if (one, two) in sums:
+                    balances[(one, two)] = sums[(one, two)]
+        return balances, to_delete
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # sum_accounts(ones, twos)
+    # sums the transactions to be netted looking them up in the books of
+    # the agents in twos by type, so every transaction is looked at once,
+    # in the order of the books
+    # -------------------------------------------------------------------------
+    def sum_accounts(self, ones, twos):
+        ones = set(ones)
+        sums = {}
+        to_delete = []
+        if self.negative_type is None:
+            types = (self.positive_type,)
+        else:
+            types = (self.positive_type, self.negative_type)
+        for two in twos:
+            for tranx in two.accounts.transactions_by_types(types):
+                if tranx.type_ == self.positive_type and tranx.to == two and tranx.from_ in ones:
+                    sums[(tranx.from_, two)] = sums.get((tranx.from_, two), 0.0) + tranx.amount
+                    to_delete.append(tranx)
+                elif tranx.type_ == self.negative_type and tranx.from_ == two and tranx.to in ones:
+                    sums[(tranx.to, two)] = sums.get((tranx.to, two), 0.0) - tranx.amount
+                    to_delete.append(tranx)
+        return sums, to_delete
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # sum_ledger(ledger, ones, twos)
+    # sums the transactions to be netted over the columns of the ledger
+    # the pairs are encoded from the agents' codes and summed with bincount,
+    # which adds up the amounts one after another in the order they are
+    # given, the positive and negative transactions together are put in
+    # the order they were made, as on the agents' books, so the balances
+    # come out exactly the same as without the ledger
+    # -------------------------------------------------------------------------
+    def sum_ledger(self, ledger, ones, twos):
+        size = ledger.size
+        number_of_agents = len(ledger.agent_codes.values)
+        one_codes = np.array([ledger.agent_codes.find(one) for one in ones], dtype=np.int64)
+        two_codes = np.array([ledger.agent_codes.find(two) for two in twos], dtype=np.int64)
+        live = ledger.live[:size] == 1
+        from_code = ledger.from_code[:size].astype(np.int64)
+        to_code = ledger.to_code[:size].astype(np.int64)
+        # positive transactions go from one to two
+        positive = live & (ledger.type_code[:size] == ledger.type_codes.find(self.positive_type))
+        positive = positive & np.in1d(from_code, one_codes) & np.in1d(to_code, two_codes)
+        # negative transactions go from two to one
+        selected = positive
+        if self.negative_type is not None:
+            negative = live & (ledger.type_code[:size] == ledger.type_codes.find(self.negative_type))
+            negative = negative & np.in1d(from_code, two_codes) & np.in1d(to_code, one_codes)
+            selected = positive | negative
+        slots = self.in_order(ledger, np.flatnonzero(selected))
+        is_positive = positive[slots]
+        keys = np.where(is_positive, from_code[slots] * number_of_agents + to_code[slots],
+                        to_code[slots] * number_of_agents + from_code[slots])
+        amounts = np.where(is_positive, ledger.amount[slots], -ledger.amount[slots])
+        pairs, inverse = np.unique(keys, return_inverse=True)
+        totals = np.bincount(inverse, weights=amounts, minlength=len(pairs))
+        sums = {}
+        for key, total in zip(pairs, totals):
+            one = ledger.agent_codes.value(int(key) // number_of_agents)
+            two = ledger.agent_codes.value(int(key) % number_of_agents)
+            sums[(one, two)] = float(total)
+        to_delete = [ledger.transactions[slot] for slot in slots]
+        return sums, to_delete
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # in_order(ledger, slots)
+    # sorts the slots by the sequence of the transactions in them, which
+    # is the order the transactions were made in, slots of removed
+    # transactions are reused so the slots are not in that order
+    # -------------------------------------------------------------------------
+    def in_order(self, ledger, slots):
+        sequences = np.array([ledger.transactions[slot].sequence for slot in slots], dtype=np.int64)
+        return slots[np.argsort(sequences, kind="mergesort")]
+    # -------------------------------------------------------------------------
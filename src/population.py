@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# [SublimeLinter pep8-max-line-length:150]
+# -*- coding: utf-8 -*-
+
+"""
+black_rhino is a multi-agent simulator for financial network analysis
+Copyright (C) 2016 Co-Pierre Georg (co-pierre.georg@keble.ox.ac.uk)
+Pawel Fiedor (pawel@fiedor.eu)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3 of the License.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import csv
+import logging
+import os
+
+from src.config_cache import parse_config_file
+
+# ============================================================================
+#
+# class Population
+#
+# ============================================================================
+
+
+class Population(object):
+    #
+    #
+    # VARIABLES
+    #
+    #
+
+    filename = ""  # csv file with one row per agent
+    edges_filename = ""  # csv file with one row per transaction of the agents
+    transaction_columns = ["type", "asset", "from", "to", "amount", "interest", "maturity", "time_of_default"]
+
+    #
+    #
+    # CODE
+    #
+    #
+
+    # -------------------------------------------------------------------------
+    # __init__(filename)
+    # a population keeps all agents of one type in a single csv file instead
+    # of one config file per agent, with a column identifier and one column
+    # per parameter, e.g. for banks:
+    #   identifier,interest_rate_loans,interest_rate_deposits,...
+    #   bank_test_config_id,0.004,0.002,...
+    # the transactions read for these agents are kept as an edge list in a
+    # second csv file next to it, named like the population with .edges.csv,
+    # with columns as the attributes of <transaction> in the config files
+    # -------------------------------------------------------------------------
+    def __init__(self, filename):
+        self.filename = filename
+        self.edges_filename = os.path.splitext(filename)[0] + ".edges.csv"
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # is_population(name)
+    # tells if the directory of an agent type given in the environment is
+    # a population file rather than a directory of config files
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def is_population(name):
+        return name.endswith(".csv")
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # read_agents()
+    # returns (identifier, [(name, value)]) for each agent in the order of the
+    # rows, the parameters in the order of the columns, an empty cell means
+    # the agent has no such parameter
+    # -------------------------------------------------------------------------
+    def read_agents(self):
+        agents = []
+        with open(self.filename) as population_file:
+            reader = csv.reader(population_file)
+            names = next(reader)[1:]
+            for row in reader:
+                parameters = [(name, float(value)) for name, value in zip(names, row[1:]) if value != ""]
+                agents.append((row[0], parameters))
+        return agents
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # read_transactions()
+    # returns the transactions in the edge list, by the ids of their parties,
+    # as rows for environment.new_transactions, or none if there is no edge list
+    # -------------------------------------------------------------------------
+    def read_transactions(self):
+        transactions = []
+        if not os.path.exists(self.edges_filename):
+            return transactions
+        with open(self.edges_filename) as edges_file:
+            reader = csv.reader(edges_file)
+            next(reader)
+            for row in reader:
+                transactions.append((row[0], row[1], row[2], row[3],
+                                     float(row[4]), float(row[5]), float(row[6]), float(row[7])))
+        return transactions
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # write(agents, transactions)
+    # writes the agents, as (identifier, [(name, value)]), and the
+    # transactions, as rows by the ids of their parties, to the population
+    # file and its edge list, the numbers are written with repr so that they
+    # are read back exactly
+    # -------------------------------------------------------------------------
+    def write(self, agents, transactions):
+        names = []
+        for identifier, parameters in agents:
+            for name, value in parameters:
+                if name not in names:
+                    names.append(name)
+        with open(self.filename, "w") as population_file:
+            writer = csv.writer(population_file, lineterminator="\n")
+            writer.writerow(["identifier"] + names)
+            for identifier, parameters in agents:
+                values = dict(parameters)
+                writer.writerow([identifier] + [repr(values[name]) if name in values else "" for name in names])
+        with open(self.edges_filename, "w") as edges_file:
+            writer = csv.writer(edges_file, lineterminator="\n")
+            writer.writerow(self.transaction_columns)
+            for row in transactions:
+                writer.writerow(list(row[:4]) + [repr(value) for value in row[4:]])
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # export_directory(directory)
+    # writes the agents and transactions in a directory of config files to
+    # the population, in the order the files are read by the environment
+    # -------------------------------------------------------------------------
+    def export_directory(self, directory):
+        agents = []
+        transactions = []
+        for infile in os.listdir(directory):
+            parsed = parse_config_file((directory + infile, None))
+            if parsed is None:
+                logging.error("    ERROR: %s could not be parsed",  directory + infile)
+                continue
+            agents.append(parsed["agent"][:2])
+            transactions.extend(parsed["transactions"])
+        self.write(agents, transactions)
+        logging.info("  %s agents and %s transactions exported from %s to %s",
+                     str(len(agents)), str(len(transactions)), directory, self.filename)
+    # -------------------------------------------------------------------------
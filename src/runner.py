@@ -20,9 +20,15 @@ You should have received a copy of the GNU General Public License
 along with this program. If not, see <http://www.gnu.org/licenses/>.
 """
 
+import hashlib
+import logging
+import os
+import uuid
+
 from src.updater import Updater
 from abm_template.src.baserunner import BaseRunner
 from src.measurement import Measurement
+from src.shard import Shard
 from src.shock import Shock
 
 # -------------------------------------------------------------------------
@@ -42,6 +48,11 @@ class Runner(BaseRunner):
     identifier = ""
     num_sweeps = 0
     current_step = 0
+    in_memory = False  # if True, do_run keeps the measurement output in memory, in output, instead of writing it
+    output = None  # measurement output of the last run, if it was kept in memory
+    run_id = ""  # identifier of the run, shared by all its simulations, static_parameters["run_id"] or a random one
+    simulation = None  # number of the simulation being run, if it is one of several
+    seed = None  # seed of the simulation being run, if it is seeded
 
     #
     #
@@ -53,6 +64,7 @@ class Runner(BaseRunner):
     # __init__
     # -------------------------------------------------------------------------
     def __init__(self, environment):
+        self.run_id = str(environment.static_parameters.get("run_id", "")) or uuid.uuid4().hex[:12]
         self.initialize(environment)
     # -------------------------------------------------------------------------
 
@@ -102,8 +114,13 @@ class Runner(BaseRunner):
         # measurement = Measurement("Measurement", environment, self, {1: ["Step", "static", "self.runner.current_step"],
         # 2: ["Deposits", "dynamic", "self.environment.households[0].get_account", ["deposits"]]}, "TestMeasurement.csv")
         measurement = Measurement(environment, self)
-        # And open the output file
-        measurement.open_file()
+        # And open the output file, or a buffer if the output is to be sent to another process
+        if self.in_memory:
+            measurement.open_buffer()
+        else:
+            measurement.open_file()
+        # The steps measured, None if all of them are (see Measurement.get_sampled_steps)
+        sampled_steps = measurement.get_sampled_steps(self.num_sweeps)
         # We start the shock class as well
         shock_class = Shock()
         # For each update step
@@ -119,8 +136,9 @@ class Runner(BaseRunner):
             self.current_step = i
             # do the actual update
             self.updater.do_update(environment, i)
-            # write the state of the system
-            measurement.write_to_file()
+            # write the state of the system, if the step is measured
+            if sampled_steps is None or i+1 in sampled_steps:
+                measurement.write_to_file()
             # Do the shock (revert the shock if necessary):
             # First we check if the shock occurs at the current sweep
             # Then we run the shock procedure at the end of the update
@@ -156,5 +174,172 @@ class Runner(BaseRunner):
             print(environment.banks[0])
             # print(environment.firms[0])
         # Close the output file at the end of the simulation
-        measurement.close_file()
+        if self.in_memory:
+            self.output = measurement.close_buffer()
+        else:
+            measurement.close_file()
     # ------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # do_ensemble(environment, environment_directory, identifier, processes)
+    # runs the num_simulations simulations of the environment in a pool of
+    # worker processes, see do_simulations, each simulation seeds the random
+    # numbers with a seed derived from the master seed (static_parameters["seed"],
+    # 0 by default) and its number, and its measurement output is written
+    # to the measurement file with the run id, the number of the simulation
+    # and its seed added to the name (see Measurement.get_simulation_filename),
+    # in the format of the measurement (see Measurement.write_output),
+    # so the output is the same whatever the number of processes, and
+    # ensembles side by side or with other seeds do not overwrite it
+    # if static_parameters["measurement_shards"] is set, every worker process
+    # instead appends the output of its simulations to its own shard (see
+    # src/shard.py), and the names of the shards are returned, which can be
+    # merged into one file with tools/br-merge_shards.py, the shards are
+    # always csv, and another format of the measurement is logged as an error
+    # -------------------------------------------------------------------------
+    def do_ensemble(self, environment, environment_directory, identifier, processes):
+        seed = int(environment.static_parameters.get("seed", 0))
+        simulations = [(run, get_run_seed(seed, run), None) for run in range(int(environment.num_simulations))]
+        shards = bool(int(environment.static_parameters.get("measurement_shards", 0)))
+        measurement = Measurement(environment, self)
+        if shards and measurement.format != "csv":
+            logging.error("  ERROR: the shards are written as csv, not in the format of the measurement: %s", measurement.format)
+        shard_filenames = set()
+        for run, output in self.do_simulations(environment, environment_directory, identifier, processes, simulations, shards):
+            if shards:
+                shard_filenames.add(output)
+            else:
+                measurement.write_output(measurement.get_simulation_filename(self.run_id, run, get_run_seed(seed, run)), output)
+            logging.info('  DONE with run %s',  str(run))
+        return sorted(shard_filenames)
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # do_simulations(environment, environment_directory, identifier, processes, simulations, shards=False)
+    # runs the simulations (key, seed, values) in a pool of worker processes,
+    # each of which reads the environment once and then resets it for every
+    # simulation it is given, sets the variable parameters in values (if
+    # any) and seeds its random numbers with seed, yields the key and the
+    # measurement output of each simulation, in the order of the simulations
+    # with one process the simulations run in this process, without a pool,
+    # but from an environment and runner read from the files in the same
+    # way as in a worker process, so the environment and runner passed in
+    # are left as they are, and changes made to them in code after they
+    # were read are not seen by the simulations, whatever the number of processes
+    # with shards the output of each simulation is appended to the shard of
+    # the worker, and the name of the shard is yielded instead
+    # -------------------------------------------------------------------------
+    def do_simulations(self, environment, environment_directory, identifier, processes, simulations, shards=False):
+        import multiprocessing
+        if processes > 1:
+            pool = multiprocessing.Pool(processes, initialize_worker, (environment_directory, identifier, self.run_id, shards))
+            results = pool.imap(run_simulation, simulations)
+        else:
+            pool = None
+            initialize_worker(environment_directory, identifier, self.run_id, shards)
+            results = (run_simulation(simulation) for simulation in simulations)
+        try:
+            for result in results:
+                yield result
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+            else:
+                worker.clear()
+    # -------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------
+# the environment and runner of a worker process of an ensemble
+# -------------------------------------------------------------------------
+worker = {}
+
+
+# -------------------------------------------------------------------------
+# get_run_seed(seed, run)
+# derives the seed of a simulation from the master seed and its number,
+# so that every simulation has its own stream of random numbers
+# -------------------------------------------------------------------------
+def get_run_seed(seed, run):
+    return int(hashlib.md5((str(seed) + ":" + str(run)).encode("utf-8")).hexdigest()[:15], 16)
+# -------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------
+# initialize_worker(environment_directory, identifier, run_id, shards)
+# reads the environment once in a worker process of an ensemble, whose
+# runner takes the run id of the ensemble
+# -------------------------------------------------------------------------
+def initialize_worker(environment_directory, identifier, run_id, shards):
+    from src.environment import Environment
+    environment = Environment(environment_directory, identifier)
+    worker["environment"] = environment
+    worker["runner"] = Runner(environment)
+    worker["runner"].run_id = run_id
+    worker["shard"] = get_worker_shard(environment, worker["runner"]) if shards else None
+# -------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------
+# get_worker_shard(environment, runner)
+# returns the name of the shard of this process for the run of the runner
+# -------------------------------------------------------------------------
+def get_worker_shard(environment, runner):
+    return Shard.get_filename(Measurement(environment, runner).filename, runner.run_id, os.getpid())
+# -------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------
+# set_values(environment, values)
+# sets the parameters in values where the model reads them during a run,
+# i.e. the static parameters of the environment and the parameters of the
+# agents with these names (e.g. propensity_to_save of the households), as
+# well as the variable parameters, which are kept for the record only
+# raises KeyError for a parameter which is neither, as setting it would
+# leave the simulation unchanged
+# -------------------------------------------------------------------------
+def set_values(environment, values):
+    for name in values:
+        found = False
+        if name in environment.static_parameters:
+            environment.static_parameters[name] = values[name]
+            found = True
+        for agent in environment.agents_generator():
+            if name in agent.parameters:
+                agent.parameters[name] = values[name]
+                found = True
+        if not found:
+            raise KeyError("Parameter " + name + " is not a static parameter of the environment nor a parameter of its agents")
+        environment.variable_parameters[name] = values[name]
+# -------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------
+# run_simulation(simulation)
+# runs the simulation (key, seed, values) from the environment as read
+# from the config files, with the parameters in values set to these (see
+# set_values), and returns its key and measurement output, or the name of
+# the shard of the worker the output was appended to
+# -------------------------------------------------------------------------
+def run_simulation(simulation):
+    key, seed, values = simulation
+    environment = worker["environment"]
+    runner = worker["runner"]
+    environment.reset()
+    if values is not None:
+        set_values(environment, values)
+    environment.seed_random(seed)
+    runner.initialize(environment)
+    runner.simulation = key
+    runner.seed = seed
+    runner.in_memory = True
+    try:
+        runner.do_run(environment)
+    finally:
+        runner.in_memory = False
+    if worker.get("shard") is not None:
+        Shard(worker["shard"]).append(runner.run_id, key, seed, runner.output)
+        return (key, worker["shard"])
+    return (key, runner.output)
+# -------------------------------------------------------------------------
@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+# [SublimeLinter pep8-max-line-length:150]
+# -*- coding: utf-8 -*-
+
+"""
+black_rhino is a multi-agent simulator for financial network analysis
+Copyright (C) 2016 Co-Pierre Georg (co-pierre.georg@keble.ox.ac.uk)
+Pawel Fiedor (pawel@fiedor.eu)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3 of the License.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import csv
+import heapq
+import logging
+import os
+
+# ============================================================================
+#
+# class Shard
+#
+# ============================================================================
+
+
+class Shard(object):
+    #
+    #
+    # VARIABLES
+    #
+    #
+
+    filename = ""  # csv file with the measurements of the simulations run by one worker
+    index_columns = ["run_id", "simulation", "seed"]  # columns before the measurements telling the simulations apart
+
+    #
+    #
+    # CODE
+    #
+    #
+
+    # -------------------------------------------------------------------------
+    # __init__(filename)
+    # a shard keeps the measurements of all simulations run by one worker
+    # process of an ensemble in a single csv file, instead of one file per
+    # simulation, every row starts with the run id, the number of the
+    # simulation and its seed, followed by the columns of the measurement
+    # -------------------------------------------------------------------------
+    def __init__(self, filename):
+        self.filename = filename
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # get_filename(measurement_filename, run_id, worker)
+    # returns the name of the shard of a worker, the measurement file with
+    # the run id and the worker added to the name, so that shards of
+    # different runs and different workers never share a file
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def get_filename(measurement_filename, run_id, worker):
+        return measurement_filename.split(".csv")[0] + "_" + str(run_id) + "_shard_" + str(worker) + ".csv"
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # append(run_id, simulation, seed, output)
+    # appends the measurement output of a simulation, as written to a
+    # measurement buffer (see Measurement.open_buffer), to the shard, the
+    # headers are written when the shard is started
+    # -------------------------------------------------------------------------
+    def append(self, run_id, simulation, seed, output):
+        rows = csv.reader(output.splitlines())
+        headers = next(rows)
+        started = os.path.exists(self.filename) and os.path.getsize(self.filename) > 0
+        with open(self.filename, "a") as shard_file:
+            writer = csv.writer(shard_file, lineterminator='\n')
+            if not started:
+                writer.writerow(self.index_columns + headers)
+            for row in rows:
+                writer.writerow([run_id, simulation, seed] + row)
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # read_rows()
+    # yields the headers of the shard and then its rows, one at a time
+    # -------------------------------------------------------------------------
+    def read_rows(self):
+        with open(self.filename) as shard_file:
+            for row in csv.reader(shard_file):
+                yield row
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # merge(filenames, filename)
+    # merges the shards into one csv file with the same columns, with the
+    # simulations in the order of their numbers, the simulations in each
+    # shard are in that order already, so the shards are merged row by
+    # row without reading them into memory, returns the number of rows
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def merge(filenames, filename):
+        shards = [Shard(shard_filename).read_rows() for shard_filename in filenames]
+        headers = None
+        for shard_filename, rows in zip(filenames, shards):
+            shard_headers = next(rows)
+            if headers is None:
+                headers = shard_headers
+            elif shard_headers != headers:
+                raise ValueError("The columns of " + shard_filename + " are not those of " + filenames[0])
+        # the rows are keyed by the simulation, the shard and their place in it
+        def key_rows(number, rows):
+            for place, row in enumerate(rows):
+                yield ((int(row[1]), number, place), row)
+        keyed = [key_rows(number, rows) for number, rows in enumerate(shards)]
+        count = 0
+        with open(filename, "w") as merged_file:
+            writer = csv.writer(merged_file, lineterminator='\n')
+            if headers is not None:
+                writer.writerow(headers)
+            for key, row in heapq.merge(*keyed):
+                writer.writerow(row)
+                count = count + 1
+        logging.info("  %s rows of %s shards merged into %s", str(count), str(len(filenames)), filename)
+        return count
+    # -------------------------------------------------------------------------
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# [SublimeLinter pep8-max-line-length:150]
+# -*- coding: utf-8 -*-
+
+"""
+black_rhino is a multi-agent simulator for financial network analysis
+Copyright (C) 2016 Co-Pierre Georg (co-pierre.georg@keble.ox.ac.uk)
+Pawel Fiedor (pawel@fiedor.eu)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3 of the License.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import csv
+import itertools
+import logging
+import random
+
+from src.measurement import Measurement
+from src.runner import get_run_seed
+
+# ============================================================================
+#
+# class Sweep
+#
+# ============================================================================
+
+
+class Sweep(object):
+    #
+    #
+    # VARIABLES
+    #
+    #
+
+    design = "grid"  # grid, lhs (latin hypercube) or random
+    points = 2  # values per parameter for a grid, number of points for lhs and random
+    replications = 1  # simulations per point of the design
+    seed = 0  # master seed of the random numbers of the design and the simulations
+    ranges = {}  # variable parameter -> [range_from, range_to]
+
+    #
+    #
+    # CODE
+    #
+    #
+
+    # -------------------------------------------------------------------------
+    # __init__(environment)
+    # sweeps the variable parameters of the environment over their ranges,
+    # the design is given by static parameters in the environment file:
+    #   sweep_design: grid, lhs or random (grid by default)
+    #   sweep_points: values per parameter for a grid (evenly spaced from
+    #                 range_from to range_to), or the number of points for
+    #                 lhs and random (2 by default)
+    #   sweep_replications: simulations per point (1 by default)
+    #   seed: master seed (0 by default)
+    # -------------------------------------------------------------------------
+    def __init__(self, environment):
+        self.design = str(environment.static_parameters.get("sweep_design", "grid"))
+        self.points = int(environment.static_parameters.get("sweep_points", 2))
+        self.replications = int(environment.static_parameters.get("sweep_replications", 1))
+        self.seed = int(environment.static_parameters.get("seed", 0))
+        self.ranges = dict((name, list(value)) for name, value in environment.variable_parameters.items()
+                           if isinstance(value, list))
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # get_names()
+    # returns the names of the parameters swept, in the order of the columns
+    # -------------------------------------------------------------------------
+    def get_names(self):
+        return sorted(self.ranges)
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # get_design()
+    # returns the points of the design as {parameter: value}
+    # the points of lhs and random designs are drawn from their own stream
+    # of random numbers, seeded with the master seed
+    # -------------------------------------------------------------------------
+    def get_design(self):
+        names = self.get_names()
+        generator = random.Random(self.seed)
+        if self.design == "grid":
+            axes = []
+            for name in names:
+                range_from, range_to = self.ranges[name]
+                if self.points == 1:
+                    axes.append([range_from])
+                else:
+                    step = (range_to - range_from) / (self.points - 1)
+                    axes.append([range_from + i * step for i in range(self.points - 1)] + [range_to])
+            return [dict(zip(names, values)) for values in itertools.product(*axes)]
+        elif self.design == "lhs":
+            # every parameter has one point in each of the points strata of its range
+            columns = []
+            for name in names:
+                range_from, range_to = self.ranges[name]
+                strata = list(range(self.points))
+                generator.shuffle(strata)
+                columns.append([range_from + (stratum + generator.random()) * (range_to - range_from) / self.points
+                                for stratum in strata])
+            return [dict(zip(names, [column[i] for column in columns])) for i in range(self.points)]
+        elif self.design == "random":
+            return [dict((name, generator.uniform(self.ranges[name][0], self.ranges[name][1])) for name in names)
+                    for i in range(self.points)]
+        else:
+            raise ValueError("Unknown design of the sweep: " + self.design)
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # do_sweep(runner, environment, environment_directory, identifier, processes)
+    # runs the replications of every point of the design with the runner, in
+    # a pool of processes (see Runner.do_simulations), and writes all their
+    # measurements to one table, the measurement file with _sweep added to
+    # the name, with the columns point, replication and the parameters
+    # swept before the measurements, the table is the same whatever the
+    # number of processes, and its name is returned, the table is always
+    # csv, and another format of the measurement is logged as an error
+    # -------------------------------------------------------------------------
+    def do_sweep(self, runner, environment, environment_directory, identifier, processes):
+        names = self.get_names()
+        design = self.get_design()
+        simulations = []
+        for point, values in enumerate(design):
+            for replication in range(self.replications):
+                run = point * self.replications + replication
+                simulations.append(((point, replication), get_run_seed(self.seed, run), values))
+        measurement = Measurement(environment, runner)
+        if measurement.format != "csv":
+            logging.error("  ERROR: the sweep table is written as csv, not in the format of the measurement: %s", measurement.format)
+        filename = measurement.filename.split(".csv")[0] + "_sweep.csv"
+        with open(filename, "w") as table_file:
+            writer = csv.writer(table_file, lineterminator='\n')
+            headers = None
+            for (point, replication), output in runner.do_simulations(environment, environment_directory, identifier,
+                                                                        processes, simulations):
+                rows = list(csv.reader(output.splitlines()))
+                if headers is None:
+                    headers = ["point", "replication"] + names + rows[0]
+                    writer.writerow(headers)
+                index = [point, replication] + [design[point][name] for name in names]
+                for row in rows[1:]:
+                    writer.writerow(index + row)
+                logging.info('  DONE with point %s, replication %s',  str(point), str(replication))
+        return filename
+    # -------------------------------------------------------------------------
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# [SublimeLinter pep8-max-line-length:150]
+# -*- coding: utf-8 -*-
+
+"""
+black_rhino is a multi-agent simulator for financial network analysis
+Copyright (C) 2016 Co-Pierre Georg (co-pierre.georg@keble.ox.ac.uk)
+Pawel Fiedor (pawel@fiedor.eu)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3 of the License.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import copy
+
+# ============================================================================
+#
+# class Template
+#
+# ============================================================================
+
+
+class Template(object):
+    #
+    #
+    # VARIABLES
+    #
+    #
+
+    identifier = ""  # identifier of the environment
+    static_parameters = {}  # static parameters of the environment as read from the config
+    variable_parameters = {}  # variable parameters of the environment as read from the config
+    assets = {}  # assets of the environment as read from the config
+    shocks = []  # shocks of the environment as read from the config
+    agents = ()  # (group, class, identifier, parameters, state_variables) of each agent
+    transactions = ()  # (type_, asset, from_, to, amount, interest, maturity, time_of_default), ids of from_ and to
+
+    #
+    #
+    # CODE
+    #
+    #
+
+    # -------------------------------------------------------------------------
+    # __init__(environment)
+    # takes a copy of the environment as it is after reading the config files,
+    # i.e. of its parameters, its agents and their transactions, which is
+    # never handed out or changed afterwards, so that the environment can be
+    # reset to it for each simulation without reading the files again
+    # the transactions are kept in the order they were added, so that the
+    # books of the agents come out in the same order after a reset
+    # -------------------------------------------------------------------------
+    def __init__(self, environment):
+        self.identifier = environment.identifier
+        self.static_parameters = copy.deepcopy(environment.static_parameters)
+        self.variable_parameters = copy.deepcopy(environment.variable_parameters)
+        self.assets = copy.deepcopy(environment.assets)
+        self.shocks = copy.deepcopy(environment.shocks)
+        agents = []
+        transactions = {}
+        for group, members in enumerate(environment.agents):
+            for agent in members:
+                agents.append((group, type(agent), agent.identifier,
+                               copy.deepcopy(agent.parameters), copy.deepcopy(agent.state_variables)))
+                for tranx in agent.accounts:
+                    transactions[tranx] = (tranx.type_, tranx.asset, tranx.from_.identifier, tranx.to.identifier,
+                                           tranx.amount, tranx.interest, tranx.maturity, tranx.time_of_default)
+        self.agents = tuple(agents)
+        self.transactions = tuple(transactions[tranx] for tranx in sorted(transactions, key=lambda tranx: tranx.sequence))
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # reset(environment)
+    # puts copies of the parameters and new agents as in the template into
+    # the environment, the lists of agents are emptied and refilled rather
+    # than replaced, like when the agents are read from the config files
+    # the transactions are returned, to be added once the environment is set
+    # -------------------------------------------------------------------------
+    def reset(self, environment):
+        environment.identifier = self.identifier
+        environment.static_parameters = copy.deepcopy(self.static_parameters)
+        environment.variable_parameters = copy.deepcopy(self.variable_parameters)
+        environment.assets = copy.deepcopy(self.assets)
+        environment.shocks = copy.deepcopy(self.shocks)
+        for members in environment.agents:
+            while len(members) > 0:
+                members.pop()
+        for group, class_, identifier, parameters, state_variables in self.agents:
+            agent = class_()
+            agent.identifier = identifier
+            agent.parameters = copy.deepcopy(parameters)
+            agent.state_variables = copy.deepcopy(state_variables)
+            environment.agents[group].append(agent)
+        return self.transactions
+    # -------------------------------------------------------------------------
@@ -21,6 +21,7 @@ along with this program. If not, see <http://www.gnu.org/licenses/>.
 """
 
 from abm_template.src.basetransaction import BaseTransaction
+from itertools import count
 import networkx as nx
 
 # -------------------------------------------------------------------------
@@ -39,16 +40,25 @@ class Transaction(BaseTransaction):
     #
 
     identifier = None  # unique identifier of the transaction, may be useful for iterators
+    sequence = -1  # number of the transaction in the order transactions were made, never changes
     type_ = ""  # type of transactions, e.g. "deposit"
     asset = ""  # type of asset, used for investment types
     from_ = 0.0  # agent being the originator of the transaction
     to = 0.0  # agent being the recipient of the transaction
-    amount = 0.0  # amount of the transaction
-    interest = 0.0  # interest rate paid to the originator each time step
-    maturity = 0  # time (in steps) to maturity
+    # amount, interest, maturity and time_of_default are properties (see below)
+    # their values are kept in the environment's ledger once booked into one
+    _amount = 0.0  # amount of the transaction
+    _interest = 0.0  # interest rate paid to the originator each time step
+    _maturity = 0  # time (in steps) to maturity
     # this is used only for loans I, and will be > 0 for defaulting loans. with each update step, it is reduced by 1
     # if timeOfDefault == 0: loan defaults
-    time_of_default = -1  # control variable checking for defaulted transactions
+    _time_of_default = -1  # control variable checking for defaulted transactions
+    ledger = None  # columnar ledger of the environment holding the values, if any
+    slot = -1  # slot of the transaction in the ledger
+    aggregates = None  # terms of the aggregates of the environment the amount is counted in, if any
+    dropped = None  # transactions of the environment whose amount dropped to zero, noted in when booked without a ledger
+
+    sequences = count()  # hands out the sequence numbers of new transactions in increasing order
 
     #
     #
@@ -60,9 +70,19 @@ class Transaction(BaseTransaction):
     # __init__
     # Generate a unique identifier of the transaction
     # This may be useful for looping over various agent's accounts
+    # the identifiers are integers increasing with every new transaction
+    # which are much cheaper to make than random uuids
+    # the identifier can be set to anything afterwards (see set_identifier),
+    # so the order transactions were made in is kept in their sequence,
+    # which the checksums of the books and the ordering of transactions use
     # -------------------------------------------------------------------------
     def __init__(self):
-        self.identifier = None  # unique identifier of the transaction, may be useful for iterators
+        self.ledger = None  # columnar ledger of the environment holding the values, if any
+        self.slot = -1  # slot of the transaction in the ledger
+        self.aggregates = None  # terms of the aggregates of the environment the amount is counted in, if any
+        self.dropped = None  # transactions of the environment whose amount dropped to zero, noted in when booked without a ledger
+        self.sequence = next(Transaction.sequences)  # number of the transaction in the order transactions were made
+        self.identifier = self.sequence  # unique identifier of the transaction, may be useful for iterators
         self.type_ = ""  # type of transactions, e.g. "deposit"
         self.asset = ""  # type of asset, used for investment types
         self.from_ = 0.0  # agent being the originator of the transaction
@@ -73,12 +93,84 @@ class Transaction(BaseTransaction):
         # this is used only for loans I, and will be > 0 for defaulting loans. with each update step, it is reduced by 1
         # if timeOfDefault == 0: loan defaults
         self.time_of_default = -1  # control variable checking for defaulted transactions
-        super(Transaction, self).__init__()
     # ------------------------------------------------------------------------
 
+    # -------------------------------------------------------------------------
+    # amount, interest, maturity and time_of_default
+    # the transaction keeps these itself until it is booked into the
+    # columnar ledger of the environment, after which they are read from
+    # and written to the ledger's columns
+    # changes of the amount are added to the aggregates it is counted in
+    # a booked transaction whose amount drops to zero (or less) is noted
+    # for purging, in the ledger or else in the dropped of the environment
+    # -------------------------------------------------------------------------
+    def _get_amount(self):
+        if self.ledger is None:
+            return self._amount
+        return float(self.ledger.amount[self.slot])
+
+    def _set_amount(self, amount):
+        if self.aggregates is not None:
+            change = amount - self.amount
+            for terms in self.aggregates:
+                for total, sign in terms:
+                    total[0] = total[0] + sign * change
+        if self.ledger is None:
+            self._amount = amount
+            if amount <= 0.0 and self.dropped is not None:
+                self.dropped[self] = None
+        else:
+            self.ledger.set_amount(self, amount)
+
+    amount = property(_get_amount, _set_amount)
+
+    def _get_interest(self):
+        if self.ledger is None:
+            return self._interest
+        return float(self.ledger.interest[self.slot])
+
+    def _set_interest(self, interest):
+        if self.ledger is None:
+            self._interest = interest
+        else:
+            self.ledger.interest[self.slot] = interest
+
+    interest = property(_get_interest, _set_interest)
+
+    def _get_maturity(self):
+        if self.ledger is None:
+            return self._maturity
+        return int(self.ledger.maturity[self.slot])
+
+    def _set_maturity(self, maturity):
+        if self.ledger is None:
+            self._maturity = maturity
+        else:
+            self.ledger.maturity[self.slot] = maturity
+
+    maturity = property(_get_maturity, _set_maturity)
+
+    def _get_time_of_default(self):
+        if self.ledger is None:
+            return self._time_of_default
+        return int(self.ledger.time_of_default[self.slot])
+
+    def _set_time_of_default(self, time_of_default):
+        if self.ledger is None:
+            self._time_of_default = time_of_default
+        else:
+            self.ledger.time_of_default[self.slot] = time_of_default
+
+    time_of_default = property(_get_time_of_default, _set_time_of_default)
+    # -------------------------------------------------------------------------
+
     # -------------------------------------------------------------------------
     # functions for setting/changing variables
     # these either return or set specific value to the above variables
+    # the setters check the values in the abstract class, unless the
+    # environment is in trusted mode (see Environment), in which case the
+    # values are set as they are, which is used in the hot loops of the
+    # updater, in user code the checked setters remain the default
     # -------------------------------------------------------------------------
     def get_identifier(self):
         return self.identifier
@@ -90,49 +182,93 @@ class Transaction(BaseTransaction):
         return self.type_
 
     def set_type_(self, type_, environment):
-        super(Transaction, self).set_type_(type_, environment)
+        if getattr(environment, "trusted", False):
+            self.type_ = type_
+        else:
+            super(Transaction, self).set_type_(type_, environment)
+        self.reindex_accounts()
 
     def get_asset(self):
         return self.asset
 
     def set_asset(self, asset, environment):
-        super(Transaction, self).set_asset(asset, environment)
+        if getattr(environment, "trusted", False):
+            self.asset = asset
+        else:
+            super(Transaction, self).set_asset(asset, environment)
+        self.reindex_accounts()
 
     def get_from_(self):
         return self.from_
 
     def set_from_(self, from_, environment):
-        super(Transaction, self).set_from_(from_, environment)
+        previous = self.from_
+        if getattr(environment, "trusted", False):
+            self.from_ = from_
+        else:
+            super(Transaction, self).set_from_(from_, environment)
+        self.reindex_accounts(previous)
 
     def get_to(self):
         return self.to
 
     def set_to(self, to, environment):
-        super(Transaction, self).set_to(to, environment)
+        previous = self.to
+        if getattr(environment, "trusted", False):
+            self.to = to
+        else:
+            super(Transaction, self).set_to(to, environment)
+        self.reindex_accounts(previous)
 
     def get_amount(self):
         return self.amount
 
     def set_amount(self, amount, environment):
-        super(Transaction, self).set_amount(amount, environment)
+        if getattr(environment, "trusted", False):
+            self.amount = amount
+        else:
+            super(Transaction, self).set_amount(amount, environment)
 
     def get_interest(self):
         return self.interest
 
     def set_interest(self, interest, environment):
-        super(Transaction, self).set_interest(interest, environment)
+        if getattr(environment, "trusted", False):
+            self.interest = interest
+        else:
+            super(Transaction, self).set_interest(interest, environment)
 
     def get_maturity(self):
         return self.maturity
 
     def set_maturity(self, maturity, environment):
-        super(Transaction, self).set_maturity(maturity, environment)
+        if getattr(environment, "trusted", False):
+            self.maturity = maturity
+        else:
+            super(Transaction, self).set_maturity(maturity, environment)
 
     def get_time_of_default(self):
         return self.time_of_default
 
     def set_time_of_default(self, time_of_default, environment):
-        super(Transaction, self).set_time_of_default(time_of_default, environment)
+        if getattr(environment, "trusted", False):
+            self.time_of_default = time_of_default
+        else:
+            super(Transaction, self).set_time_of_default(time_of_default, environment)
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # reindex_accounts(*agents)
+    # the accounts of agents keep indexes by type_, asset and counterparty
+    # so when any of these change on a booked transaction we refile it
+    # in the books of its parties, and of any former party passed in
+    # -------------------------------------------------------------------------
+    def reindex_accounts(self, *agents):
+        for agent in (self.from_, self.to) + agents:
+            if hasattr(agent, "accounts") and hasattr(agent.accounts, "reindex"):
+                agent.accounts.reindex(self)
+        if self.ledger is not None:
+            self.ledger.recode(self)
     # -------------------------------------------------------------------------
 
     # -------------------------------------------------------------------------
@@ -143,6 +279,40 @@ class Transaction(BaseTransaction):
     # -------------------------------------------------------------------------
     def add_transaction(self, type_, asset, from_, to, amount,  interest,  maturity, time_of_default, environment):
         super(Transaction, self).add_transaction(type_, asset, from_, to, amount,  interest,  maturity, time_of_default, environment)
+        # if the environment keeps a columnar ledger, the values go there
+        if getattr(environment, "ledger", None) is not None:
+            environment.ledger.book(self)
+        # otherwise the transaction is noted in the environment when its amount drops
+        elif getattr(environment, "dropped", None) is not None:
+            self.dropped = environment.dropped
+            if self._amount <= 0.0:
+                self.dropped[self] = None
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # unlink_accounts()
+    # takes the transaction off the books of both its parties
+    # the accounts hash their transactions, so this does not scan the books
+    # the values are taken out of the ledger so its slot can be reused
+    # and it is no longer noted for purging
+    # -------------------------------------------------------------------------
+    def unlink_accounts(self):
+        for agent in (self.from_, self.to):
+            if hasattr(agent, "accounts") and hasattr(agent.accounts, "discard"):
+                agent.accounts.discard(self)
+        if self.ledger is not None:
+            self.ledger.release(self)
+        if self.dropped is not None:
+            self.dropped.pop(self, None)
+            self.dropped = None
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # __del__
+    # makes sure the transaction does not stay on the books of its parties
+    # -------------------------------------------------------------------------
+    def __del__(self):
+        self.unlink_accounts()
     # -------------------------------------------------------------------------
 
     # -------------------------------------------------------------------------
@@ -150,7 +320,18 @@ class Transaction(BaseTransaction):
     # removes the transaction from appropriate agents' accounts
     # -------------------------------------------------------------------------
     def remove_transaction(self, environment):
-        super(Transaction, self).remove_transaction(environment)
+        self.unlink_accounts()
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # remove_transactions(transactions, environment)
+    # removes a number of transactions from the agents' accounts in one pass
+    # the transactions can be any iterable, e.g. a list marked for deletion
+    # while looping over the books, and may contain duplicates
+    # -------------------------------------------------------------------------
+    def remove_transactions(self, transactions, environment):
+        for transaction in transactions:
+            transaction.unlink_accounts()
     # -------------------------------------------------------------------------
 
     # -------------------------------------------------------------------------
@@ -184,13 +365,26 @@ class Transaction(BaseTransaction):
     # for the economics of the process
     # -------------------------------------------------------------------------
     def clear_accounts(self, agent, environment):
-        super(Transaction, self).clear_accounts(agent, environment)
+        self.remove_transactions(list(agent.accounts), environment)
     # -------------------------------------------------------------------------
 
     # -------------------------------------------------------------------------
     # purge_accounts()
     # removes all transactions of all agents with amount of zero
+    # the books are purged in place so the agents keep their indexed accounts
+    # only the transactions noted when their amount dropped are looked at,
+    # in the columnar ledger if there is one, or else in the dropped of
+    # the environment, those whose amount went back up since are forgotten
+    # environments without either have the books of all agents purged
     # -------------------------------------------------------------------------
     def purge_accounts(self, environment):
-        super(Transaction, self).purge_accounts(environment)
+        if getattr(environment, "ledger", None) is not None:
+            self.remove_transactions(environment.ledger.worthless(), environment)
+        elif getattr(environment, "dropped", None) is not None:
+            worthless = [transaction for transaction in environment.dropped if transaction.amount <= 0.0]
+            environment.dropped.clear()
+            self.remove_transactions(worthless, environment)
+        else:
+            for agent in environment.agents_generator():
+                agent.accounts.purge()
     # -------------------------------------------------------------------------
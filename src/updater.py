@@ -21,9 +21,9 @@ along with this program. If not, see <http://www.gnu.org/licenses/>.
 """
 
 from abm_template.src.basemodel import BaseModel
-import random
 import logging
 from src.transaction import Transaction
+from src.netting import Netting
 
 # -------------------------------------------------------------------------
 #  class Updater
@@ -79,6 +79,20 @@ class Updater(BaseModel):
     # do_update
     # -------------------------------------------------------------------------
     def do_update(self,  environment,  time):
+        # The values the updater sets on transactions are computed here
+        # so the setters don't need to check them for the duration of the update
+        trusted = environment.trusted
+        environment.trusted = True
+        try:
+            self.update_step(environment, time)
+        finally:
+            environment.trusted = trusted
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # update_step
+    # -------------------------------------------------------------------------
+    def update_step(self,  environment,  time):
         # As a first step, we accrue all interest over the transactions
         # Thus, important to notice to keep 0 as interest by default
         # Unless transaction should carry interest
@@ -118,13 +132,12 @@ class Updater(BaseModel):
         for bank in environment.banks:
             # We go asset by asset
             for asset_key in environment.assets:
-                # And find investment transactions
-                for tranx in bank.accounts:
+                # And find transactions in the specific asset
+                for tranx in bank.accounts.transactions_by_asset(asset_key):
+                    # That are investment transactions
                     if tranx.type_ == "investment":
-                        # For the specific asset
-                        if tranx.asset == asset_key:
-                            # And amend its value by the current returns
-                            tranx.set_amount(tranx.amount * (1 + environment.assets[asset_key][2]), environment)
+                        # And amend its value by the current returns
+                        tranx.set_amount(tranx.amount * (1 + environment.assets[asset_key][2]), environment)
         # Then, banks give their revenue as dividends to households
         # which own the banks in the model
         # for now we have them given out through ownership weights
@@ -195,7 +208,7 @@ class Updater(BaseModel):
         # Import market clearing class
         from market import Market
         # Put the appropriate settings, i.e. desired identifier
-        market = Market("market")
+        market = Market("market", environment.random)
         # And we find the market price of labour
         # given supply and demand of the agents
         # and tolerance of error, resolution of search
@@ -217,23 +230,26 @@ class Updater(BaseModel):
         # household   deposit     labour
         # firm        labour      loan
         #
+        # We collect the new transactions and add them to the books at once
+        new_transactions = []
         for ration in rationed:
             # The labour is an asset (production factor) for the firm
             # and a liability (promise to work) for the household
-            environment.new_transaction("labour", "",  ration[1].identifier, ration[0].identifier,
-                                        ration[2], 0,  0, -1)
-            random_bank = random.choice(environment.banks)
+            new_transactions.append(("labour", "",  ration[1], ration[0],
+                                     ration[2], 0,  0, -1))
+            random_bank = environment.random.choice(environment.banks)
             # Deposit is a liability of the bank
             # and an asset of the household
-            environment.new_transaction("deposits", "",  ration[0].identifier, random_bank.identifier,
-                                        ration[2]*price, random_bank.interest_rate_deposits,  0, -1)
+            new_transactions.append(("deposits", "",  ration[0], random_bank,
+                                     ration[2]*price, random_bank.interest_rate_deposits,  0, -1))
             # Loan is an asset of the bank
             # and a liability of the firm
-            environment.new_transaction("loans", "",  random_bank.identifier, ration[1].identifier,
-                                        ration[2]*price, random_bank.interest_rate_loans,  0, -1)
+            new_transactions.append(("loans", "",  random_bank, ration[1],
+                                     ration[2]*price, random_bank.interest_rate_loans,  0, -1))
             # We print the action of selling to the screen
             print("%s sold %d units of labour at a price %f to %s at time %d.") % (ration[0].identifier,
                                                                                    ration[2], price, ration[1].identifier, time)
+        environment.new_transactions(new_transactions)
         logging.info("  labour sold to firms on step: %s",  time)
         # Keep on the log with the number of step, for debugging mostly
     # -------------------------------------------------------------------------
@@ -264,12 +280,12 @@ class Updater(BaseModel):
             # we use their net capital, as in their capital stock
             # minus the capital owned of other agents
             capital = 0.0
-            for tranx in firm.accounts:
+            for tranx in firm.accounts.transactions_by_type("capital"):
                 # This is own capital stock
-                if tranx.type_ == "capital" and tranx.from_ == firm:
+                if tranx.from_ == firm:
                     capital = capital + tranx.amount
                 # And here is the ownership of other agents' stock
-                if tranx.type_ == "capital" and tranx.to == firm:
+                if tranx.to == firm:
                     capital = capital - tranx.amount
             # We find the amount produced through the Cobb-Douglas function
             amount = helper.cobb_douglas(firm.get_account("labour"), capital,
@@ -286,7 +302,7 @@ class Updater(BaseModel):
             wealth = 0.0
             # For generality we calculate net wealth for this, that is the
             # amount of deposits they carry minus the amount of loans
-            for tranx in household.accounts:
+            for tranx in household.accounts.transactions_by_types(("deposits", "loans")):
                 if tranx.type_ == "deposits" and tranx.from_ == household:
                     wealth = wealth + tranx.amount
                 if tranx.type_ == "loans" and tranx.to == household:
@@ -303,7 +319,7 @@ class Updater(BaseModel):
         # This does not matter for rationing
         # But in principle we need to initialize
         # with these values
-        market = Market("market")
+        market = Market("market", environment.random)
         # And we find the rationing, ie the amounts
         # of goods sold between pairs of agents
         # We find the actual trades
@@ -318,22 +334,25 @@ class Updater(BaseModel):
             # firm        deposit     goods
             #
             # TODO: in the new version this may be irrelevant
-            environment.new_transaction("goods", "",  ration[1].identifier, ration[0].identifier,
-                                        ration[2], 0,  0, -1)
+            # We collect the new transactions of the ration and add them to the books at once
+            # this has to be done for every ration, as the household's deposits
+            # available for the next ration depend on these
+            new_transactions = [("goods", "",  ration[1], ration[0],
+                                 ration[2], 0,  0, -1)]
             # The below makes sure the allocations of loans are correct
             # That is the banks don't allow overdraft for buying
             # consumption goods by the households
             to_finance = ration[2]*price
             itrange = list(range(0, len(environment.banks)))
             # And randomise this list for the purposes of iterating randomly
-            random.shuffle(itrange)
+            environment.random.shuffle(itrange)
             # And we iterate over the agents randomly by proxy of iterating
             # through their places on the list [agents]
             for i in itrange:
                 current_bank = self.environment.banks[i]
                 # We find how much in deposits the household has
                 deposits_available = 0.0
-                for tranx in ration[1].accounts:
+                for tranx in ration[1].accounts.transactions_by_types(("deposits", "loans"), current_bank):
                     if tranx.type_ == "deposits" and tranx.to == current_bank:
                         deposits_available = deposits_available + tranx.amount
                     # This should be irrelevant, but for completeness:
@@ -342,11 +361,12 @@ class Updater(BaseModel):
                 # We find the amount of deposits the household can spend for this particular bank
                 current_amount = min(to_finance, deposits_available)
                 # And add the appropriate transactions
-                environment.new_transaction("deposits", "",  ration[0].identifier, current_bank.identifier,
-                                            current_amount, current_bank.interest_rate_deposits,  0, -1)
-                environment.new_transaction("loans", "",  current_bank.identifier, ration[1].identifier,
-                                            current_amount, current_bank.interest_rate_loans,  0, -1)
+                new_transactions.append(("deposits", "",  ration[0], current_bank,
+                                         current_amount, current_bank.interest_rate_deposits,  0, -1))
+                new_transactions.append(("loans", "",  current_bank, ration[1],
+                                         current_amount, current_bank.interest_rate_loans,  0, -1))
                 to_finance = to_finance - current_amount
+            environment.new_transactions(new_transactions)
             # We print the action of selling to the screen
             print("%s sold %d units of goods at a price %f to %s at time %d.") % (ration[0].identifier,
                                                                                   ration[2], price, ration[1].identifier, time)
@@ -363,78 +383,21 @@ class Updater(BaseModel):
     # to be easier and move all cash to deposits in the banks
     # -------------------------------------------------------------------------
     def net_loans_deposits(self,  environment, time):
-        # We do it from the bank's perspective
-        for bank in environment.banks:
-            # And first go through the firms
-            for firm in environment.firms:
-                # Finding what their balance of deposits (+) and loans (-) is
-                balance = 0.0
-                # And mark all the loan and deposits we account for to be deleted
-                to_delete = []
-                # We go through the firm's accounts
-                for tranx in firm.accounts:
-                    # And find deposits from the firm to the bank
-                    if tranx.type_ == "deposits":
-                        if tranx.to == bank:
-                            # If we find one we append the balance
-                            balance = balance + tranx.amount
-                            # And mark the transaction for deletion
-                            to_delete.append(tranx)
-                    # And find loans from the bank to the firm
-                    if tranx.type_ == "loans":
-                        if tranx.from_ == bank:
-                            # If we find one we append the balance
-                            balance = balance - tranx.amount
-                            # And mark the transaction for deletio
-                            to_delete.append(tranx)
-                # Then we delete all market transactions
-                for tranx in to_delete:
-                    tranx.remove_transaction(environment)
-                # And add the netted transaction to the firm's and bank's books
-                if balance > 0.0:
-                    # If the balance is positive it's a deposit
-                    environment.new_transaction("deposits", "",  firm.identifier, bank.identifier,
-                                                balance, bank.interest_rate_deposits,  0, -1)
-                elif balance < 0.0:
-                    # If the balance is negative it's a loan
-                    environment.new_transaction("loans", "",  bank.identifier, firm.identifier,
-                                                abs(balance), bank.interest_rate_loans,  0, -1)
-        # We do it from the bank's perspective
-        for bank in environment.banks:
-            # And first go through the households
-            for household in environment.households:
-                # Finding what their balance of deposits (+) and loans (-) is
-                balance = 0.0
-                # And mark all the loan and deposits we account for to be deleted
-                to_delete = []
-                # We go through the household's accounts
-                for tranx in household.accounts:
-                    # And find deposits from the household to the bank
-                    if tranx.type_ == "deposits":
-                        if tranx.to == bank:
-                            # If we find one we append the balance
-                            balance = balance + tranx.amount
-                            # And mark the transaction for deletion
-                            to_delete.append(tranx)
-                    # And find loans from the bank to the household
-                    if tranx.type_ == "loans":
-                        if tranx.from_ == bank:
-                            # If we find one we append the balance
-                            balance = balance - tranx.amount
-                            # And mark the transaction for deletion
-                            to_delete.append(tranx)
-                # Then we delete all market transactions
-                for tranx in to_delete:
-                    tranx.remove_transaction(environment)
-                # And add the netted transaction to the household's and bank's books
-                if balance > 0.0:
-                    # If the balance is positive it's a deposit
-                    environment.new_transaction("deposits", "",  household.identifier, bank.identifier,
-                                                balance, bank.interest_rate_deposits,  0, -1)
-                elif balance < 0.0:
-                    # If the balance is negative it's a loan
-                    environment.new_transaction("loans", "",  bank.identifier, household.identifier,
-                                                abs(balance), bank.interest_rate_loans,  0, -1)
+        # We net deposits (+) and loans (-) of each firm and household
+        # with each bank into a single position, deposits from them to the bank
+        # if the balance is positive and loans from the bank if it is negative
+        netting = Netting("deposits", "loans")
+
+        # The interest on the netted position is set by the bank
+        def interest_deposits(depositor, bank):
+            return bank.interest_rate_deposits
+
+        def interest_loans(borrower, bank):
+            return bank.interest_rate_loans
+        # We do it from the bank's perspective, first for the firms
+        netting.net(environment, environment.firms, environment.banks, interest_deposits, interest_loans)
+        # And then for the households
+        netting.net(environment, environment.households, environment.banks, interest_deposits, interest_loans)
         logging.info("  deposits and loans netted on step: %s",  time)
         # Keep on the log with the number of step, for debugging mostly
     # -------------------------------------------------------------------------
@@ -449,45 +412,27 @@ class Updater(BaseModel):
     def remove_perishable(self,  environment, time):
         # First, remove labour, goods from firms
         for firm in environment.firms:
-            # We create a list of things to be removed
-            # since removing things from a list
-            # in a loop over this list is not a good idea
-            to_delete = []
-            # Then go through transactions
-            for tranx in firm.accounts:
-                # Append the things to delete
-                # if it's a labour
-                if tranx.type_ == "labour":
-                    to_delete.append(tranx)
-                # or goods transaction
-                if tranx.type_ == "goods":
-                    to_delete.append(tranx)
+            # We look up the things to be removed
+            # the lookups return new lists so we can
+            # remove things from the books while looping
+            # labour and goods transactions
+            to_delete = firm.accounts.transactions_by_types(("labour", "goods"))
             # And once we have them all we
             # go through the things to delete
             # and remove them from the books of agents
-            for tranx in to_delete:
-                tranx.remove_transaction(environment)
+            environment.remove_transactions(to_delete)
 
         # Then, remove labour, goods from households
         for household in environment.households:
-            # We create a list of things to be removed
-            # since removing things from a list
-            # in a loop over this list is not a good idea
-            to_delete = []
-            # Then go through transactions
-            for tranx in firm.accounts:
-                # Append the things to delete
-                # if it's a labour
-                if tranx.type_ == "labour":
-                    to_delete.append(tranx)
-                # or goods transaction
-                if tranx.type_ == "goods":
-                    to_delete.append(tranx)
+            # We look up the things to be removed
+            # the lookups return new lists so we can
+            # remove things from the books while looping
+            # labour and goods transactions
+            to_delete = household.accounts.transactions_by_types(("labour", "goods"))
             # And once we have them all we
             # go through the things to delete
             # and remove them from the books of agents
-            for tranx in to_delete:
-                tranx.remove_transaction(environment)
+            environment.remove_transactions(to_delete)
 
         # If necessary, another line for banks will be added here
 
@@ -515,20 +460,19 @@ class Updater(BaseModel):
         for firm in environment.firms:
             # We calculate how much capital the firm has
             capital = 0.0
-            for tranx in firm.accounts:
-                if tranx.type_ == "capital":
-                    if tranx.from_ == firm:
-                        capital = capital + tranx.amount
-                    if tranx.to == firm:
-                        capital = capital - tranx.amount
+            for tranx in firm.accounts.transactions_by_type("capital"):
+                if tranx.from_ == firm:
+                    capital = capital + tranx.amount
+                if tranx.to == firm:
+                    capital = capital - tranx.amount
             # Then find the firm's supply of capital given current books
             supply = -capital - firm.get_account("deposits") + firm.get_account("loans")
             # If there is a shortfall of capital supply
             if supply < 0.0:
-                # We go through the books
-                for tranx in firm.accounts:
-                    # And find capital transactions
-                    if tranx.type_ == "capital" and tranx.from_ == firm:
+                # We go through the capital transactions on the books
+                for tranx in firm.accounts.transactions_by_type("capital"):
+                    # And find the firm's own capital
+                    if tranx.from_ == firm:
                         # Then we sell the appropriate amount to cover the shortfall
                         # TODO: we may want the sellout to be proportional or at least
                         # going through books at random, though in the current model it shouldn't matter
@@ -548,18 +492,17 @@ class Updater(BaseModel):
             deposits = 0.0
             loans = 0.0
             capital = 0.0
-            for tranx in household.accounts:
-                if tranx.type_ == "deposits":
-                    if tranx.from_ == household:
-                        deposits = deposits + tranx.amount
-                if tranx.type_ == "loans":
-                    if tranx.to == household:
-                        loans = loans + tranx.amount
-                if tranx.type_ == "capital":
-                    if tranx.to == household:
-                        capital = capital + tranx.amount
-                    if tranx.from_ == household:
-                        capital = capital - tranx.amount
+            for tranx in household.accounts.transactions_by_type("deposits"):
+                if tranx.from_ == household:
+                    deposits = deposits + tranx.amount
+            for tranx in household.accounts.transactions_by_type("loans"):
+                if tranx.to == household:
+                    loans = loans + tranx.amount
+            for tranx in household.accounts.transactions_by_type("capital"):
+                if tranx.to == household:
+                    capital = capital + tranx.amount
+                if tranx.from_ == household:
+                    capital = capital - tranx.amount
             # demand = household.get_account("deposits") - household.get_account("loans") - household.get_account("capital")
             demand = deposits - loans - capital
             # And we add the household together with its demand to the list
@@ -570,12 +513,11 @@ class Updater(BaseModel):
             # that is the loans minus issued capital claims minus deposits
             # We calculate capital by hand in case there is some reverse ownership
             capital = 0.0
-            for tranx in firm.accounts:
-                if tranx.type_ == "capital":
-                    if tranx.from_ == firm:
-                        capital = capital + tranx.amount
-                    if tranx.to == firm:
-                        capital = capital - tranx.amount
+            for tranx in firm.accounts.transactions_by_type("capital"):
+                if tranx.from_ == firm:
+                    capital = capital + tranx.amount
+                if tranx.to == firm:
+                    capital = capital - tranx.amount
             supply = -capital - firm.get_account("deposits") + firm.get_account("loans")
             # supply = -firm.get_account("capital") - firm.get_account("deposits") + firm.get_account("loans")
             # And we add the firm together with its supply to the list
@@ -583,19 +525,21 @@ class Updater(BaseModel):
 
         # We initialise the market clearing class
         from market import Market
-        market = Market("market")
+        market = Market("market", environment.random)
 
         # We find the pairs of capital ownership transfers
         # We move the capital proportionately with respect to demand
         rationed = market.rationing_proportional(for_rationing)
 
-        # We add these to the books
+        # We add these to the books, all at once
+        new_transactions = []
         for ration in rationed:
-            environment.new_transaction("capital", "",  ration[0].identifier, ration[1].identifier,
-                                        ration[2], 0,  0, -1)
+            new_transactions.append(("capital", "",  ration[0], ration[1],
+                                     ration[2], 0,  0, -1))
             # And print it to the screen for easy greping
             print("%s sold %f worth of capital to %s at time %d.") % (ration[0].identifier,
                                                                       ration[2], ration[1].identifier, time)
+        environment.new_transactions(new_transactions)
 
         # And net the capital transactions, so we don't accumulate
         # them over the course of the transaction
@@ -609,21 +553,19 @@ class Updater(BaseModel):
             for household in environment.households:
                 # We will look for the capital balance of the pair
                 balance = 0.0
-                # So we need to look through all their books
-                for tranx in household.accounts:
-                    # Find the capital transactions
-                    if tranx.type_ == "capital":
-                        # And if they are ownership of the firm's equity
-                        # We add them to the balance
-                        # And mark for deletion
-                        if tranx.from_ == firm:
-                            balance = balance + tranx.amount
-                            to_delete.append(tranx)
-                        # If they are the other way around for some reason
-                        # we would subtract them and mark for deletion
-                        elif tranx.to == firm:
-                            balance = balance - tranx.amount
-                            to_delete.append(tranx)
+                # So we look up their capital transactions with each other
+                for tranx in household.accounts.transactions_by_type_and_counterparty("capital", firm):
+                    # And if they are ownership of the firm's equity
+                    # We add them to the balance
+                    # And mark for deletion
+                    if tranx.from_ == firm:
+                        balance = balance + tranx.amount
+                        to_delete.append(tranx)
+                    # If they are the other way around for some reason
+                    # we would subtract them and mark for deletion
+                    elif tranx.to == firm:
+                        balance = balance - tranx.amount
+                        to_delete.append(tranx)
                 # We create a new transactions from the balance
                 # depending on what the value of the balance is
                 if balance > 0.0:
@@ -633,8 +575,7 @@ class Updater(BaseModel):
                     environment.new_transaction("capital", "",  household.identifier, firm.identifier,
                                                 balance, 0,  0, -1)
         # And at the end, we remove all the transactions that we marked before
-        for tranx in to_delete:
-            tranx.remove_transaction(environment)
+        environment.remove_transactions(to_delete)
 
         logging.info("  capitalised on step: %s",  time)
         # Keep on the log with the number of step, for debugging mostly
@@ -667,9 +608,8 @@ class Updater(BaseModel):
                                             investment_volume, environment.central_bank[0].interest_rate_cb_loans,  0, -1)
             # If we have a prior central bank loan we just adjust the amount
             else:
-                for tranx in bank.accounts:
-                    if tranx.type_ == "cb_loans":
-                        tranx.set_amount(investment_volume, environment)
+                for tranx in bank.accounts.transactions_by_type("cb_loans"):
+                    tranx.set_amount(investment_volume, environment)
 
             # Then we add or remove investments
             # We do it for every investment class, for now we have 1/n portfolio
@@ -678,22 +618,18 @@ class Updater(BaseModel):
                 one_investment_volume = investment_volume / len(environment.assets)
                 # We find if there are already transactions
                 # We will want one transaction of one type of investment also, as above
-                number_of_asset_transactions = 0
-                # We go through the books
-                for tranx in bank.accounts:
-                    if tranx.asset == asset_key:
-                        # And find the transactions that match
-                        number_of_asset_transactions = number_of_asset_transactions + 1
+                # We look up the transactions that match on the books
+                asset_transactions = bank.accounts.transactions_by_asset(asset_key)
+                number_of_asset_transactions = len(asset_transactions)
                 # If the bank doesn't yet have an investment we create one
                 if number_of_asset_transactions == 0:
                     environment.new_transaction("investment", asset_key,  bank.identifier, bank.identifier,
                                                 one_investment_volume, 0,  0, -1)
                 # If they do have one we just amend the amount
                 elif number_of_asset_transactions == 1:
-                    for tranx in bank.accounts:
+                    for tranx in asset_transactions:
                         if tranx.type_ == "investment":
-                            if tranx.asset == asset_key:
-                                tranx.set_amount(one_investment_volume, environment)
+                            tranx.set_amount(one_investment_volume, environment)
                 # If there are multiple investments in one asset we raise an error
                 else:
                     raise LookupError("More than one transaction of the same asset.")
@@ -0,0 +1,431 @@
+#!/usr/bin/env python
+# [SublimeLinter pep8-max-line-length:150]
+# -*- coding: utf-8 -*-
+
+"""
+black_rhino is a multi-agent simulator for financial network analysis
+Copyright (C) 2016 Co-Pierre Georg (co-pierre.georg@keble.ox.ac.uk)
+Pawel Fiedor (pawel@fiedor.eu)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3 of the License.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import logging
+from src.helper import Helper
+
+# -------------------------------------------------------------------------
+#  class Tests
+# -------------------------------------------------------------------------
+
+
+class TestsAccounts(object):
+    #
+    # VARIABLES
+    #
+
+    #
+    # METHODS
+    #
+
+    # -------------------------------------------------------------------------
+    # __init__
+    # -------------------------------------------------------------------------
+    def __init__(self):
+        pass
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # print_info(text)
+    # -------------------------------------------------------------------------
+    def print_info(self, text):
+        print('##############################################################################\n')
+        print(text)
+        print('##############################################################################\n')
+    # -------------------------------------------------------------------------
+
+# -------------------------------------------------------------------------
+#  TESTS FOR ACCOUNTS.PY
+# -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # accounts__transactions_by_type
+    # -------------------------------------------------------------------------
+
+    def accounts__transactions_by_type(self, args):
+        import os
+        from src.bank import Bank
+        from src.household import Household
+        from src.firm import Firm
+        from src.environment import Environment
+
+        text = "This test checks accounts.transactions_by_type \n"
+        self.print_info(text)
+        #
+        # INITIALIZATION
+        #
+        environment_directory = str(args[0])
+        identifier = str(args[1])
+        log_directory = str(args[2])
+
+        # Configure logging parameters so we get output while the program runs
+        logging.basicConfig(format='%(asctime)s %(message)s', datefmt='%m/%d/%Y %H:%M:%S',
+                            filename=log_directory + identifier + ".log", level=logging.INFO)
+        logging.info('START logging for test accounts__transactions_by_type in run: %s',
+                     environment_directory + identifier + ".xml")
+
+        # Construct bank filename
+        environment = Environment(environment_directory,  identifier)
+
+        # generate a household
+        household = Household()
+        household.identifier = "test_household"
+        environment.households.append(household)
+
+        # generate a firm
+        firm = Firm()
+        firm.identifier = "test_firm"
+        environment.firms.append(firm)
+
+        # generate the bank
+        bank = Bank()
+        environment.banks.append(bank)
+        helper = Helper()
+        helper.initialize_standard_bank(bank, environment)
+
+        #
+        # TESTING
+        #
+
+        print(bank)
+        print("Deposits of the bank (should be one transaction of 250.0):")
+        for tranx in bank.accounts.transactions_by_type("deposits"):
+            print(tranx)
+        print("Volume of deposits:")
+        print(bank.accounts.volume_by_type("deposits"))
+        print("Number of loans transactions (should be 1.0):")
+        print(bank.accounts.num_transactions_by_type("loans"))
+        print("Number of goods transactions (should be 0.0):")
+        print(bank.accounts.num_transactions_by_type("goods"))
+
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # accounts__transactions_by_counterparty
+    # -------------------------------------------------------------------------
+
+    def accounts__transactions_by_counterparty(self, args):
+        import os
+        from src.bank import Bank
+        from src.household import Household
+        from src.firm import Firm
+        from src.environment import Environment
+
+        text = "This test checks accounts.transactions_by_counterparty \n"
+        self.print_info(text)
+        #
+        # INITIALIZATION
+        #
+        environment_directory = str(args[0])
+        identifier = str(args[1])
+        log_directory = str(args[2])
+
+        # Configure logging parameters so we get output while the program runs
+        logging.basicConfig(format='%(asctime)s %(message)s', datefmt='%m/%d/%Y %H:%M:%S',
+                            filename=log_directory + identifier + ".log", level=logging.INFO)
+        logging.info('START logging for test accounts__transactions_by_counterparty in run: %s',
+                     environment_directory + identifier + ".xml")
+
+        # Construct bank filename
+        environment = Environment(environment_directory,  identifier)
+
+        # generate a household
+        household = Household()
+        household.identifier = "test_household"
+        environment.households.append(household)
+
+        # generate a firm
+        firm = Firm()
+        firm.identifier = "test_firm"
+        environment.firms.append(firm)
+
+        # generate the bank
+        bank = Bank()
+        environment.banks.append(bank)
+        helper = Helper()
+        helper.initialize_standard_bank(bank, environment)
+
+        #
+        # TESTING
+        #
+
+        print("Transactions of the bank with the firm (should be the loan of 150.0):")
+        # the standard bank is initialized with the first firm and household of the environment
+        for tranx in bank.accounts.transactions_by_counterparty(environment.firms[0]):
+            print(tranx)
+        print("Transactions of the bank with itself (should be the cash of 100.0):")
+        for tranx in bank.accounts.transactions_by_counterparty(bank):
+            print(tranx)
+        print("Deposits of the household with the bank (should be the deposit of 250.0):")
+        for tranx in environment.households[0].accounts.transactions_by_type_and_counterparty("deposits", bank):
+            print(tranx)
+
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # accounts__reindex
+    # -------------------------------------------------------------------------
+
+    def accounts__reindex(self, args):
+        import os
+        from src.bank import Bank
+        from src.household import Household
+        from src.firm import Firm
+        from src.environment import Environment
+
+        text = "This test checks accounts.reindex \n"
+        self.print_info(text)
+        #
+        # INITIALIZATION
+        #
+        environment_directory = str(args[0])
+        identifier = str(args[1])
+        log_directory = str(args[2])
+
+        # Configure logging parameters so we get output while the program runs
+        logging.basicConfig(format='%(asctime)s %(message)s', datefmt='%m/%d/%Y %H:%M:%S',
+                            filename=log_directory + identifier + ".log", level=logging.INFO)
+        logging.info('START logging for test accounts__reindex in run: %s',
+                     environment_directory + identifier + ".xml")
+
+        # Construct bank filename
+        environment = Environment(environment_directory,  identifier)
+
+        # generate a household
+        household = Household()
+        household.identifier = "test_household"
+        environment.households.append(household)
+
+        # generate a firm
+        firm = Firm()
+        firm.identifier = "test_firm"
+        environment.firms.append(firm)
+
+        # generate the bank
+        bank = Bank()
+        environment.banks.append(bank)
+        helper = Helper()
+        helper.initialize_standard_bank(bank, environment)
+
+        #
+        # TESTING
+        #
+
+        print("Number of cash transactions before changing the type (should be 1.0):")
+        print(bank.get_account_num_transactions("cash"))
+        tranx = bank.accounts.transactions_by_type("cash")[0]
+        tranx.set_type_("reserves", environment)
+        print("Number of cash transactions after changing the type (should be 0.0):")
+        print(bank.get_account_num_transactions("cash"))
+        print("Volume of reserves after changing the type (should be 100.0):")
+        print(bank.get_account("reserves"))
+
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # accounts__transactions_by_types
+    # -------------------------------------------------------------------------
+
+    def accounts__transactions_by_types(self, args):
+        import os
+        from src.bank import Bank
+        from src.household import Household
+        from src.firm import Firm
+        from src.environment import Environment
+
+        text = "This test checks accounts.transactions_by_types \n"
+        self.print_info(text)
+        #
+        # INITIALIZATION
+        #
+        environment_directory = str(args[0])
+        identifier = str(args[1])
+        log_directory = str(args[2])
+
+        # Configure logging parameters so we get output while the program runs
+        logging.basicConfig(format='%(asctime)s %(message)s', datefmt='%m/%d/%Y %H:%M:%S',
+                            filename=log_directory + identifier + ".log", level=logging.INFO)
+        logging.info('START logging for test accounts__transactions_by_types in run: %s',
+                     environment_directory + identifier + ".xml")
+
+        # Construct bank filename
+        environment = Environment(environment_directory,  identifier)
+
+        # generate a household
+        household = Household()
+        household.identifier = "test_household"
+        environment.households.append(household)
+
+        # generate a firm
+        firm = Firm()
+        firm.identifier = "test_firm"
+        environment.firms.append(firm)
+
+        # generate the bank
+        bank = Bank()
+        environment.banks.append(bank)
+        helper = Helper()
+        helper.initialize_standard_bank(bank, environment)
+
+        #
+        # TESTING
+        #
+
+        print("Types of the transactions of the bank, in the order of the books:")
+        print([tranx.type_ for tranx in bank.accounts])
+        print("Types of its cash and deposits, merged in the order of the books (deposits first):")
+        print([tranx.type_ for tranx in bank.accounts.transactions_by_types(("cash", "deposits"))])
+        first = bank.accounts[0]
+        bank.accounts[2].set_type_("cash_test", environment)
+        first.set_type_("cash_test", environment)
+        print("Is the first transaction on the books, with its type changed after the third one, still first (should be True):")
+        print(bank.accounts.transactions_by_type("cash_test")[0] is first)
+        print("The last transaction on the books by position:")
+        print(bank.accounts[len(bank.accounts) - 1].type_)
+
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # accounts__purge
+    # -------------------------------------------------------------------------
+
+    def accounts__purge(self, args):
+        import os
+        from src.bank import Bank
+        from src.household import Household
+        from src.firm import Firm
+        from src.environment import Environment
+
+        text = "This test checks accounts.purge \n"
+        self.print_info(text)
+        #
+        # INITIALIZATION
+        #
+        environment_directory = str(args[0])
+        identifier = str(args[1])
+        log_directory = str(args[2])
+
+        # Configure logging parameters so we get output while the program runs
+        logging.basicConfig(format='%(asctime)s %(message)s', datefmt='%m/%d/%Y %H:%M:%S',
+                            filename=log_directory + identifier + ".log", level=logging.INFO)
+        logging.info('START logging for test accounts__purge in run: %s',
+                     environment_directory + identifier + ".xml")
+
+        # Construct bank filename
+        environment = Environment(environment_directory,  identifier)
+
+        # generate a household
+        household = Household()
+        household.identifier = "test_household"
+        environment.households.append(household)
+
+        # generate a firm
+        firm = Firm()
+        firm.identifier = "test_firm"
+        environment.firms.append(firm)
+
+        # generate the bank
+        bank = Bank()
+        environment.banks.append(bank)
+        helper = Helper()
+        helper.initialize_standard_bank(bank, environment)
+
+        #
+        # TESTING
+        #
+
+        print("Before setting the cash to zero and purging:")
+        print(bank)
+        bank.accounts.transactions_by_type("cash")[0].set_amount(0.0, environment)
+        bank.accounts.purge()
+        print("After purging (there should be no cash transaction):")
+        print(bank)
+        print("Number of cash transactions (should be 0.0):")
+        print(bank.get_account_num_transactions("cash"))
+
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # accounts__remove_transactions
+    # -------------------------------------------------------------------------
+
+    def accounts__remove_transactions(self, args):
+        import os
+        from src.bank import Bank
+        from src.household import Household
+        from src.firm import Firm
+        from src.environment import Environment
+
+        text = "This test checks environment.remove_transactions \n"
+        self.print_info(text)
+        #
+        # INITIALIZATION
+        #
+        environment_directory = str(args[0])
+        identifier = str(args[1])
+        log_directory = str(args[2])
+
+        # Configure logging parameters so we get output while the program runs
+        logging.basicConfig(format='%(asctime)s %(message)s', datefmt='%m/%d/%Y %H:%M:%S',
+                            filename=log_directory + identifier + ".log", level=logging.INFO)
+        logging.info('START logging for test accounts__remove_transactions in run: %s',
+                     environment_directory + identifier + ".xml")
+
+        # Construct bank filename
+        environment = Environment(environment_directory,  identifier)
+
+        # generate a household
+        household = Household()
+        household.identifier = "test_household"
+        environment.households.append(household)
+
+        # generate a firm
+        firm = Firm()
+        firm.identifier = "test_firm"
+        environment.firms.append(firm)
+
+        # generate the bank
+        bank = Bank()
+        environment.banks.append(bank)
+        helper = Helper()
+        helper.initialize_standard_bank(bank, environment)
+
+        #
+        # TESTING
+        #
+
+        print("Number of transactions of the bank before removal (should be 3):")
+        print(len(bank.accounts))
+        to_delete = bank.accounts.transactions_by_type("deposits") + bank.accounts.transactions_by_type("loans")
+        # removing a transaction twice should not matter
+        environment.remove_transactions(to_delete + to_delete)
+        print("Number of transactions of the bank after removal (should be 1):")
+        print(len(bank.accounts))
+        # the standard bank is initialized with the first firm and household of the environment
+        print("Number of transactions of the household with the bank after removal (should be 0):")
+        print(len(environment.households[0].accounts.transactions_by_counterparty(bank)))
+        print("Number of transactions of the firm with the bank after removal (should be 0):")
+        print(len(environment.firms[0].accounts.transactions_by_counterparty(bank)))
+        print("The remaining transaction of the bank (should be the cash of 100.0):")
+        print(bank.accounts[0])
+
+    # -------------------------------------------------------------------------
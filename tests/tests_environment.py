@@ -990,6 +990,68 @@ class TestsEnvironment(object):
 
     # -------------------------------------------------------------------------
 
+    # -------------------------------------------------------------------------
+    # environment__index_agents
+    # -------------------------------------------------------------------------
+
+    def environment__index_agents(self, args):
+        import os
+        from src.bank import Bank
+        from src.household import Household
+        from src.firm import Firm
+        from src.environment import Environment
+
+        text = "This test checks environment.index_agents \n"
+        self.print_info(text)
+        #
+        # INITIALIZATION
+        #
+        environment_directory = str(args[0])
+        identifier = str(args[1])
+        log_directory = str(args[2])
+
+        # Configure logging parameters so we get output while the program runs
+        logging.basicConfig(format='%(asctime)s %(message)s', datefmt='%m/%d/%Y %H:%M:%S',
+                            filename=log_directory + identifier + ".log", level=logging.INFO)
+        logging.info('START logging for test environment__index_agents in run: %s',
+                     environment_directory + identifier + ".xml")
+
+        # Construct household filename
+        environment = Environment(environment_directory,  identifier)
+
+        #
+        # TESTING
+        #
+        print("Adding a bank and giving it an id: new_bank_id")
+        bank = Bank()
+        environment.banks.append(bank)
+        bank.identifier = "new_bank_id"
+        print("Getting the bank with id: new_bank_id")
+        print(environment.get_agent_by_id("new_bank_id").identifier)
+        print("Giving the new bank the id of another bank: bank_test_config_id")
+        bank.identifier = "bank_test_config_id"
+        environment.index_agents()
+        try:
+            environment.get_agent_by_id("bank_test_config_id")
+        except LookupError as error:
+            print(error)
+        print("Removing the new bank")
+        environment.banks.remove(bank)
+        print("Getting a bank with id: bank_test_config_id")
+        print(environment.get_agent_by_id("bank_test_config_id").identifier)
+        print("Replacing the bank in its place by a bank with id: replacing_bank_id")
+        replacing_bank = Bank()
+        replacing_bank.identifier = "replacing_bank_id"
+        position = environment.banks.index(environment.get_agent_by_id("bank_test_config_id"))
+        environment.banks[position] = replacing_bank
+        try:
+            environment.get_agent_by_id("bank_test_config_id")
+        except LookupError as error:
+            print(error)
+        print(environment.get_agent_by_id("replacing_bank_id").identifier)
+
+    # -------------------------------------------------------------------------
+
     # -------------------------------------------------------------------------
     # environment__read_transactions_for_banks
     # -------------------------------------------------------------------------
@@ -1198,13 +1260,173 @@ class TestsEnvironment(object):
             print("Consistent")
         else:
             print("Not consistent")
-        # environment.banks[0].add_transaction("deposits", "", environment.households[0:1][0],
-        #                                      environment.banks[0].identifier, 150, environment.banks[0].interest_rate_deposits, 0, -1)
-        # print("Checking global consistency of deposits:")
-        # if environment.check_global_transaction_balance("deposits") == True:
-        #     print("Consistent")
-        # else:
-        #     print("Not consistent")
+        print("Adding deposits to the books of the household only")
+        from src.transaction import Transaction
+        transaction = Transaction()
+        transaction.type_ = "deposits"
+        transaction.from_ = environment.households[0]
+        transaction.to = environment.banks[0]
+        transaction.amount = 150.0
+        environment.households[0].accounts.append(transaction)
+        print("Checking global consistency of deposits:")
+        if environment.check_global_transaction_balance("deposits") == True:
+            print("Consistent")
+        else:
+            print("Not consistent")
+
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # environment__track_balances
+    # -------------------------------------------------------------------------
+
+    def environment__track_balances(self, args):
+        import os
+        from src.bank import Bank
+        from src.household import Household
+        from src.firm import Firm
+        from src.environment import Environment
+
+        text = "This test checks environment.track_balances \n"
+        self.print_info(text)
+        #
+        # INITIALIZATION
+        #
+        environment_directory = str(args[0])
+        identifier = str(args[1])
+        log_directory = str(args[2])
+
+        # Configure logging parameters so we get output while the program runs
+        logging.basicConfig(format='%(asctime)s %(message)s', datefmt='%m/%d/%Y %H:%M:%S',
+                            filename=log_directory + identifier + ".log", level=logging.INFO)
+        logging.info('START logging for test environment__track_balances in run: %s',
+                     environment_directory + identifier + ".xml")
+
+        # Construct household filename
+        environment = Environment(environment_directory,  identifier)
+        # keep running checksums of the books from now on
+        environment.track_balances()
+
+        #
+        # TESTING
+        #
+
+        print("Checking global consistency of deposits:")
+        if environment.check_global_transaction_balance("deposits") == True:
+            print("Consistent")
+        else:
+            print("Not consistent")
+        print("Running checksum of deposits (should be [0, 0, 0]):")
+        print(environment.balances["deposits"])
+        print("Adding deposits to the books of the household only")
+        from src.transaction import Transaction
+        transaction = Transaction()
+        transaction.type_ = "deposits"
+        transaction.from_ = environment.households[0]
+        transaction.to = environment.banks[0]
+        transaction.amount = 150.0
+        environment.households[0].accounts.append(transaction)
+        print("Checking global consistency of deposits:")
+        if environment.check_global_transaction_balance("deposits") == True:
+            print("Consistent")
+        else:
+            print("Not consistent")
+        print("Adding the deposits to the books of the bank as well")
+        environment.banks[0].accounts.append(transaction)
+        print("Checking global consistency of deposits:")
+        if environment.check_global_transaction_balance("deposits") == True:
+            print("Consistent")
+        else:
+            print("Not consistent")
+        print("Adding the deposits to the books of a firm, which is neither of their parties")
+        environment.firms[0].accounts.append(transaction)
+        print("Checking global consistency of deposits:")
+        if environment.check_global_transaction_balance("deposits") == True:
+            print("Consistent")
+        else:
+            print("Not consistent")
+        print("Running checksum of deposits (should be [0, 0, 1]):")
+        print(environment.balances["deposits"])
+        print("Taking the deposits off the books of the firm")
+        environment.firms[0].accounts.remove(transaction)
+        print("Adding deposits with the identifier 'abc'")
+        transaction = Transaction()
+        transaction.set_identifier("abc", environment)
+        transaction.add_transaction("deposits", "", environment.households[0], environment.banks[0], 50.0, 0.0, 0, -1, environment)
+        print("Checking global consistency of deposits:")
+        if environment.check_global_transaction_balance("deposits") == True:
+            print("Consistent")
+        else:
+            print("Not consistent")
+
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # environment__add_aggregate
+    # -------------------------------------------------------------------------
+
+    def environment__add_aggregate(self, args):
+        import os
+        from src.bank import Bank
+        from src.household import Household
+        from src.firm import Firm
+        from src.environment import Environment
+
+        text = "This test checks environment.add_aggregate \n"
+        self.print_info(text)
+        #
+        # INITIALIZATION
+        #
+        environment_directory = str(args[0])
+        identifier = str(args[1])
+        log_directory = str(args[2])
+
+        # Configure logging parameters so we get output while the program runs
+        logging.basicConfig(format='%(asctime)s %(message)s', datefmt='%m/%d/%Y %H:%M:%S',
+                            filename=log_directory + identifier + ".log", level=logging.INFO)
+        logging.info('START logging for test environment__add_aggregate in run: %s',
+                     environment_directory + identifier + ".xml")
+
+        # Construct household filename
+        environment = Environment(environment_directory,  identifier)
+
+        # the deposits of the households less their loans, summed over the books
+        def household_deposits():
+            wealth = 0.0
+            for household in environment.households:
+                for tranx in household.accounts.transactions_by_type("deposits"):
+                    if tranx.from_ is household:
+                        wealth = wealth + tranx.amount
+                for tranx in household.accounts.transactions_by_type("loans"):
+                    if tranx.to is household:
+                        wealth = wealth - tranx.amount
+            return wealth
+
+        #
+        # TESTING
+        #
+
+        environment.add_aggregate("household_deposits", "deposits", "from_", "households")
+        environment.add_aggregate("household_deposits", "loans", "to", "households", -1.0)
+        print("Aggregate household_deposits and the sum over the books:")
+        print(environment.get_aggregate("household_deposits"), household_deposits())
+        print("Adding deposits of 150.0 and a loan of 20.0 to the first household:")
+        environment.new_transaction("deposits", "", environment.households[0], environment.banks[0], 150.0, 0.1, 0, -1)
+        environment.new_transaction("loans", "", environment.banks[0], environment.households[0], 20.0, 0.0, 0, -1)
+        print(environment.get_aggregate("household_deposits"), household_deposits())
+        print("Setting the amount of the deposits to 100.0:")
+        transaction = environment.households[0].accounts.transactions_by_type("deposits")[-1]
+        transaction.amount = 100.0
+        print(environment.get_aggregate("household_deposits"), household_deposits())
+        print("Accruing interests on deposits (10% on the new deposits):")
+        environment.accrue_interests(["deposits"])
+        print(round(environment.get_aggregate("household_deposits"), 6), round(household_deposits(), 6))
+        print("Removing the deposits:")
+        environment.remove_transactions([transaction])
+        print(round(environment.get_aggregate("household_deposits"), 6), round(household_deposits(), 6))
+        print("Resetting the environment:")
+        environment.reset()
+        print(environment.get_aggregate("household_deposits"), household_deposits())
 
     # -------------------------------------------------------------------------
 
@@ -1295,3 +1517,468 @@ class TestsEnvironment(object):
         print(environment.get_assets())
 
     # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # environment__new_transactions
+    # -------------------------------------------------------------------------
+
+    def environment__new_transactions(self, args):
+        import os
+        from src.bank import Bank
+        from src.household import Household
+        from src.firm import Firm
+        from src.environment import Environment
+
+        text = "This test checks environment.new_transactions \n"
+        self.print_info(text)
+        #
+        # INITIALIZATION
+        #
+        environment_directory = str(args[0])
+        identifier = str(args[1])
+        log_directory = str(args[2])
+
+        # Configure logging parameters so we get output while the program runs
+        logging.basicConfig(format='%(asctime)s %(message)s', datefmt='%m/%d/%Y %H:%M:%S',
+                            filename=log_directory + identifier + ".log", level=logging.INFO)
+        logging.info('START logging for test environment__new_transactions in run: %s',
+                     environment_directory + identifier + ".xml")
+
+        # Construct household filename
+        environment = Environment(environment_directory,  identifier)
+
+        #
+        # TESTING
+        #
+
+        bank = environment.get_agent_by_id("bank_test_config_id")
+        household = environment.get_agent_by_id("household_test_config_id")
+        print("Number of goods transactions of the household before (should be 0.0):")
+        print(household.get_account_num_transactions("goods"))
+        print("Adding three goods transactions at once, by identifiers and by agents")
+        environment.new_transactions([("goods", "", "bank_test_config_id", "household_test_config_id", 10.0, 0.0, 0, -1),
+                                      ("goods", "", "bank_test_config_id", "household_test_config_id", 20.0, 0.0, 0, -1),
+                                      ("goods", "", bank, household, 30.0, 0.0, 0, -1)])
+        print("Number of goods transactions of the household after (should be 3.0):")
+        print(household.get_account_num_transactions("goods"))
+        print("Volume of goods of the bank after (should be 60.0):")
+        print(bank.get_account("goods"))
+
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # environment__accrue_interests
+    # -------------------------------------------------------------------------
+
+    def environment__accrue_interests(self, args):
+        import os
+        from src.bank import Bank
+        from src.household import Household
+        from src.firm import Firm
+        from src.environment import Environment
+
+        text = "This test checks environment.accrue_interests \n"
+        self.print_info(text)
+        #
+        # INITIALIZATION
+        #
+        environment_directory = str(args[0])
+        identifier = str(args[1])
+        log_directory = str(args[2])
+
+        # Configure logging parameters so we get output while the program runs
+        logging.basicConfig(format='%(asctime)s %(message)s', datefmt='%m/%d/%Y %H:%M:%S',
+                            filename=log_directory + identifier + ".log", level=logging.INFO)
+        logging.info('START logging for test environment__accrue_interests in run: %s',
+                     environment_directory + identifier + ".xml")
+
+        # Construct household filename
+        environment = Environment(environment_directory,  identifier)
+
+        #
+        # TESTING
+        #
+
+        bank = environment.get_agent_by_id("bank_test_config_id")
+        household = environment.get_agent_by_id("household_test_config_id")
+        environment.new_transactions([("goods", "", bank, household, 100.0, 0.1, 0, -1),
+                                      ("labour", "", household, bank, 100.0, 0.1, 0, -1)])
+        print("Accruing interests on goods only")
+        environment.accrue_interests(["goods"])
+        print("Volume of goods of the household (should be 110.0):")
+        print(household.get_account("goods"))
+        print("Volume of labour of the household (should be 100.0):")
+        print(household.get_account("labour"))
+        print("Accruing interests on all transactions")
+        environment.accrue_interests()
+        print("Volume of goods of the household (should be 121.0):")
+        print(household.get_account("goods"))
+        print("Volume of labour of the household (should be 110.0):")
+        print(household.get_account("labour"))
+
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # environment__reset
+    # -------------------------------------------------------------------------
+
+    def environment__reset(self, args):
+        import os
+        from src.bank import Bank
+        from src.household import Household
+        from src.firm import Firm
+        from src.environment import Environment
+
+        text = "This test checks environment.reset \n"
+        self.print_info(text)
+        #
+        # INITIALIZATION
+        #
+        environment_directory = str(args[0])
+        identifier = str(args[1])
+        log_directory = str(args[2])
+
+        # Configure logging parameters so we get output while the program runs
+        logging.basicConfig(format='%(asctime)s %(message)s', datefmt='%m/%d/%Y %H:%M:%S',
+                            filename=log_directory + identifier + ".log", level=logging.INFO)
+        logging.info('START logging for test environment__reset in run: %s',
+                     environment_directory + identifier + ".xml")
+
+        # Construct household filename
+        environment = Environment(environment_directory,  identifier)
+
+        #
+        # TESTING
+        #
+
+        household = environment.get_agent_by_id("household_test_config_id")
+        print("Household as read from the config files:")
+        print(household)
+        print("Removing the transactions of the household and changing its parameters")
+        environment.remove_transactions(list(household.accounts))
+        household.parameters["labour"] = 0.0
+        print("Resetting the environment")
+        environment.reset()
+        household = environment.get_agent_by_id("household_test_config_id")
+        print("Household after the reset (should be as read from the config files):")
+        print(household)
+        print("Number of banks, firms and households after the reset (should be 3, 3 and 3):")
+        print(len(environment.banks))
+        print(len(environment.firms))
+        print(len(environment.households))
+
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # environment__config_cache
+    # -------------------------------------------------------------------------
+
+    def environment__config_cache(self, args):
+        import os
+        from src.bank import Bank
+        from src.household import Household
+        from src.firm import Firm
+        from src.environment import Environment
+        from src.config_cache import ConfigCache
+        import shutil
+        import tempfile
+
+        text = "This test checks environment.config_cache \n"
+        self.print_info(text)
+        #
+        # INITIALIZATION
+        #
+        environment_directory = str(args[0])
+        identifier = str(args[1])
+        log_directory = str(args[2])
+
+        # Configure logging parameters so we get output while the program runs
+        logging.basicConfig(format='%(asctime)s %(message)s', datefmt='%m/%d/%Y %H:%M:%S',
+                            filename=log_directory + identifier + ".log", level=logging.INFO)
+        logging.info('START logging for test environment__config_cache in run: %s',
+                     environment_directory + identifier + ".xml")
+
+        # Construct household filename
+        environment = Environment(environment_directory,  identifier)
+
+        #
+        # TESTING
+        #
+
+        cache_directory = tempfile.mkdtemp()
+        filename = environment.bank_directory + "bank_for_tests.xml"
+        environment.config_cache = ConfigCache(cache_directory)
+        environment.parsed_configs = {}
+        print("Reading a bank's config file with an empty cache")
+        bank = Bank()
+        environment.read_agent_file(bank, filename)
+        environment.read_transactions_file(bank, filename)
+        environment.config_cache.save()
+        print("Number of cache files written (should be 1):")
+        print(len(os.listdir(cache_directory)))
+        print("Reading the cache back from disk")
+        environment.config_cache = ConfigCache(cache_directory)
+        print("Identifier of the bank in the cache (should be bank_test_config_id):")
+        print(environment.config_cache.get(filename, "agent")[0])
+        print("Number of transactions of the bank in the cache (should be 2):")
+        print(len(environment.config_cache.get(filename, "transactions")))
+        bank = Bank()
+        environment.read_agent_file(bank, filename)
+        print("Interest rate on loans of the bank read from the cache (should be 0.004):")
+        print(bank.interest_rate_loans)
+        print("Name of the cache file of a directory with a non-ascii name (should end in .pickle):")
+        print(environment.config_cache.get_cache_filename("agents/b\xc3\xa4nks/").endswith(".pickle"))
+        shutil.rmtree(cache_directory)
+
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # environment__parse_config_files
+    # -------------------------------------------------------------------------
+
+    def environment__parse_config_files(self, args):
+        from src.bank import Bank
+        from src.household import Household
+        from src.firm import Firm
+        from src.environment import Environment
+
+        import shutil
+        import tempfile
+        from src.config_cache import ConfigCache
+
+        text = "This test checks environment.parse_config_files \n"
+        self.print_info(text)
+        #
+        # INITIALIZATION
+        #
+        environment_directory = str(args[0])
+        identifier = str(args[1])
+        log_directory = str(args[2])
+
+        # Configure logging parameters so we get output while the program runs
+        logging.basicConfig(format='%(asctime)s %(message)s', datefmt='%m/%d/%Y %H:%M:%S',
+                            filename=log_directory + identifier + ".log", level=logging.INFO)
+        logging.info('START logging for test environment__parse_config_files in run: %s',
+                     environment_directory + identifier + ".xml")
+
+        # Construct household filename
+        environment = Environment(environment_directory,  identifier)
+
+        #
+        # TESTING
+        #
+
+        print("Parsing the agents' config files in 2 processes")
+        environment.parse_config_files(2)
+        filename = environment.bank_directory + "bank_for_tests.xml"
+        print("Identifier of the bank parsed (should be bank_test_config_id):")
+        print(environment.get_parsed_config(filename, "agent")[0])
+        print("Number of transactions of the bank parsed (should be 2):")
+        print(len(environment.get_parsed_config(filename, "transactions")))
+        bank = Bank()
+        environment.read_agent_file(bank, filename)
+        print("Interest rate on loans of the bank made from what was parsed (should be 0.004):")
+        print(bank.interest_rate_loans)
+        print("The parsed config files give the same agents as reading them:")
+        parsed = [(agent.identifier, sorted(agent.parameters.items())) for agent in environment.banks + environment.firms + environment.households]
+        environment.parsed_configs = {}
+        environment.initialize_banks_from_files(environment.bank_directory)
+        environment.initialize_firms_from_files(environment.firm_directory)
+        environment.initialize_households_from_files(environment.household_directory)
+        read = [(agent.identifier, sorted(agent.parameters.items())) for agent in environment.banks + environment.firms + environment.households]
+        print(parsed == read)
+        print("Parsing them again with 2 transactions per batch and a config cache")
+        cache_directory = tempfile.mkdtemp()
+        environment.config_cache = ConfigCache(cache_directory)
+        environment.transaction_batch = 2
+        environment.parse_config_files(2)
+        print("Identifier of the bank parsed (should be bank_test_config_id):")
+        print(environment.get_parsed_config(filename, "agent")[0])
+        print("The 2 transactions of the bank do not fit in one batch, so none are parsed or cached (should be True):")
+        print(environment.get_parsed_config(filename, "transactions") is None and
+              environment.config_cache.get(filename, "transactions") is None)
+        shutil.rmtree(cache_directory)
+
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # environment__population
+    # -------------------------------------------------------------------------
+
+    def environment__population(self, args):
+        import os
+        from src.environment import Environment
+        from src.population import Population
+        import shutil
+        import tempfile
+
+        text = "This test checks environment.population \n"
+        self.print_info(text)
+        #
+        # INITIALIZATION
+        #
+        environment_directory = str(args[0])
+        identifier = str(args[1])
+        log_directory = str(args[2])
+
+        # Configure logging parameters so we get output while the program runs
+        logging.basicConfig(format='%(asctime)s %(message)s', datefmt='%m/%d/%Y %H:%M:%S',
+                            filename=log_directory + identifier + ".log", level=logging.INFO)
+        logging.info('START logging for test environment__population in run: %s',
+                     environment_directory + identifier + ".xml")
+
+        # Construct household filename
+        environment = Environment(environment_directory,  identifier)
+
+        #
+        # TESTING
+        #
+
+        def describe(environment):
+            agents = [(agent.identifier, sorted(agent.parameters.items())) for members in environment.agents for agent in members]
+            transactions = sorted((tranx.type_, tranx.from_.identifier, tranx.to.identifier, tranx.amount)
+                                  for members in environment.agents for agent in members for tranx in agent.accounts)
+            return (agents, transactions)
+
+        read = describe(environment)
+        population_directory = tempfile.mkdtemp()
+        print("Exporting the agents' config files to population files")
+        for name in ["bank_directory", "firm_directory", "household_directory", "central_bank_directory"]:
+            filename = os.path.join(population_directory, name + ".csv")
+            Population(filename).export_directory(getattr(environment, name))
+            setattr(environment, name, filename)
+        print("Number of banks in the population file of banks (should be 3):")
+        print(len(Population(environment.bank_directory).read_agents()))
+        print("Number of transactions in the edge list of banks (should be 6):")
+        print(len(Population(environment.bank_directory).read_transactions()))
+        print("Reading the agents and their transactions from the population files")
+        environment.initialize_banks_from_files(environment.bank_directory)
+        environment.initialize_firms_from_files(environment.firm_directory)
+        environment.initialize_households_from_files(environment.household_directory)
+        environment.initialize_central_bank_from_files(environment.central_bank_directory)
+        environment.initialize_books()
+        environment.read_transactions_for_banks(environment.bank_directory)
+        environment.read_transactions_for_firms(environment.firm_directory)
+        environment.read_transactions_for_households(environment.household_directory)
+        environment.read_transactions_for_central_bank(environment.central_bank_directory)
+        print("The population files give the same agents and transactions as the config files:")
+        print(describe(environment) == read)
+        shutil.rmtree(population_directory)
+
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # environment__read_transactions_file
+    # -------------------------------------------------------------------------
+
+    def environment__read_transactions_file(self, args):
+        import os
+        import shutil
+        from src.environment import Environment
+        from src.config_cache import ConfigCache
+        import tempfile
+
+        text = "This test checks environment.read_transactions_file \n"
+        self.print_info(text)
+        #
+        # INITIALIZATION
+        #
+        environment_directory = str(args[0])
+        identifier = str(args[1])
+        log_directory = str(args[2])
+
+        # Configure logging parameters so we get output while the program runs
+        logging.basicConfig(format='%(asctime)s %(message)s', datefmt='%m/%d/%Y %H:%M:%S',
+                            filename=log_directory + identifier + ".log", level=logging.INFO)
+        logging.info('START logging for test environment__read_transactions_file in run: %s',
+                     environment_directory + identifier + ".xml")
+
+        # Construct household filename
+        environment = Environment(environment_directory,  identifier)
+
+        #
+        # TESTING
+        #
+
+        config_file, filename = tempfile.mkstemp(suffix=".xml")
+        os.write(config_file, "<bank identifier='bank_test_config_id'>\n".encode("utf-8"))
+        os.write(config_file, "    <parameter type='static' name='interest_rate_loans' value='0.004'></parameter>\n".encode("utf-8"))
+        for i in range(25):
+            os.write(config_file, ("    <transaction type='loans' asset='' from='bank_test_config_id' to='firm_test_config_id' "
+                                   "amount='1' interest='0.00' maturity='0' time_of_default='-1'></transaction>\n").encode("utf-8"))
+        os.write(config_file, "</bank>\n".encode("utf-8"))
+        os.close(config_file)
+        bank = environment.get_agent_by_id("bank_test_config_id")
+        print("Identifier in a config file with 25 loans (should be bank_test_config_id):")
+        print(environment.read_config_identifier(filename))
+        print("Loans of the bank before reading the file:")
+        print(bank.get_account("loans"))
+        print("Streaming the file in batches of 10 transactions")
+        cache_directory = tempfile.mkdtemp()
+        environment.config_cache = ConfigCache(cache_directory)
+        environment.transaction_batch = 10
+        environment.read_transactions_file(bank, filename)
+        print("Loans of the bank after reading the file (should be 25.0 more):")
+        print(bank.get_account("loans"))
+        print("Are the transactions of the file kept in the config cache (should be False, it took 3 batches):")
+        print(environment.config_cache.get(filename, "transactions") is not None)
+        print("Reading the file again in batches of 100 transactions")
+        environment.transaction_batch = 100
+        environment.read_transactions_file(bank, filename)
+        print("Number of transactions of the file in the config cache (should be 25):")
+        print(len(environment.config_cache.get(filename, "transactions")))
+        shutil.rmtree(cache_directory)
+        os.remove(filename)
+
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # environment__seed_random
+    # -------------------------------------------------------------------------
+
+    def environment__seed_random(self, args):
+        import random
+        from src.environment import Environment
+        from src.market import Market
+
+        text = "This test checks environment.seed_random \n"
+        self.print_info(text)
+        #
+        # INITIALIZATION
+        #
+        environment_directory = str(args[0])
+        identifier = str(args[1])
+        log_directory = str(args[2])
+
+        # Configure logging parameters so we get output while the program runs
+        logging.basicConfig(format='%(asctime)s %(message)s', datefmt='%m/%d/%Y %H:%M:%S',
+                            filename=log_directory + identifier + ".log", level=logging.INFO)
+        logging.info('START logging for test environment__seed_random in run: %s',
+                     environment_directory + identifier + ".xml")
+
+        # Construct household filename
+        environment = Environment(environment_directory,  identifier)
+
+        #
+        # TESTING
+        #
+
+        def ration(environment):
+            agents = [[agent.identifier, 10.0] for agent in environment.firms]
+            agents = agents + [[agent.identifier, -10.0] for agent in environment.households]
+            return Market("market", environment.random).rationing_proportional(agents)
+
+        print("Without a seed the environment draws from the random module:")
+        print(environment.random is random)
+        state = random.getstate()
+        environment.seed_random(7)
+        first = ration(environment)
+        environment.seed_random(7)
+        second = ration(environment)
+        print("Rationing with the same seed gives the same pairs:")
+        print(first == second)
+        print("Rationing with a seed leaves the random module as it was:")
+        print(random.getstate() == state)
+
+    # -------------------------------------------------------------------------
+
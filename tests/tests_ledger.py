@@ -0,0 +1,379 @@
+#!/usr/bin/env python
+# [SublimeLinter pep8-max-line-length:150]
+# -*- coding: utf-8 -*-
+
+"""
+black_rhino is a multi-agent simulator for financial network analysis
+Copyright (C) 2016 Co-Pierre Georg (co-pierre.georg@keble.ox.ac.uk)
+Pawel Fiedor (pawel@fiedor.eu)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3 of the License.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import logging
+from src.helper import Helper
+
+# -------------------------------------------------------------------------
+#  class Tests
+# -------------------------------------------------------------------------
+
+
+class TestsLedger(object):
+    #
+    # VARIABLES
+    #
+
+    #
+    # METHODS
+    #
+
+    # -------------------------------------------------------------------------
+    # __init__
+    # -------------------------------------------------------------------------
+    def __init__(self):
+        pass
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # print_info(text)
+    # -------------------------------------------------------------------------
+    def print_info(self, text):
+        print('##############################################################################\n')
+        print(text)
+        print('##############################################################################\n')
+    # -------------------------------------------------------------------------
+
+# -------------------------------------------------------------------------
+#  TESTS FOR LEDGER.PY
+# -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # ledger__book
+    # -------------------------------------------------------------------------
+
+    def ledger__book(self, args):
+        import os
+        from src.bank import Bank
+        from src.household import Household
+        from src.firm import Firm
+        from src.environment import Environment
+        from src.ledger import Ledger
+
+        text = "This test checks ledger.book \n"
+        self.print_info(text)
+        #
+        # INITIALIZATION
+        #
+        environment_directory = str(args[0])
+        identifier = str(args[1])
+        log_directory = str(args[2])
+
+        # Configure logging parameters so we get output while the program runs
+        logging.basicConfig(format='%(asctime)s %(message)s', datefmt='%m/%d/%Y %H:%M:%S',
+                            filename=log_directory + identifier + ".log", level=logging.INFO)
+        logging.info('START logging for test ledger__book in run: %s',
+                     environment_directory + identifier + ".xml")
+
+        # Construct bank filename
+        environment = Environment(environment_directory,  identifier)
+        # keep the transactions created below in a columnar ledger
+        environment.ledger = Ledger()
+
+        # generate a household
+        household = Household()
+        household.identifier = "test_household"
+        environment.households.append(household)
+
+        # generate a firm
+        firm = Firm()
+        firm.identifier = "test_firm"
+        environment.firms.append(firm)
+
+        # generate the bank
+        bank = Bank()
+        environment.banks.append(bank)
+        helper = Helper()
+        helper.initialize_standard_bank(bank, environment)
+
+        #
+        # TESTING
+        #
+
+        print("Number of transactions in the ledger (should be 3):")
+        print(len(environment.ledger))
+        tranx = bank.accounts.transactions_by_type("cash")[0]
+        print("Slot of the cash transaction in the ledger (should be 1):")
+        print(tranx.slot)
+        tranx.set_amount(120.0, environment)
+        print("Amount of cash in the ledger's column (should be 120.0):")
+        print(environment.ledger.amount[tranx.slot])
+        print("Volume of cash in the ledger (should be 120.0):")
+        print(environment.ledger.volume_by_type("cash"))
+
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # ledger__release
+    # -------------------------------------------------------------------------
+
+    def ledger__release(self, args):
+        import os
+        from src.bank import Bank
+        from src.household import Household
+        from src.firm import Firm
+        from src.environment import Environment
+        from src.ledger import Ledger
+
+        text = "This test checks ledger.release \n"
+        self.print_info(text)
+        #
+        # INITIALIZATION
+        #
+        environment_directory = str(args[0])
+        identifier = str(args[1])
+        log_directory = str(args[2])
+
+        # Configure logging parameters so we get output while the program runs
+        logging.basicConfig(format='%(asctime)s %(message)s', datefmt='%m/%d/%Y %H:%M:%S',
+                            filename=log_directory + identifier + ".log", level=logging.INFO)
+        logging.info('START logging for test ledger__release in run: %s',
+                     environment_directory + identifier + ".xml")
+
+        # Construct bank filename
+        environment = Environment(environment_directory,  identifier)
+        # keep the transactions created below in a columnar ledger
+        environment.ledger = Ledger()
+
+        # generate a household
+        household = Household()
+        household.identifier = "test_household"
+        environment.households.append(household)
+
+        # generate a firm
+        firm = Firm()
+        firm.identifier = "test_firm"
+        environment.firms.append(firm)
+
+        # generate the bank
+        bank = Bank()
+        environment.banks.append(bank)
+        helper = Helper()
+        helper.initialize_standard_bank(bank, environment)
+
+        #
+        # TESTING
+        #
+
+        tranx = bank.accounts.transactions_by_type("cash")[0]
+        tranx.remove_transaction(environment)
+        print("Number of transactions in the ledger after removing the cash (should be 2):")
+        print(len(environment.ledger))
+        print("The removed transaction keeps its values (should be the cash of 100.0):")
+        print(tranx)
+        environment.new_transaction("goods", "", bank.identifier, bank.identifier, 10.0, 0.0, 0, -1)
+        print("Slot of the new goods transaction, reused from the cash (should be 1):")
+        print(bank.accounts.transactions_by_type("goods")[0].slot)
+
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # ledger__accrue_interests
+    # -------------------------------------------------------------------------
+
+    def ledger__accrue_interests(self, args):
+        import os
+        from src.bank import Bank
+        from src.household import Household
+        from src.firm import Firm
+        from src.environment import Environment
+        from src.ledger import Ledger
+
+        text = "This test checks environment.accrue_interests with a ledger \n"
+        self.print_info(text)
+        #
+        # INITIALIZATION
+        #
+        environment_directory = str(args[0])
+        identifier = str(args[1])
+        log_directory = str(args[2])
+
+        # Configure logging parameters so we get output while the program runs
+        logging.basicConfig(format='%(asctime)s %(message)s', datefmt='%m/%d/%Y %H:%M:%S',
+                            filename=log_directory + identifier + ".log", level=logging.INFO)
+        logging.info('START logging for test ledger__accrue_interests in run: %s',
+                     environment_directory + identifier + ".xml")
+
+        # Construct bank filename
+        environment = Environment(environment_directory,  identifier)
+        # keep the transactions created below in a columnar ledger
+        environment.ledger = Ledger()
+
+        # generate a household
+        household = Household()
+        household.identifier = "test_household"
+        environment.households.append(household)
+
+        # generate a firm
+        firm = Firm()
+        firm.identifier = "test_firm"
+        environment.firms.append(firm)
+
+        # generate the bank
+        bank = Bank()
+        environment.banks.append(bank)
+        helper = Helper()
+        helper.initialize_standard_bank(bank, environment)
+
+        #
+        # TESTING
+        #
+
+        bank.accounts.transactions_by_type("deposits")[0].set_interest(0.01, environment)
+        bank.accounts.transactions_by_type("loans")[0].set_interest(0.01, environment)
+        print("Before accruing interests:")
+        print(bank)
+        environment.accrue_interests()
+        print("After accruing interests (deposits should be 252.5, loans 151.5, cash 100.0):")
+        print(bank)
+
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # ledger__purge_accounts
+    # -------------------------------------------------------------------------
+
+    def ledger__purge_accounts(self, args):
+        import os
+        from src.bank import Bank
+        from src.household import Household
+        from src.firm import Firm
+        from src.environment import Environment
+        from src.ledger import Ledger
+
+        text = "This test checks transaction.purge_accounts with a ledger \n"
+        self.print_info(text)
+        #
+        # INITIALIZATION
+        #
+        environment_directory = str(args[0])
+        identifier = str(args[1])
+        log_directory = str(args[2])
+
+        # Configure logging parameters so we get output while the program runs
+        logging.basicConfig(format='%(asctime)s %(message)s', datefmt='%m/%d/%Y %H:%M:%S',
+                            filename=log_directory + identifier + ".log", level=logging.INFO)
+        logging.info('START logging for test ledger__purge_accounts in run: %s',
+                     environment_directory + identifier + ".xml")
+
+        # Construct bank filename
+        environment = Environment(environment_directory,  identifier)
+        # keep the transactions created below in a columnar ledger
+        environment.ledger = Ledger()
+
+        # generate a household
+        household = Household()
+        household.identifier = "test_household"
+        environment.households.append(household)
+
+        # generate a firm
+        firm = Firm()
+        firm.identifier = "test_firm"
+        environment.firms.append(firm)
+
+        # generate the bank
+        bank = Bank()
+        environment.banks.append(bank)
+        helper = Helper()
+        helper.initialize_standard_bank(bank, environment)
+
+        #
+        # TESTING
+        #
+
+        from src.transaction import Transaction
+        bank.accounts.transactions_by_type("cash")[0].set_amount(0.0, environment)
+        transaction = Transaction()
+        transaction.purge_accounts(environment)
+        print("After purging (there should be no cash transaction):")
+        print(bank)
+        print("Number of transactions in the ledger (should be 2):")
+        print(len(environment.ledger))
+
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # ledger__compact
+    # -------------------------------------------------------------------------
+
+    def ledger__compact(self, args):
+        import os
+        from src.bank import Bank
+        from src.household import Household
+        from src.firm import Firm
+        from src.environment import Environment
+        from src.ledger import Ledger
+
+        text = "This test checks ledger.compact \n"
+        self.print_info(text)
+        #
+        # INITIALIZATION
+        #
+        environment_directory = str(args[0])
+        identifier = str(args[1])
+        log_directory = str(args[2])
+
+        # Configure logging parameters so we get output while the program runs
+        logging.basicConfig(format='%(asctime)s %(message)s', datefmt='%m/%d/%Y %H:%M:%S',
+                            filename=log_directory + identifier + ".log", level=logging.INFO)
+        logging.info('START logging for test ledger__compact in run: %s',
+                     environment_directory + identifier + ".xml")
+
+        # Construct bank filename
+        environment = Environment(environment_directory,  identifier)
+        # keep the transactions created below in a columnar ledger
+        environment.ledger = Ledger()
+
+        # generate a household
+        household = Household()
+        household.identifier = "test_household"
+        environment.households.append(household)
+
+        # generate a firm
+        firm = Firm()
+        firm.identifier = "test_firm"
+        environment.firms.append(firm)
+
+        # generate the bank
+        bank = Bank()
+        environment.banks.append(bank)
+        helper = Helper()
+        helper.initialize_standard_bank(bank, environment)
+
+        #
+        # TESTING
+        #
+
+        print("Number of slots in use in the ledger (should be 3):")
+        print(environment.ledger.size)
+        environment.remove_transactions(bank.accounts.transactions_by_type("deposits"))
+        print("Number of slots in use after removing the deposits (should still be 3):")
+        print(environment.ledger.size)
+        environment.remove_transactions(bank.accounts.transactions_by_type("loans"))
+        print("Number of slots in use after removing the loans, which compacts the ledger (should be 1):")
+        print(environment.ledger.size)
+        print("Slot of the cash after compacting (should be 0):")
+        print(bank.accounts.transactions_by_type("cash")[0].slot)
+        print("Amount of the cash after compacting (should be 100.0):")
+        print(bank.get_account("cash"))
+
+    # -------------------------------------------------------------------------
@@ -1231,3 +1231,270 @@ class TestsMeasurement(object):
         print(measurement.identifier)
 
     # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # measurement__format
+    # -------------------------------------------------------------------------
+
+    def measurement__format(self, args):
+        import os
+        import gzip
+        from src.bank import Bank
+        from src.household import Household
+        from src.firm import Firm
+        from src.environment import Environment
+        from src.transaction import Transaction
+        from src.market import Market
+        from src.runner import Runner
+        from src.measurement import Measurement
+
+        text = "This test checks the npz and csv.gz formats of the measurement \n"
+        self.print_info(text)
+        #
+        # INITIALIZATION
+        #
+        environment_directory = str(args[0])
+        identifier = str(args[1])
+        log_directory = str(args[2])
+
+        # Configure logging parameters so we get output while the program runs
+        logging.basicConfig(format='%(asctime)s %(message)s', datefmt='%m/%d/%Y %H:%M:%S',
+                            filename=log_directory + identifier + ".log", level=logging.INFO)
+        logging.info('START logging for test measurement__format in run: %s',
+                     environment_directory + identifier + ".xml")
+
+        # Construct household filename
+        environment = Environment(environment_directory,  identifier)
+        environment.measurement_config = "tests/measurements/test_output_npz.xml"
+
+        # Construct a runner
+        runner = Runner(environment)
+
+        # generate a household
+        household = Household()
+        household.identifier = "test_household"
+        environment.households.append(household)
+
+        #
+        # TESTING
+        #
+        measurement = Measurement(environment, runner)
+        print("Format and rows per block read from the config:")
+        print(measurement.format)
+        print(measurement.block_rows)
+        measurement.open_file()
+        for step in range(5):
+            runner.current_step = step
+            measurement.write_to_file()
+            print("Rows kept and rows written:")
+            print(measurement.block_count, measurement.written_rows)
+        measurement.close_file()
+        print("Columns and values in " + measurement.get_output_filename() + ":")
+        try:
+            import numpy as np
+            npz_file = np.load(measurement.get_output_filename())
+            print(list(npz_file["columns"]))
+            print(npz_file["values"])
+            npz_file.close()
+        except ImportError:
+            import zipfile
+            print(zipfile.ZipFile(measurement.get_output_filename()).namelist())
+        os.remove(measurement.get_output_filename())
+
+        measurement.format = "csv.gz"
+        measurement.open_file()
+        for step in range(5):
+            runner.current_step = step
+            measurement.write_to_file()
+        measurement.close_file()
+        print("Contents of " + measurement.get_output_filename() + ":")
+        gzip_file = gzip.open(measurement.get_output_filename())
+        print(gzip_file.read())
+        gzip_file.close()
+        os.remove(measurement.get_output_filename())
+
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # measurement__register_getter
+    # -------------------------------------------------------------------------
+
+    def measurement__register_getter(self, args):
+        import os
+        from src.bank import Bank
+        from src.household import Household
+        from src.firm import Firm
+        from src.environment import Environment
+        from src.transaction import Transaction
+        from src.market import Market
+        from src.runner import Runner
+        from src.measurement import Measurement, register_getter, getters
+
+        text = "This test checks measurement.register_getter \n"
+        self.print_info(text)
+        #
+        # INITIALIZATION
+        #
+        environment_directory = str(args[0])
+        identifier = str(args[1])
+        log_directory = str(args[2])
+
+        # Configure logging parameters so we get output while the program runs
+        logging.basicConfig(format='%(asctime)s %(message)s', datefmt='%m/%d/%Y %H:%M:%S',
+                            filename=log_directory + identifier + ".log", level=logging.INFO)
+        logging.info('START logging for test measurement__register_getter in run: %s',
+                     environment_directory + identifier + ".xml")
+
+        # Construct household filename
+        environment = Environment(environment_directory,  identifier)
+
+        # Construct a runner
+        runner = Runner(environment)
+
+        # generate a household
+        household = Household()
+        household.identifier = "test_household"
+        environment.households.append(household)
+
+        #
+        # TESTING
+        #
+        @register_getter("number_of_households")
+        def get_number_of_households(measurement):
+            return len(measurement.environment.households)
+
+        measurement = Measurement(environment, runner)
+        print("Values of the columns of the config:")
+        print([get() for get in measurement.column_getters])
+        print("Value of the registered getter number_of_households:")
+        print(measurement.get_getter("number_of_households")())
+        print("Value of an output without a getter:")
+        print(measurement.get_getter("no_such_output")())
+        del getters["number_of_households"]
+
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # measurement__background_writer
+    # -------------------------------------------------------------------------
+
+    def measurement__background_writer(self, args):
+        import os
+        from src.bank import Bank
+        from src.household import Household
+        from src.firm import Firm
+        from src.environment import Environment
+        from src.transaction import Transaction
+        from src.market import Market
+        from src.runner import Runner
+        from src.measurement import Measurement
+
+        text = "This test checks the background writer of the measurement \n"
+        self.print_info(text)
+        #
+        # INITIALIZATION
+        #
+        environment_directory = str(args[0])
+        identifier = str(args[1])
+        log_directory = str(args[2])
+
+        # Configure logging parameters so we get output while the program runs
+        logging.basicConfig(format='%(asctime)s %(message)s', datefmt='%m/%d/%Y %H:%M:%S',
+                            filename=log_directory + identifier + ".log", level=logging.INFO)
+        logging.info('START logging for test measurement__background_writer in run: %s',
+                     environment_directory + identifier + ".xml")
+
+        # Construct household filename
+        environment = Environment(environment_directory,  identifier)
+        environment.measurement_config = "tests/measurements/test_output_background.xml"
+
+        # Construct a runner
+        runner = Runner(environment)
+
+        #
+        # TESTING
+        #
+        measurement = Measurement(environment, runner)
+        print("Background writer and queue size read from the config:")
+        print(measurement.background)
+        print(measurement.queue_size)
+        measurement.open_file()
+        print("Is the writer running?")
+        print(measurement.writer.is_alive())
+        for step in range(5):
+            runner.current_step = step
+            measurement.write_to_file()
+        measurement.close_file()
+        print("Is the writer stopped?")
+        print(measurement.writer is None)
+        print("Contents of " + measurement.get_output_filename() + ":")
+        with open(measurement.get_output_filename()) as output_file:
+            print(output_file.read())
+
+        print("Writing text to an npz file in the background:")
+        measurement.format = "npz"
+        measurement.open_file()
+        measurement.column_getters = [lambda: "text"] * len(measurement.config)
+        measurement.write_to_file()
+        try:
+            measurement.close_file()
+            print("No error")
+        except ValueError as error:
+            print("Error raised by close_file: " + str(error))
+        os.remove(measurement.get_output_filename())
+
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # measurement__get_sampled_steps
+    # -------------------------------------------------------------------------
+
+    def measurement__get_sampled_steps(self, args):
+        from src.bank import Bank
+        from src.household import Household
+        from src.firm import Firm
+        from src.environment import Environment
+        from src.transaction import Transaction
+        from src.market import Market
+        from src.runner import Runner
+        from src.measurement import Measurement
+
+        text = "This test checks measurement.get_sampled_steps \n"
+        self.print_info(text)
+        #
+        # INITIALIZATION
+        #
+        environment_directory = str(args[0])
+        identifier = str(args[1])
+        log_directory = str(args[2])
+
+        # Configure logging parameters so we get output while the program runs
+        logging.basicConfig(format='%(asctime)s %(message)s', datefmt='%m/%d/%Y %H:%M:%S',
+                            filename=log_directory + identifier + ".log", level=logging.INFO)
+        logging.info('START logging for test measurement__get_sampled_steps in run: %s',
+                     environment_directory + identifier + ".xml")
+
+        # Construct household filename
+        environment = Environment(environment_directory,  identifier)
+
+        # Construct a runner
+        runner = Runner(environment)
+
+        #
+        # TESTING
+        #
+        measurement = Measurement(environment, runner)
+        print("Steps sampled without a sampling schedule:")
+        print(measurement.get_sampled_steps(30))
+        environment.measurement_config = "tests/measurements/test_output_sampling.xml"
+        environment.shocks = []
+        measurement = Measurement(environment, runner)
+        print("Sampling schedule read from the config:")
+        print([kind for kind, attributes in measurement.sampling])
+        print("Steps sampled out of 30 without shocks:")
+        print(sorted(measurement.get_sampled_steps(30)))
+        environment.shocks = [[15, 16, "test"], [29, 29, "test"]]
+        print("Steps sampled out of 30 with shocks in steps 15 to 16 and 29:")
+        print(sorted(measurement.get_sampled_steps(30)))
+
+    # -------------------------------------------------------------------------
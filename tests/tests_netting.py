@@ -0,0 +1,296 @@
+#!/usr/bin/env python
+# [SublimeLinter pep8-max-line-length:150]
+# -*- coding: utf-8 -*-
+
+"""
+black_rhino is a multi-agent simulator for financial network analysis
+Copyright (C) 2016 Co-Pierre Georg (co-pierre.georg@keble.ox.ac.uk)
+Pawel Fiedor (pawel@fiedor.eu)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3 of the License.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import logging
+from src.helper import Helper
+
+# -------------------------------------------------------------------------
+#  class Tests
+# -------------------------------------------------------------------------
+
+
+class TestsNetting(object):
+    #
+    # VARIABLES
+    #
+
+    #
+    # METHODS
+    #
+
+    # -------------------------------------------------------------------------
+    # __init__
+    # -------------------------------------------------------------------------
+    def __init__(self):
+        pass
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # print_info(text)
+    # -------------------------------------------------------------------------
+    def print_info(self, text):
+        print('##############################################################################\n')
+        print(text)
+        print('##############################################################################\n')
+    # -------------------------------------------------------------------------
+
+# -------------------------------------------------------------------------
+#  TESTS FOR NETTING.PY
+# -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # netting__net
+    # -------------------------------------------------------------------------
+
+    def netting__net(self, args):
+        import os
+        from src.bank import Bank
+        from src.household import Household
+        from src.firm import Firm
+        from src.environment import Environment
+        from src.netting import Netting
+
+        text = "This test checks netting.net \n"
+        self.print_info(text)
+        #
+        # INITIALIZATION
+        #
+        environment_directory = str(args[0])
+        identifier = str(args[1])
+        log_directory = str(args[2])
+
+        # Configure logging parameters so we get output while the program runs
+        logging.basicConfig(format='%(asctime)s %(message)s', datefmt='%m/%d/%Y %H:%M:%S',
+                            filename=log_directory + identifier + ".log", level=logging.INFO)
+        logging.info('START logging for test netting__net in run: %s',
+                     environment_directory + identifier + ".xml")
+
+        # Construct bank filename
+        environment = Environment(environment_directory,  identifier)
+
+        # generate the bank
+        bank = Bank()
+        environment.banks.append(bank)
+        helper = Helper()
+        helper.initialize_standard_bank(bank, environment)
+        household = environment.households[0]
+        firm = environment.firms[0]
+
+        #
+        # TESTING
+        #
+
+        # the household has 250.0 deposits with the bank, now also a loan of 300.0
+        # the firm has a loan of 150.0 from the bank, now also deposits of 50.0
+        environment.new_transaction("loans", "", bank.identifier, household.identifier, 300.0, 0.0, 0, -1)
+        environment.new_transaction("deposits", "", firm.identifier, bank.identifier, 50.0, 0.0, 0, -1)
+        netting = Netting("deposits", "loans")
+        netting.net(environment, [household, firm], [bank],
+                    lambda depositor, lender: lender.interest_rate_deposits, lambda borrower, lender: lender.interest_rate_loans)
+        print("Number of transactions of the bank after netting (should be 3.0):")
+        print(bank.accounts.num_transactions_by_type("deposits") + bank.accounts.num_transactions_by_type("loans") +
+              bank.accounts.num_transactions_by_type("cash"))
+        print("Deposits of the bank after netting (should be 0.0):")
+        print(bank.accounts.volume_by_type("deposits"))
+        print("Loans of the bank to the household after netting (should be 50.0):")
+        print(sum(tranx.amount for tranx in bank.accounts.transactions_by_type_and_counterparty("loans", household)))
+        print("Loans of the bank to the firm after netting (should be 100.0):")
+        print(sum(tranx.amount for tranx in bank.accounts.transactions_by_type_and_counterparty("loans", firm)))
+
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # netting__net_ledger
+    # -------------------------------------------------------------------------
+
+    def netting__net_ledger(self, args):
+        import os
+        from src.bank import Bank
+        from src.household import Household
+        from src.firm import Firm
+        from src.environment import Environment
+        from src.netting import Netting
+        from src.ledger import Ledger
+
+        text = "This test checks netting.net with a columnar ledger \n"
+        self.print_info(text)
+        #
+        # INITIALIZATION
+        #
+        environment_directory = str(args[0])
+        identifier = str(args[1])
+        log_directory = str(args[2])
+
+        # Configure logging parameters so we get output while the program runs
+        logging.basicConfig(format='%(asctime)s %(message)s', datefmt='%m/%d/%Y %H:%M:%S',
+                            filename=log_directory + identifier + ".log", level=logging.INFO)
+        logging.info('START logging for test netting__net_ledger in run: %s',
+                     environment_directory + identifier + ".xml")
+
+        # Construct bank filename
+        environment = Environment(environment_directory,  identifier)
+        # keep the transactions created below in a columnar ledger
+        environment.ledger = Ledger()
+
+        # generate the bank
+        bank = Bank()
+        environment.banks.append(bank)
+        helper = Helper()
+        helper.initialize_standard_bank(bank, environment)
+        household = environment.households[0]
+        firm = environment.firms[0]
+
+        #
+        # TESTING
+        #
+
+        # the household has 250.0 deposits with the bank, now also a loan of 300.0
+        # the firm has a loan of 150.0 from the bank, now also deposits of 50.0
+        environment.new_transaction("loans", "", bank.identifier, household.identifier, 300.0, 0.0, 0, -1)
+        environment.new_transaction("deposits", "", firm.identifier, bank.identifier, 50.0, 0.0, 0, -1)
+        netting = Netting("deposits", "loans")
+        netting.net(environment, [household, firm], [bank],
+                    lambda depositor, lender: lender.interest_rate_deposits, lambda borrower, lender: lender.interest_rate_loans)
+        print("Number of transactions of the bank after netting (should be 3.0):")
+        print(bank.accounts.num_transactions_by_type("deposits") + bank.accounts.num_transactions_by_type("loans") +
+              bank.accounts.num_transactions_by_type("cash"))
+        print("Deposits of the bank after netting (should be 0.0):")
+        print(bank.accounts.volume_by_type("deposits"))
+        print("Loans of the bank to the household after netting (should be 50.0):")
+        print(sum(tranx.amount for tranx in bank.accounts.transactions_by_type_and_counterparty("loans", household)))
+        print("Loans of the bank to the firm after netting (should be 100.0):")
+        print(sum(tranx.amount for tranx in bank.accounts.transactions_by_type_and_counterparty("loans", firm)))
+
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # netting__sum_ledger
+    # -------------------------------------------------------------------------
+
+    def netting__sum_ledger(self, args):
+        from src.bank import Bank
+        from src.environment import Environment
+        from src.netting import Netting
+        from src.ledger import Ledger
+
+        text = "This test checks netting.sum_ledger against netting.sum_accounts \n"
+        self.print_info(text)
+        #
+        # INITIALIZATION
+        #
+        environment_directory = str(args[0])
+        identifier = str(args[1])
+        log_directory = str(args[2])
+
+        # Configure logging parameters so we get output while the program runs
+        logging.basicConfig(format='%(asctime)s %(message)s', datefmt='%m/%d/%Y %H:%M:%S',
+                            filename=log_directory + identifier + ".log", level=logging.INFO)
+        logging.info('START logging for test netting__sum_ledger in run: %s',
+                     environment_directory + identifier + ".xml")
+
+        # Construct bank filename
+        environment = Environment(environment_directory,  identifier)
+        # keep the transactions created below in a columnar ledger
+        environment.ledger = Ledger()
+
+        # generate a bank with no transactions yet
+        bank = Bank()
+        bank.identifier = "interleaved_bank"
+        environment.banks.append(bank)
+        firm = environment.firms[0]
+
+        #
+        # TESTING
+        #
+
+        # deposits and loans of the firm with the bank, interleaved on the books
+        environment.new_transaction("deposits", "", firm.identifier, bank.identifier, 0.1, 0.0, 0, -1)
+        environment.new_transaction("loans", "", bank.identifier, firm.identifier, 0.3, 0.0, 0, -1)
+        environment.new_transaction("deposits", "", firm.identifier, bank.identifier, 0.2, 0.0, 0, -1)
+        netting = Netting("deposits", "loans")
+        from_accounts, to_delete = netting.sum_accounts([firm], [bank])
+        from_ledger, to_delete = netting.sum_ledger(environment.ledger, [firm], [bank])
+        print("Balance of the firm with the bank summed over the accounts:")
+        print(repr(from_accounts[(firm, bank)]))
+        print("Balance of the firm with the bank summed over the ledger:")
+        print(repr(from_ledger[(firm, bank)]))
+        print("The balances are exactly the same (should be True):")
+        print(from_accounts == from_ledger)
+
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # netting__collapse
+    # -------------------------------------------------------------------------
+
+    def netting__collapse(self, args):
+        import os
+        from src.bank import Bank
+        from src.household import Household
+        from src.firm import Firm
+        from src.environment import Environment
+        from src.netting import Netting
+        from src.ledger import Ledger
+
+        text = "This test checks netting.net with a single type \n"
+        self.print_info(text)
+        #
+        # INITIALIZATION
+        #
+        environment_directory = str(args[0])
+        identifier = str(args[1])
+        log_directory = str(args[2])
+
+        # Configure logging parameters so we get output while the program runs
+        logging.basicConfig(format='%(asctime)s %(message)s', datefmt='%m/%d/%Y %H:%M:%S',
+                            filename=log_directory + identifier + ".log", level=logging.INFO)
+        logging.info('START logging for test netting__collapse in run: %s',
+                     environment_directory + identifier + ".xml")
+
+        # Construct bank filename
+        environment = Environment(environment_directory,  identifier)
+        # keep the transactions created below in a columnar ledger
+        environment.ledger = Ledger()
+
+        # generate the bank
+        bank = Bank()
+        environment.banks.append(bank)
+        helper = Helper()
+        helper.initialize_standard_bank(bank, environment)
+        household = environment.households[0]
+        firm = environment.firms[0]
+
+        #
+        # TESTING
+        #
+
+        # the bank has 100.0 in cash, now two more cash transactions with itself
+        environment.new_transaction("cash", "", bank.identifier, bank.identifier, 20.0, 0.0, 0, -1)
+        environment.new_transaction("cash", "", bank.identifier, bank.identifier, 30.0, 0.0, 0, -1)
+        netting = Netting("cash")
+        netting.net(environment, [bank], [bank])
+        print("Number of cash transactions of the bank after collapsing (should be 1.0):")
+        print(bank.accounts.num_transactions_by_type("cash"))
+        print("Cash of the bank after collapsing (should be 150.0):")
+        print(bank.accounts.volume_by_type("cash"))
+
+    # -------------------------------------------------------------------------
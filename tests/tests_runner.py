@@ -429,10 +429,225 @@ class TestsRunner(object):
         #
         runner.do_run(environment)
 
+    # -------------------------------------------------------------------------
+    # runner__do_run_seeded
+    # -------------------------------------------------------------------------
+
+    def runner__do_run_seeded(self, args):
+        from src.environment import Environment  # needed for the Directory
+        from src.runner import Runner
+
+        text = "This test checks runner.do_run with a seed \n"
+        self.print_info(text)
+        #
+        # INITIALIZATION
+        #
+        environment_directory = str(args[0])
+        identifier = str(args[1])
+        log_directory = str(args[2])
+
+        # Configure logging parameters so we get output while the program runs
+        logging.basicConfig(format='%(asctime)s %(message)s', datefmt='%m/%d/%Y %H:%M:%S',
+                            filename=log_directory + identifier + ".log", level=logging.INFO)
+        logging.info('START logging for test runner_do_run_seeded in run: %s',
+                     environment_directory + identifier + ".xml")
+
+        #
+        # TESTING
+        #
+        # full runs from a fresh environment each, seeded with 1, 1 and 2
+        outputs = []
+        for seed in [1, 1, 2]:
+            environment = Environment(environment_directory,  identifier)
+            environment.seed_random(seed)
+            runner = Runner(environment)
+            runner.in_memory = True
+            runner.do_run(environment)
+            outputs.append(runner.output)
+        text = "Two runs with the same seed have the same output: "
+        text = text + str(outputs[0] == outputs[1])
+        print(text)
+        text = "A run with another seed has a different output: "
+        text = text + str(outputs[0] != outputs[2])
+        print(text)
+
+    # -------------------------------------------------------------------------
+    # do_ensemble
+    # -------------------------------------------------------------------------
+
+    def runner__do_ensemble(self, args):
+        import os
+        from src.environment import Environment  # needed for the Directory
+        from src.runner import Runner, get_run_seed
+        from src.measurement import Measurement
+
+        text = "This test checks runner.do_ensemble \n"
+        self.print_info(text)
+        #
+        # INITIALIZATION
+        #
+        environment_directory = str(args[0])
+        identifier = str(args[1])
+        log_directory = str(args[2])
+
+        # Configure logging parameters so we get output while the program runs
+        logging.basicConfig(format='%(asctime)s %(message)s', datefmt='%m/%d/%Y %H:%M:%S',
+                            filename=log_directory + identifier + ".log", level=logging.INFO)
+        logging.info('START logging for test runner_do_ensemble in run: %s',
+                     environment_directory + identifier + ".xml")
+
+        # Construct bank filename
+        environment = Environment(environment_directory,  identifier)
+        environment.num_simulations = 2
+
+        # making an instance of the Runner class
+        runner = Runner(environment)
+        measurement = Measurement(environment, runner)
+        seed = int(environment.static_parameters.get("seed", 0))
+        # the files of the simulations have the run id, simulation and seed in their names
+        filenames = [measurement.get_simulation_filename(runner.run_id, run, get_run_seed(seed, run)) for run in range(2)]
+        print("Files of the simulations:")
+        print([filename.replace(runner.run_id, "<run_id>") for filename in filenames])
+
+        #
+        # TESTING
+        #
+        outputs = []
+        for processes in [1, 2]:
+            runner.do_ensemble(environment, environment_directory, identifier, processes)
+            outputs.append([open(filename).read() for filename in filenames])
+            for filename in filenames:
+                os.remove(filename)
+        text = "The output of 2 simulations run in 1 process is the same as in 2 processes: "
+        text = text + str(outputs[0] == outputs[1])
+        print(text)
+        text = "The 2 simulations have their own random numbers: "
+        text = text + str(outputs[0][0] != outputs[0][1])
+        print(text)
+
+    # -------------------------------------------------------------------------
 
+    # -------------------------------------------------------------------------
+    # runner__do_ensemble_npz
+    # -------------------------------------------------------------------------
+
+    def runner__do_ensemble_npz(self, args):
+        import csv
+        import os
+        from src.environment import Environment  # needed for the Directory
+        from src.runner import Runner, get_run_seed
+        from src.measurement import Measurement
+
+        text = "This test checks runner.do_ensemble with npz configured \n"
+        self.print_info(text)
+        #
+        # INITIALIZATION
+        #
+        environment_directory = str(args[0])
+        identifier = str(args[1])
+        log_directory = str(args[2])
+
+        # Configure logging parameters so we get output while the program runs
+        logging.basicConfig(format='%(asctime)s %(message)s', datefmt='%m/%d/%Y %H:%M:%S',
+                            filename=log_directory + identifier + ".log", level=logging.INFO)
+        logging.info('START logging for test runner_do_ensemble_npz in run: %s',
+                     environment_directory + identifier + ".xml")
+
+        # Construct bank filename
+        environment = Environment(environment_directory,  identifier)
+        environment.num_simulations = 2
+
+        # making an instance of the Runner class
+        runner = Runner(environment)
+        measurement = Measurement(environment, runner)
+        seed = int(environment.static_parameters.get("seed", 0))
+        filenames = [measurement.get_simulation_filename(runner.run_id, run, get_run_seed(seed, run)) for run in range(2)]
+
+        #
+        # TESTING
+        #
+        # the csv files of the simulations, to compare the npz files with
+        runner.do_ensemble(environment, environment_directory, identifier, 1)
+        rows = []
+        for filename in filenames:
+            with open(filename) as output_file:
+                rows.append(list(csv.reader(output_file)))
+            os.remove(filename)
+        environment.measurement_config = "tests/measurements/test_output_npz.xml"
+        runner.do_ensemble(environment, environment_directory, identifier, 2)
+        npz_filenames = [filename.split(".csv")[0] + ".npz" for filename in filenames]
+        print("Files of the simulations:")
+        print([filename.replace(runner.run_id, "<run_id>") for filename in npz_filenames])
+        print("No csv files are written: " + str(not any(os.path.exists(filename) for filename in filenames)))
+        try:
+            import numpy as np
+            same = True
+            for run in range(2):
+                npz_file = np.load(npz_filenames[run])
+                same = same and list(npz_file["columns"]) == rows[run][0]
+                same = same and npz_file["values"].tolist() == [[float(value) for value in row] for row in rows[run][1:]]
+                npz_file.close()
+            text = "The npz files hold the columns and values of the csv files: " + str(same)
+        except ImportError:
+            text = "Skipping the values of the npz files, numpy could not be imported"
+        print(text)
+        for filename in npz_filenames:
+            os.remove(filename)
 
+    # -------------------------------------------------------------------------
+    # runner__do_ensemble_shards
+    # -------------------------------------------------------------------------
 
+    def runner__do_ensemble_shards(self, args):
+        import os
+        from src.environment import Environment  # needed for the Directory
+        from src.runner import Runner
+        from src.shard import Shard
 
+        text = "This test checks runner.do_ensemble with shards \n"
+        self.print_info(text)
+        #
+        # INITIALIZATION
+        #
+        environment_directory = str(args[0])
+        identifier = str(args[1])
+        log_directory = str(args[2])
 
+        # Configure logging parameters so we get output while the program runs
+        logging.basicConfig(format='%(asctime)s %(message)s', datefmt='%m/%d/%Y %H:%M:%S',
+                            filename=log_directory + identifier + ".log", level=logging.INFO)
+        logging.info('START logging for test runner_do_ensemble_shards in run: %s',
+                     environment_directory + identifier + ".xml")
+
+        # Construct bank filename
+        environment = Environment(environment_directory,  identifier)
+        environment.num_simulations = 3
+
+        # making an instance of the Runner class
+        runner = Runner(environment)
+        runner.run_id = "test"
 
+        #
+        # TESTING
+        #
+        environment.static_parameters["measurement_shards"] = 1
+        merged = []
+        for processes in [1, 2]:
+            shards = runner.do_ensemble(environment, environment_directory, identifier, processes)
+            print("Shards written by " + str(processes) + " processes: " + str(len(shards)))
+            print("Rows merged: " + str(Shard.merge(shards, "measurements/TestMeasurement_merged.csv")))
+            with open("measurements/TestMeasurement_merged.csv") as merged_file:
+                merged.append(merged_file.read())
+            for shard in shards:
+                os.remove(shard)
+            os.remove("measurements/TestMeasurement_merged.csv")
+        print("Columns of the merged file:")
+        print(merged[0].splitlines()[0])
+        print("Simulations in the merged file:")
+        print(sorted(set(line.split(",")[1] for line in merged[0].splitlines()[1:])))
+        text = "The merged output of 1 process is the same as of 2 processes: "
+        text = text + str(merged[0] == merged[1])
+        print(text)
+
+    # -------------------------------------------------------------------------
 
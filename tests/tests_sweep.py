@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# [SublimeLinter pep8-max-line-length:150]
+# -*- coding: utf-8 -*-
+
+"""
+black_rhino is a multi-agent simulator for financial network analysis
+Copyright (C) 2016 Co-Pierre Georg (co-pierre.georg@keble.ox.ac.uk)
+Pawel Fiedor (pawel@fiedor.eu)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3 of the License.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import logging
+from src.helper import Helper
+
+# -------------------------------------------------------------------------
+#  class Tests
+# -------------------------------------------------------------------------
+
+
+class TestsSweep(object):
+    #
+    # VARIABLES
+    #
+
+    #
+    # METHODS
+    #
+
+    # -------------------------------------------------------------------------
+    # __init__
+    # -------------------------------------------------------------------------
+    def __init__(self):
+        pass
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # print_info(text)
+    # -------------------------------------------------------------------------
+    def print_info(self, text):
+        print('##############################################################################\n')
+        print(text)
+        print('##############################################################################\n')
+    # -------------------------------------------------------------------------
+
+# -------------------------------------------------------------------------
+#  TESTS FOR SWEEP.PY
+# -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # sweep__get_design
+    # -------------------------------------------------------------------------
+
+    def sweep__get_design(self, args):
+        from src.environment import Environment
+        from src.sweep import Sweep
+
+        text = "This test checks sweep.get_design \n"
+        self.print_info(text)
+        #
+        # INITIALIZATION
+        #
+        environment_directory = str(args[0])
+        identifier = str(args[1])
+        log_directory = str(args[2])
+
+        # Configure logging parameters so we get output while the program runs
+        logging.basicConfig(format='%(asctime)s %(message)s', datefmt='%m/%d/%Y %H:%M:%S',
+                            filename=log_directory + identifier + ".log", level=logging.INFO)
+        logging.info('START logging for test sweep__get_design in run: %s',
+                     environment_directory + identifier + ".xml")
+
+        # Construct household filename
+        environment = Environment(environment_directory,  identifier)
+        environment.variable_parameters = {}
+        environment.add_variable_parameter("alpha", 0.0, 1.0)
+        environment.add_variable_parameter("beta", 10.0, 20.0)
+
+        #
+        # TESTING
+        #
+
+        sweep = Sweep(environment)
+        sweep.design = "grid"
+        sweep.points = 3
+        print("Grid with 3 values of alpha in 0-1 and beta in 10-20 (should be 9 points):")
+        for point in sweep.get_design():
+            print(str(point["alpha"]) + " " + str(point["beta"]))
+        sweep.design = "lhs"
+        sweep.points = 4
+        design = sweep.get_design()
+        print("Latin hypercube of 4 points, strata of alpha taken (should be [0, 1, 2, 3]):")
+        print(sorted(int(point["alpha"] * 4) for point in design))
+        print("Strata of beta taken (should be [0, 1, 2, 3]):")
+        print(sorted(int((point["beta"] - 10.0) / 10.0 * 4) for point in design))
+        print("The same seed gives the same design:")
+        print(design == sweep.get_design())
+        sweep.design = "random"
+        print("Random design of 4 points within the ranges:")
+        print(all(0.0 <= point["alpha"] <= 1.0 and 10.0 <= point["beta"] <= 20.0 for point in sweep.get_design()))
+
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # sweep__do_sweep
+    # -------------------------------------------------------------------------
+
+    def sweep__do_sweep(self, args):
+        import os
+        from src.environment import Environment
+        from src.runner import Runner
+        from src.sweep import Sweep
+
+        text = "This test checks sweep.do_sweep \n"
+        self.print_info(text)
+        #
+        # INITIALIZATION
+        #
+        environment_directory = str(args[0])
+        identifier = str(args[1])
+        log_directory = str(args[2])
+
+        # Configure logging parameters so we get output while the program runs
+        logging.basicConfig(format='%(asctime)s %(message)s', datefmt='%m/%d/%Y %H:%M:%S',
+                            filename=log_directory + identifier + ".log", level=logging.INFO)
+        logging.info('START logging for test sweep__do_sweep in run: %s',
+                     environment_directory + identifier + ".xml")
+
+        # Construct household filename
+        environment = Environment(environment_directory,  identifier)
+        runner = Runner(environment)
+
+        #
+        # TESTING
+        #
+
+        sweep = Sweep(environment)
+        sweep.ranges = {"propensity_to_save": [0.2, 0.6]}
+        sweep.points = 2
+        sweep.replications = 2
+        tables = []
+        for processes in [1, 2]:
+            filename = sweep.do_sweep(runner, environment, environment_directory, identifier, processes)
+            tables.append(open(filename).read().splitlines())
+            os.remove(filename)
+        print("Header of the table:")
+        print(tables[0][0])
+        print("Number of rows, 2 points with 2 replications of 50 sweeps (should be 200):")
+        print(len(tables[0]) - 1)
+        print("First row of the second replication of the second point:")
+        print(",".join(tables[0][151].split(",")[:3]))
+        print("The table is the same with 1 and 2 processes:")
+        print(tables[0] == tables[1])
+        # the same simulation, with the same seed, at the two points of the design
+        simulations = [(point, 0, {"propensity_to_save": value}) for point, value in enumerate([0.2, 0.6])]
+        outputs = [output for key, output in runner.do_simulations(environment, environment_directory, identifier, 1, simulations)]
+        print("The measurements of the same simulation differ between the two points:")
+        print(outputs[0] != outputs[1])
+        print("A parameter which is not read by the model raises KeyError:")
+        try:
+            list(runner.do_simulations(environment, environment_directory, identifier, 1, [(0, 0, {"alpha": 0.5})]))
+            print(False)
+        except KeyError:
+            print(True)
+
+    # -------------------------------------------------------------------------
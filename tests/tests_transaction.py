@@ -943,6 +943,102 @@ class TestsTransaction(object):
 
     # -------------------------------------------------------------------------
 
+    # -------------------------------------------------------------------------
+    # transaction__identifiers
+    # -------------------------------------------------------------------------
+
+    def transaction__identifiers(self, args):
+        import os
+        from src.bank import Bank
+        from src.household import Household
+        from src.firm import Firm
+        from src.environment import Environment
+        from src.transaction import Transaction
+
+        text = "This test checks the identifiers of transactions \n"
+        self.print_info(text)
+        #
+        # INITIALIZATION
+        #
+        environment_directory = str(args[0])
+        identifier = str(args[1])
+        log_directory = str(args[2])
+
+        # Configure logging parameters so we get output while the program runs
+        logging.basicConfig(format='%(asctime)s %(message)s', datefmt='%m/%d/%Y %H:%M:%S',
+                            filename=log_directory + identifier + ".log", level=logging.INFO)
+        logging.info('START logging for test transaction__identifiers in run: %s',
+                     environment_directory + identifier + ".xml")
+
+        # Construct household filename
+        environment = Environment(environment_directory,  identifier)
+
+        #
+        # TESTING
+        #
+
+        print("Creating two transactions")
+        transaction_one = Transaction()
+        transaction_two = Transaction()
+        print("Identifiers: ")
+        print(transaction_one.identifier)
+        print(transaction_two.identifier)
+        print("Is the second identifier larger than the first? (should be True)")
+        print(transaction_two.identifier > transaction_one.identifier)
+
+    # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # transaction__trusted
+    # -------------------------------------------------------------------------
+
+    def transaction__trusted(self, args):
+        import os
+        from src.bank import Bank
+        from src.household import Household
+        from src.firm import Firm
+        from src.environment import Environment
+        from src.transaction import Transaction
+
+        text = "This test checks the setters of transactions in trusted mode \n"
+        self.print_info(text)
+        #
+        # INITIALIZATION
+        #
+        environment_directory = str(args[0])
+        identifier = str(args[1])
+        log_directory = str(args[2])
+
+        # Configure logging parameters so we get output while the program runs
+        logging.basicConfig(format='%(asctime)s %(message)s', datefmt='%m/%d/%Y %H:%M:%S',
+                            filename=log_directory + identifier + ".log", level=logging.INFO)
+        logging.info('START logging for test transaction__trusted in run: %s',
+                     environment_directory + identifier + ".xml")
+
+        # Construct household filename
+        environment = Environment(environment_directory,  identifier)
+
+        #
+        # TESTING
+        #
+
+        print("Creating a transaction")
+        transaction = Transaction()
+        transaction.add_transaction("type", "asset", "bank_test_config_id", "bank_test_config_id_two", 1,  2,  3, 4, environment)
+        print("Setting amount to a string with checks (should raise TypeError)")
+        try:
+            transaction.set_amount("15", environment)
+        except TypeError:
+            print("TypeError raised")
+        print("Setting amount to 15 in trusted mode")
+        environment.trusted = True
+        transaction.set_amount(15, environment)
+        environment.trusted = False
+        print("Amount (should be 15, not converted to float): ")
+        print(transaction.get_amount())
+
+    # -------------------------------------------------------------------------
+
     # -------------------------------------------------------------------------
     # transaction__add_transaction
     # -------------------------------------------------------------------------
@@ -1378,3 +1474,67 @@ class TestsTransaction(object):
         print(environment.get_agent_by_id("test_firm"))
 
     # -------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------
+    # transaction__purge_dropped
+    # -------------------------------------------------------------------------
+
+    def transaction__purge_dropped(self, args):
+        from src.household import Household
+        from src.firm import Firm
+        from src.environment import Environment
+        from src.transaction import Transaction
+
+        text = "This test checks transaction.purge_accounts without a ledger \n"
+        self.print_info(text)
+        #
+        # INITIALIZATION
+        #
+        environment_directory = str(args[0])
+        identifier = str(args[1])
+        log_directory = str(args[2])
+
+        # Configure logging parameters so we get output while the program runs
+        logging.basicConfig(format='%(asctime)s %(message)s', datefmt='%m/%d/%Y %H:%M:%S',
+                            filename=log_directory + identifier + ".log", level=logging.INFO)
+        logging.info('START logging for test transaction__purge_dropped in run: %s',
+                     environment_directory + identifier + ".xml")
+
+        # Construct household filename
+        environment = Environment(environment_directory,  identifier)
+
+        # generate a firm
+        firm = Firm()
+        firm.identifier = "test_firm"
+        environment.firms.append(firm)
+
+        # generate a household
+        household = Household()
+        household.identifier = "test_household"
+        environment.households.append(household)
+
+        #
+        # TESTING
+        #
+
+        print("Booking three transactions of 10.0 between the household and the firm")
+        transactions = []
+        for i in range(3):
+            transaction = Transaction()
+            transaction.add_transaction("type", "asset", "test_household", "test_firm", 10.0, 0.0, 0, -1, environment)
+            transactions.append(transaction)
+        print("Transactions noted as dropped (should be 0):")
+        print(len(environment.dropped))
+        print("Setting the first amount to 0.0, and the second to 0.0 and back to 5.0")
+        transactions[0].amount = 0.0
+        transactions[1].amount = 0.0
+        transactions[1].amount = 5.0
+        print("Transactions noted as dropped (should be 2):")
+        print(len(environment.dropped))
+        transaction.purge_accounts(environment)
+        print("Amounts on the books of the household after purging (should be [5.0, 10.0]):")
+        print([tranx.amount for tranx in household.accounts])
+        print("Transactions noted as dropped after purging (should be 0):")
+        print(len(environment.dropped))
+
+    # -------------------------------------------------------------------------
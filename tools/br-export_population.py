@@ -0,0 +1,32 @@
+#!/usr/bin/env python
+# [SublimeLinter pep8-max-line-length:300]
+"""
+black_rhino is a multi-agent simulator for financial network analysis
+Copyright (C) 2012 Co-Pierre Georg (co-pierre.georg@keble.ox.ac.uk)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3 of the License.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+import sys
+
+sys.path.append('./')
+
+from src.population import Population
+
+
+if __name__ == '__main__':
+
+    if (len(sys.argv) != 3):
+        sys.exit("Usage: ./br-export_population.py agent_directory/ population.csv")
+
+    # writes population.csv and population.edges.csv from the config files in agent_directory/
+    Population(sys.argv[2]).export_directory(sys.argv[1])